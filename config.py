@@ -6,8 +6,13 @@ recognition, and swapping processes. Adjust these values to optimize
 performance vs quality trade-offs.
 """
 
+import functools
+import math
 import os
+from dataclasses import dataclass, field
 from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
 
 # ============================================================================
 # Application Configuration
@@ -21,10 +26,6 @@ PROJECT_ROOT = Path(__file__).parent
 MODELS_DIR = PROJECT_ROOT / "models"
 LOGS_DIR = PROJECT_ROOT / "logs"
 
-# Create directories
-MODELS_DIR.mkdir(exist_ok=True)
-LOGS_DIR.mkdir(exist_ok=True)
-
 # ============================================================================
 # Performance Settings
 # ============================================================================
@@ -32,32 +33,78 @@ LOGS_DIR.mkdir(exist_ok=True)
 # Face detection scale (smaller = faster, less accurate)
 FACE_DETECTION_SCALE = 0.5
 
+# Upper bound on the detector input's long edge in pixels, applied on top of
+# FACE_DETECTION_SCALE so high resolution video is not detected at full size
+DETECTOR_MAX_LONG_EDGE = 640
+
 # Face recognition similarity threshold
 FACE_RECOGNITION_THRESHOLD = 0.6
 
+# Face recognition batching: sampled frames whose encodings are computed in
+# one call to the recognition network (the GPU size applies when dlib is
+# built with CUDA)
+RECOGNITION_BATCH_SIZE = 4
+RECOGNITION_BATCH_SIZE_GPU = 25
+
 # Video processing settings
 SCAN_FRAME_SKIP = 10
+# When above zero, scans sample this many frames per second of video instead
+# of every SCAN_FRAME_SKIP-th frame, so the work no longer scales with the
+# source frame rate
+SCAN_SAMPLE_FPS = 0.0
+
+# Decoded frames buffered ahead of detection while scanning a video
+SCAN_PREFETCH_FRAMES = 8
+# Sampled frames whose face detection runs concurrently while scanning
+SCAN_DETECT_WORKERS = min(4, os.cpu_count() or 1)
+# Frames buffered between the decode, swap and encode stages of video processing
+PROCESS_QUEUE_FRAMES = 8
+# Frames handed to the face swapper per call; progress is reported per batch
+PROCESS_BATCH_FRAMES = 8
+# Process every Nth frame of the input; skipped frames are demuxed but not
+# decoded, and the output frame rate is divided accordingly
+PROCESS_FRAME_STRIDE = 1
+# Run video processing in a persistent worker process instead of a GUI thread
+PROCESS_IN_WORKER = True
 OUTPUT_VIDEO_CODEC = 'mp4v'
+# ffmpeg encoder for the output video: 'auto' picks the first working H.264
+# encoder (hardware first), 'opencv' always uses cv2.VideoWriter with
+# OUTPUT_VIDEO_CODEC, which is also the fallback when ffmpeg is missing
+OUTPUT_VIDEO_ENCODER = 'auto'
+OUTPUT_VIDEO_BITRATE = '8M'
+
+# Run full detection every DETECTOR_STEP frames and follow faces with an
+# OpenCV tracker in between. A detection that overlaps a tracked face by at
+# least TRACK_RESEED_IOU keeps that face's identity without re-encoding.
+# KCF needs opencv-contrib; stock OpenCV builds fall back to MIL.
+DETECTOR_STEP = 7
+TRACKER_TYPE = 'KCF'
+TRACK_RESEED_IOU = 0.3
 
-# Create output directory
+# Cached scan results (unique faces per video and scan settings)
+SCAN_CACHE_DIR = Path.home() / ".cache" / "faceswap"
+
+# Output directory (created on first use, see ensure_dirs)
 OUTPUT_VIDEO_DIR = Path.home() / "Videos" / "FaceSwap"
-OUTPUT_VIDEO_DIR.mkdir(parents=True, exist_ok=True)
 
 # ============================================================================
 # Face Swapping Settings
 # ============================================================================
 
-# Blending settings
-try:
-    import cv2
-    BLEND_METHOD = cv2.NORMAL_CLONE
-except ImportError:
-    BLEND_METHOD = 'NORMAL_CLONE'
+# Warping ('delaunay', 'affine' or 'tps')
+WARP_MODE = 'delaunay'
+
+# Blending settings (OpenCV seamlessClone flag name, see get_blend_method)
+BLEND_METHOD = 'NORMAL_CLONE'
+BLEND_MODE = 'laplacian'
+LAPLACIAN_LEVELS = 4
+ADAPTIVE_FEATHER_RADIUS = 20
 
 MASK_FEATHER_AMOUNT = 6
 
 # Smoothing settings
 SMOOTHING_METHOD = 'one_euro'
+MASK_SMOOTH_METHOD = 'one_euro'
 SMOOTHING_PARAMS = {
     'one_euro': {
         'freq': 30.0,
@@ -72,7 +119,10 @@ SMOOTHING_PARAMS = {
 
 # Color correction
 ENABLE_COLOR_MATCHING = True
-COLOR_CORRECTION_STRENGTH = 0.7
+# 1.0 fully matches the target face's mean color, as swaps always have
+COLOR_CORRECTION_STRENGTH = 1.0
+COLOR_MATCH_STRENGTH = 0.9
+COLOR_TEMPORAL_ALPHA = 0.6
 
 # ============================================================================
 # File Settings
@@ -82,6 +132,15 @@ COLOR_CORRECTION_STRENGTH = 0.7
 FACE_LANDMARKS_MODEL = MODELS_DIR / "shape_predictor_68_face_landmarks.dat"
 FACE_RECOGNITION_MODEL = MODELS_DIR / "dlib_face_recognition_resnet_model_v1.dat"
 
+# Optional ONNX export of the recognition network, used through ONNX Runtime
+# (TensorRT/CUDA when available) in place of dlib when present
+FACE_RECOGNITION_ONNX_MODEL = MODELS_DIR / "dlib_face_recognition_resnet_model_v1.onnx"
+# Reduced-precision variants of that export, preferred when present: FP16
+# (onnxconverter_common.float16) on GPU providers, dynamically quantized INT8
+# (onnxruntime.quantization.quantize_dynamic) on CPU
+FACE_RECOGNITION_ONNX_MODEL_FP16 = MODELS_DIR / "dlib_face_recognition_resnet_model_v1_fp16.onnx"
+FACE_RECOGNITION_ONNX_MODEL_INT8 = MODELS_DIR / "dlib_face_recognition_resnet_model_v1_int8.onnx"
+
 # Supported formats
 SUPPORTED_VIDEO_FORMATS = [".mp4", ".avi", ".mov", ".mkv", ".wmv"]
 SUPPORTED_IMAGE_FORMATS = [".jpg", ".jpeg", ".png", ".bmp"]
@@ -101,3 +160,153 @@ FACE_CARD_HEIGHT = 300
 
 LOG_LEVEL = "INFO"
 LOG_FILE_PATH = LOGS_DIR / "faceswap.log"
+
+# ============================================================================
+# Runtime Configuration
+# ============================================================================
+
+def _clamp(value, lo, hi):
+    return min(hi, max(lo, value))
+
+
+# Type and valid range of the numeric Config fields
+_FIELD_RANGES = {
+    'face_detection_scale': (float, 0.1, 1.0),
+    'face_recognition_threshold': (float, 0.0, 1.0),
+    'color_correction_strength': (float, 0.0, 1.0),
+    'color_match_strength': (float, 0.0, 1.0),
+    'detector_max_long_edge': (int, 64, math.inf),
+    'recognition_batch_size': (int, 1, math.inf),
+    'recognition_batch_size_gpu': (int, 1, math.inf),
+    'scan_frame_skip': (int, 1, math.inf),
+    'scan_sample_fps': (float, 0.0, math.inf),
+    'scan_prefetch_frames': (int, 1, math.inf),
+    'scan_detect_workers': (int, 1, math.inf),
+    'process_queue_frames': (int, 1, math.inf),
+    'process_batch_frames': (int, 1, math.inf),
+    'process_frame_stride': (int, 1, math.inf),
+    'detector_step': (int, 1, math.inf),
+    'track_reseed_iou': (float, 0.0, 1.0),
+    'mask_feather_amount': (int, 0, math.inf),
+}
+
+
+@dataclass(frozen=True)
+class Config:
+    """
+    Immutable processing settings.
+
+    Defaults mirror the module-level constants above. Values are clamped
+    into their valid ranges once, on construction.
+    """
+    quality_preset: str = 'balanced'
+    face_detection_scale: float = FACE_DETECTION_SCALE
+    detector_max_long_edge: int = DETECTOR_MAX_LONG_EDGE
+    face_recognition_threshold: float = FACE_RECOGNITION_THRESHOLD
+    recognition_batch_size: int = RECOGNITION_BATCH_SIZE
+    recognition_batch_size_gpu: int = RECOGNITION_BATCH_SIZE_GPU
+    scan_frame_skip: int = SCAN_FRAME_SKIP
+    scan_sample_fps: float = SCAN_SAMPLE_FPS
+    scan_prefetch_frames: int = SCAN_PREFETCH_FRAMES
+    scan_detect_workers: int = SCAN_DETECT_WORKERS
+    process_queue_frames: int = PROCESS_QUEUE_FRAMES
+    process_batch_frames: int = PROCESS_BATCH_FRAMES
+    process_frame_stride: int = PROCESS_FRAME_STRIDE
+    process_in_worker: bool = PROCESS_IN_WORKER
+    output_video_codec: str = OUTPUT_VIDEO_CODEC
+    output_video_encoder: str = OUTPUT_VIDEO_ENCODER
+    output_video_bitrate: str = OUTPUT_VIDEO_BITRATE
+    detector_step: int = DETECTOR_STEP
+    tracker_type: str = TRACKER_TYPE
+    track_reseed_iou: float = TRACK_RESEED_IOU
+    warp_mode: str = WARP_MODE
+    blend_method: str = BLEND_METHOD
+    blend_mode: str = BLEND_MODE
+    laplacian_levels: int = LAPLACIAN_LEVELS
+    adaptive_feather_radius: int = ADAPTIVE_FEATHER_RADIUS
+    mask_feather_amount: int = MASK_FEATHER_AMOUNT
+    smoothing_method: str = SMOOTHING_METHOD
+    mask_smooth_method: str = MASK_SMOOTH_METHOD
+    smoothing_params: Mapping = field(default_factory=lambda: MappingProxyType(SMOOTHING_PARAMS))
+    enable_color_matching: bool = ENABLE_COLOR_MATCHING
+    color_correction_strength: float = COLOR_CORRECTION_STRENGTH
+    color_match_strength: float = COLOR_MATCH_STRENGTH
+    color_temporal_alpha: float = COLOR_TEMPORAL_ALPHA
+
+    def __post_init__(self):
+        for name, (kind, lo, hi) in _FIELD_RANGES.items():
+            object.__setattr__(self, name, _clamp(kind(getattr(self, name)), lo, hi))
+
+
+DEFAULT_QUALITY_PRESET = "balanced"
+
+QUALITY_PRESETS = {
+    'fast': Config(
+        quality_preset='fast',
+        face_detection_scale=0.35,
+        detector_max_long_edge=480,
+        scan_frame_skip=15,
+        detector_step=15,
+        mask_feather_amount=4,
+        enable_color_matching=False,
+    ),
+    'balanced': Config(),
+    'high_quality': Config(
+        quality_preset='high_quality',
+        face_detection_scale=0.75,
+        detector_max_long_edge=960,
+        scan_frame_skip=5,
+        detector_step=3,
+        mask_feather_amount=8,
+    ),
+}
+
+# Active settings. Read attributes from ``config.CONFIG``; the module-level
+# constants above are only its defaults.
+CONFIG: Config = QUALITY_PRESETS[DEFAULT_QUALITY_PRESET]
+
+
+def apply_quality_preset(preset_name: str) -> Config:
+    """
+    Select a quality preset.
+
+    Args:
+        preset_name: Key of QUALITY_PRESETS
+
+    Returns:
+        The preset's Config, also bound to CONFIG
+    """
+    global CONFIG
+    if preset_name not in QUALITY_PRESETS:
+        raise ValueError(f"Unknown quality preset: {preset_name}")
+
+    CONFIG = QUALITY_PRESETS[preset_name]
+    return CONFIG
+
+
+@functools.lru_cache(maxsize=None)
+def ensure_dirs():
+    """Create the models, logs and output directories once per process."""
+    MODELS_DIR.mkdir(exist_ok=True)
+    LOGS_DIR.mkdir(exist_ok=True)
+    OUTPUT_VIDEO_DIR.mkdir(parents=True, exist_ok=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_blend_method(name: str):
+    """Map a seamlessClone flag name to its OpenCV constant."""
+    try:
+        import cv2
+    except ImportError:
+        return name
+    return getattr(cv2, name)
+
+
+def get_blend_method():
+    """
+    Get the configured blend method as an OpenCV flag.
+
+    OpenCV is imported on first call only, so path-only consumers of this
+    module do not pay for loading it.
+    """
+    return _resolve_blend_method(CONFIG.blend_method)
@@ -4,17 +4,16 @@ Model Download Script for FaceSwap Application
 
 This script downloads the required Dlib model files needed for face detection,
 landmark prediction, and face recognition. The models are downloaded from the
-official Dlib repository and extracted to the models directory.
+official Dlib repository and decompressed into the models directory as they
+stream in.
 
 Usage:
     python download_models.py
 
 The script will:
 1. Create the models directory if it doesn't exist
-2. Download the compressed model files
-3. Extract them to .dat files
-4. Verify the downloads
-5. Clean up temporary files
+2. Download the compressed model files, extracting them to .dat files
+3. Verify the downloads
 """
 
 import os
@@ -22,22 +21,47 @@ import sys
 import urllib.request
 import urllib.error
 import bz2
-import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import hashlib
+import json
 import logging
 
+try:
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# Read buffer size for hashing
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Socket read size for downloads; each model is one connection, and the
+# models download in parallel with each other
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Minimum seconds between progress bar redraws
+PROGRESS_INTERVAL = 0.25
+
+# Percentage step between plain-text progress lines when tqdm is missing
+PROGRESS_LOG_STEP = 10
+
+# Stat/hash records of models that already passed verification
+VERIFIED_CACHE_FILE = ".verified.json"
+
+# Smallest plausible size of a model file
+MIN_MODEL_SIZE = 1024 * 1024
+
 # Model configuration
 MODELS = {
     "shape_predictor_68_face_landmarks.dat": {
         # Updated URL - original may be unreliable
         "url": "https://github.com/davisking/dlib-models/raw/master/shape_predictor_68_face_landmarks.dat.bz2",
         "fallback_url": "http://dlib.net/files/shape_predictor_68_face_landmarks.dat.bz2",
-        "compressed_file": "shape_predictor_68_face_landmarks.dat.bz2",
         "description": "68-point facial landmark predictor",
         "size_mb": 99.7,
         # SHA256 hash of the uncompressed .dat file (if known)
@@ -46,7 +70,6 @@ MODELS = {
     "dlib_face_recognition_resnet_model_v1.dat": {
         "url": "https://github.com/davisking/dlib-models/raw/master/dlib_face_recognition_resnet_model_v1.dat.bz2",
         "fallback_url": "http://dlib.net/files/dlib_face_recognition_resnet_model_v1.dat.bz2",
-        "compressed_file": "dlib_face_recognition_resnet_model_v1.dat.bz2", 
         "description": "Face recognition ResNet model",
         "size_mb": 22.5,
         "sha256": None
@@ -60,17 +83,18 @@ def create_models_directory():
     logger.info(f"Models directory: {models_dir.absolute()}")
     return models_dir
 
-def download_file_with_progress(url, filename, fallback_url=None):
+def download_model(url, output_file, fallback_url=None, position=0):
     """
-    Download a file with progress reporting and fallback URL.
+    Download a bz2 compressed model with fallback URL, decompressing it on the fly.
     
     Args:
         url: Primary URL to download from
-        filename: Local filename to save to
+        output_file: Path for the decompressed model file
         fallback_url: Fallback URL if primary fails
+        position: Line offset of this download's progress bar
         
     Returns:
-        bool: True if successful, False otherwise
+        str: SHA256 hex digest of the decompressed file, or None on failure
     """
     urls_to_try = [url]
     if fallback_url:
@@ -78,81 +102,105 @@ def download_file_with_progress(url, filename, fallback_url=None):
     
     for attempt_url in urls_to_try:
         try:
-            logger.info(f"Downloading {filename} from {attempt_url}...")
-            
-            def progress_hook(block_num, block_size, total_size):
-                """Progress reporting hook."""
-                if total_size > 0:
-                    percent = min(100, (block_num * block_size * 100) // total_size)
-                    size_mb = total_size / (1024 * 1024)
-                    downloaded_mb = (block_num * block_size) / (1024 * 1024)
-                    print(f"\rProgress: {percent:3d}% ({downloaded_mb:.1f}/{size_mb:.1f} MB)", end="", flush=True)
-            
-            urllib.request.urlretrieve(attempt_url, filename, progress_hook)
-            print()  # New line after progress
-            logger.info(f"Downloaded: {filename}")
-            return True
+            logger.info(f"Downloading {output_file} from {attempt_url}...")
+            sha256_digest = stream_bz2_download(attempt_url, output_file, position)
+            logger.info(f"Downloaded: {output_file}")
+            return sha256_digest
             
         except urllib.error.URLError as e:
             logger.warning(f"Failed to download from {attempt_url}: {e}")
             if attempt_url == urls_to_try[-1]:  # Last URL failed
-                logger.error(f"All download attempts failed for {filename}")
-                return False
+                logger.error(f"All download attempts failed for {output_file}")
+                return None
             continue
         except Exception as e:
             logger.warning(f"Unexpected error downloading from {attempt_url}: {e}")
             continue
     
-    return False
+    return None
 
-def extract_bz2_file(compressed_file, output_file):
+def stream_bz2_download(url, output_file, position=0):
     """
-    Extract a bz2 compressed file.
+    Download a bz2 stream straight through the decompressor into output_file.
+    
+    The compressed data never touches disk. Output is written to a .part file
+    that replaces output_file only once the stream is complete. Progress is
+    labelled with the file name so concurrent downloads stay readable.
+    
+    Decompression overlaps the download, so it only costs time when bz2
+    decodes slower than the link delivers; a parallel block decoder
+    (indexed_bzip2, pbzip2) needs the whole archive on disk first.
     
-    Args:
-        compressed_file: Path to compressed file
-        output_file: Path for extracted file
-        
     Returns:
-        bool: True if successful, False otherwise
+        str: SHA256 hex digest of the decompressed data
     """
+    name = Path(output_file).name
+    partial_file = Path(str(output_file) + ".part")
+    decompressor = bz2.BZ2Decompressor()
+    sha256_hash = hashlib.sha256()
+    progress = None
+    
     try:
-        logger.info(f"Extracting {compressed_file}...")
-        
-        with bz2.BZ2File(compressed_file, 'rb') as f_in:
-            with open(output_file, 'wb') as f_out:
-                # Copy data in chunks to show progress for large files
-                chunk_size = 1024 * 1024  # 1MB chunks
-                total_size = os.path.getsize(compressed_file)
-                processed = 0
+        with urllib.request.urlopen(url) as response, open(partial_file, 'wb') as f_out:
+            total_size = int(response.headers.get('Content-Length') or 0)
+            downloaded = 0
+            last_logged = -PROGRESS_LOG_STEP
+            
+            if TQDM_AVAILABLE:
+                progress = tqdm(total=total_size or None, desc=name, position=position,
+                                unit='B', unit_scale=True, unit_divisor=1024,
+                                mininterval=PROGRESS_INTERVAL)
+            
+            for chunk in iter(lambda: response.read(DOWNLOAD_CHUNK_SIZE), b""):
+                data = decompressor.decompress(chunk)
+                sha256_hash.update(data)
+                f_out.write(data)
+                downloaded += len(chunk)
                 
-                while True:
-                    chunk = f_in.read(chunk_size)
-                    if not chunk:
-                        break
-                    f_out.write(chunk)
-                    processed += len(chunk)
-                    
-                    # Show progress (approximate since we're reading compressed data)
-                    if total_size > 0:
-                        percent = min(100, (processed * 100) // total_size)
-                        print(f"\rExtracting: {percent:3d}%", end="", flush=True)
+                if progress is not None:
+                    progress.update(len(chunk))
+                elif total_size > 0:
+                    percent = min(100, (downloaded * 100) // total_size)
+                    if percent - last_logged >= PROGRESS_LOG_STEP or (percent == 100 and last_logged < 100):
+                        last_logged = percent
+                        size_mb = total_size / (1024 * 1024)
+                        downloaded_mb = downloaded / (1024 * 1024)
+                        logger.info(f"{name}: {percent:3d}% ({downloaded_mb:.1f}/{size_mb:.1f} MB)")
         
-        print()  # New line after progress
-        logger.info(f"Extracted: {output_file}")
-        return True
+        if not decompressor.eof:
+            raise EOFError("Download ended before the end of the bz2 stream")
         
-    except Exception as e:
-        logger.error(f"Failed to extract {compressed_file}: {e}")
-        return False
+        os.replace(partial_file, output_file)
+        
+    except BaseException:
+        if partial_file.exists():
+            partial_file.unlink()
+        raise
+    finally:
+        if progress is not None:
+            progress.close()
+    
+    return sha256_hash.hexdigest()
 
-def verify_file(file_path, expected_sha256=None):
+def file_sha256(file_path):
+    """Compute the SHA256 hex digest of a file."""
+    with open(file_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        
+        sha256_hash = hashlib.sha256()
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha256_hash.update(chunk)
+        return sha256_hash.hexdigest()
+
+def verify_file(file_path, expected_sha256=None, sha256_digest=None):
     """
     Verify a downloaded file.
     
     Args:
         file_path: Path to file to verify
         expected_sha256: Expected SHA256 hash (optional)
+        sha256_digest: Already computed digest of the file, skips re-reading it
         
     Returns:
         bool: True if valid, False otherwise
@@ -171,13 +219,7 @@ def verify_file(file_path, expected_sha256=None):
     # Verify SHA256 hash if provided
     if expected_sha256:
         logger.info("Verifying file integrity...")
-        sha256_hash = hashlib.sha256()
-        
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        
-        calculated_hash = sha256_hash.hexdigest()
+        calculated_hash = sha256_digest or file_sha256(file_path)
         if calculated_hash.lower() == expected_sha256.lower():
             logger.info("File integrity verified ✓")
             return True
@@ -190,15 +232,65 @@ def verify_file(file_path, expected_sha256=None):
     logger.info("File appears valid ✓")
     return True
 
-def cleanup_temp_files(temp_files):
-    """Remove temporary files."""
-    for temp_file in temp_files:
-        try:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-                logger.info(f"Removed temporary file: {temp_file}")
-        except Exception as e:
-            logger.warning(f"Could not remove {temp_file}: {e}")
+def load_verified_cache(models_dir):
+    """Load the verification cache, returning an empty one if unreadable."""
+    try:
+        with open(Path(models_dir) / VERIFIED_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_verified_cache(models_dir, cache):
+    """Persist the verification cache."""
+    try:
+        with open(Path(models_dir) / VERIFIED_CACHE_FILE, 'w') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not write verification cache: {e}")
+
+def record_verified(cache, model_path, sha256_digest=None):
+    """Remember the current size/mtime of a model that passed verification."""
+    stat = os.stat(model_path)
+    cache[Path(model_path).name] = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256_digest
+    }
+
+def verify_model(model_path, expected_sha256, cache):
+    """
+    Verify an installed model, skipping the hash if it is unchanged since
+    its last successful verification.
+    
+    Args:
+        model_path: Path to the model file
+        expected_sha256: Expected SHA256 hash (optional)
+        cache: Verification cache from load_verified_cache, updated in place
+        
+    Returns:
+        bool: True if valid, False otherwise
+    """
+    try:
+        stat = os.stat(model_path)
+    except OSError:
+        return False
+    
+    entry = cache.get(Path(model_path).name)
+    if (entry and entry.get("size") == stat.st_size
+            and entry.get("mtime_ns") == stat.st_mtime_ns
+            and (not expected_sha256
+                 or (entry.get("sha256") or "").lower() == expected_sha256.lower())):
+        return True
+    
+    if stat.st_size < MIN_MODEL_SIZE:
+        logger.error(f"File too small to be a model: {model_path}")
+        return False
+    
+    if not verify_file(model_path, expected_sha256):
+        return False
+    
+    record_verified(cache, model_path, expected_sha256)
+    return True
 
 def download_all_models():
     """Download and extract all required model files."""
@@ -206,11 +298,12 @@ def download_all_models():
     models_dir = create_models_directory()
     
     success_count = 0
-    temp_files = []
+    verified_cache = load_verified_cache(models_dir)
     
     logger.info(f"Starting download of {len(MODELS)} model files...")
     logger.info("This may take several minutes depending on your internet connection.")
     
+    pending = {}
     for model_file, config in MODELS.items():
         logger.info(f"\n{'='*60}")
         logger.info(f"Processing: {config['description']}")
@@ -218,11 +311,10 @@ def download_all_models():
         logger.info(f"Expected size: ~{config['size_mb']} MB")
         
         model_path = models_dir / model_file
-        compressed_path = models_dir / config['compressed_file']
         
         # Check if model already exists
         if model_path.exists():
-            if verify_file(model_path, config['sha256']):
+            if verify_model(model_path, config['sha256'], verified_cache):
                 logger.info(f"Model already exists and is valid: {model_file}")
                 success_count += 1
                 continue
@@ -233,31 +325,36 @@ def download_all_models():
                 except:
                     pass
         
-        # Download compressed file
-        fallback_url = config.get('fallback_url')
-        if not download_file_with_progress(config['url'], compressed_path, fallback_url):
-            logger.error(f"Failed to download {model_file}")
-            continue
-        
-        temp_files.append(compressed_path)
-        
-        # Extract the file
-        if not extract_bz2_file(compressed_path, model_path):
-            logger.error(f"Failed to extract {model_file}")
-            continue
-        
-        # Verify the extracted file
-        if not verify_file(model_path, config['sha256']):
-            logger.error(f"Failed to verify {model_file}")
-            continue
-        
-        success_count += 1
-        logger.info(f"Successfully installed: {model_file} ✓")
+        pending[model_file] = config
     
-    # Clean up temporary files
-    logger.info(f"\n{'='*60}")
-    logger.info("Cleaning up temporary files...")
-    cleanup_temp_files(temp_files)
+    # Download the missing models in parallel; each stream is usually
+    # throttled well below the link speed, so they overlap almost fully
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = {
+                executor.submit(download_model, config['url'], models_dir / model_file,
+                                config.get('fallback_url'), position): model_file
+                for position, (model_file, config) in enumerate(pending.items())
+            }
+            
+            for future in as_completed(futures):
+                model_file = futures[future]
+                model_path = models_dir / model_file
+                sha256_digest = future.result()
+                if sha256_digest is None:
+                    logger.error(f"Failed to download {model_file}")
+                    continue
+                
+                # Verify the extracted file
+                if not verify_file(model_path, pending[model_file]['sha256'], sha256_digest):
+                    logger.error(f"Failed to verify {model_file}")
+                    continue
+                
+                record_verified(verified_cache, model_path, sha256_digest)
+                success_count += 1
+                logger.info(f"Successfully installed: {model_file} ✓")
+    
+    save_verified_cache(models_dir, verified_cache)
     
     # Summary
     logger.info(f"\n{'='*60}")
@@ -286,16 +383,18 @@ def check_existing_models():
         return {}
     
     status = {}
+    verified_cache = load_verified_cache(models_dir)
     for model_file, config in MODELS.items():
         model_path = models_dir / model_file
         if model_path.exists():
-            if verify_file(model_path, config['sha256']):
+            if verify_model(model_path, config['sha256'], verified_cache):
                 status[model_file] = "valid"
             else:
                 status[model_file] = "invalid"
         else:
             status[model_file] = "missing"
     
+    save_verified_cache(models_dir, verified_cache)
     return status
 
 def main():
@@ -1,17 +1,35 @@
+import os
 import cv2
 import numpy as np
 import torch
-import torchvision.transforms as transforms
 from utils.gpu_utils import gpu_manager
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Input size and BGR channel means of the OpenCV DNN face detector
+DNN_INPUT_SIZE = (300, 300)
+DNN_MEAN_BGR = np.array([104, 117, 123], dtype=np.float32)
+
+# Optional INT8 ONNX export of the same detector for OpenVINO on CPU
+DNN_INT8_MODEL = 'models/opencv_face_detector_int8.onnx'
+
+# Input shape of the warm-up call that makes each compiled MTCNN stage compile
+MTCNN_WARMUP_SHAPES = {'pnet': (1, 3, 64, 64), 'rnet': (1, 3, 24, 24), 'onet': (1, 3, 48, 48)}
+
 class FaceDetector:
     def __init__(self):
         self.device = gpu_manager.device
         self.batch_size = gpu_manager.get_optimal_batch_size()
         
+        # Reused DNN input buffers: the resized frame and the NCHW blob
+        self._dnn_input = np.empty((DNN_INPUT_SIZE[1], DNN_INPUT_SIZE[0], 3), dtype=np.uint8)
+        self._blob = np.empty((1, 3, DNN_INPUT_SIZE[1], DNN_INPUT_SIZE[0]), dtype=np.float32)
+        
+        # CPU detectors; loaded up front without a GPU, otherwise on the first CPU fallback
+        self.face_cascade = None
+        self.dnn_net = None
+        
         # Initialize face detection models with GPU support
         self._init_detectors()
         
@@ -28,6 +46,8 @@ class FaceDetector:
                     post_process=False
                 )
                 logger.info(f"Loaded MTCNN on {self.device}")
+                if self.device.type == 'cuda':
+                    self._compile_mtcnn()
             else:
                 # CPU fallback
                 self._init_cpu_detector()
@@ -35,6 +55,27 @@ class FaceDetector:
             logger.warning("GPU-optimized face detection not available, using CPU fallback")
             self._init_cpu_detector()
     
+    def _compile_mtcnn(self):
+        """Compile the MTCNN stage networks to cut per-call Python dispatch overhead."""
+        # Input sizes repeat from frame to frame once the video resolution is fixed
+        torch.backends.cudnn.benchmark = True
+        
+        for name in ('pnet', 'rnet', 'onet'):
+            net = getattr(self.mtcnn, name)
+            try:
+                if hasattr(torch, 'compile'):
+                    # P-Net sees one input size per pyramid level, so compile it shape-polymorphic
+                    compiled = torch.compile(net, dynamic=(name == 'pnet'))
+                else:
+                    compiled = torch.jit.script(net)
+                # torch.compile only compiles on the first call, so a missing
+                # Triton or an unsupported op would otherwise surface mid-video
+                with torch.no_grad():
+                    compiled(torch.zeros(MTCNN_WARMUP_SHAPES[name], device=self.device))
+                setattr(self.mtcnn, name, compiled)
+            except Exception as e:
+                logger.warning(f"Could not compile MTCNN {name}, using eager mode: {e}")
+    
     def _init_cpu_detector(self):
         """Initialize CPU-based face detector."""
         # Load OpenCV Haar cascades or DNN models
@@ -44,48 +85,130 @@ class FaceDetector:
         
         # Try to load DNN face detector if available
         try:
-            self.dnn_net = cv2.dnn.readNetFromTensorflow('models/opencv_face_detector_uint8.pb',
-                                                        'models/opencv_face_detector.pbtxt')
-            if gpu_manager.opencv_gpu and self.device.type == 'cuda':
-                self.dnn_net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-                self.dnn_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+            self.dnn_net = self._load_dnn_net()
         except:
             self.dnn_net = None
     
+    def _load_dnn_net(self):
+        """Load the DNN face detector on the fastest backend/target that works.
+        
+        CUDA tries FP16 first (compute capability 5.3+), then FP32. CPU hosts
+        use an INT8 model through OpenVINO when both are available, otherwise
+        the stock TensorFlow model on OpenCV's default backend.
+        """
+        if gpu_manager.opencv_gpu and self.device.type == 'cuda':
+            net = cv2.dnn.readNetFromTensorflow('models/opencv_face_detector_uint8.pb',
+                                                'models/opencv_face_detector.pbtxt')
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+            targets = [cv2.dnn.DNN_TARGET_CUDA]
+            if torch.cuda.get_device_capability(self.device) >= (5, 3):
+                targets.insert(0, cv2.dnn.DNN_TARGET_CUDA_FP16)
+            for target in targets:
+                net.setPreferableTarget(target)
+                if self._dnn_net_works(net):
+                    return net
+            return net
+        
+        if os.path.exists(DNN_INT8_MODEL):
+            try:
+                net = cv2.dnn.readNetFromONNX(DNN_INT8_MODEL)
+                net.setPreferableBackend(cv2.dnn.DNN_BACKEND_INFERENCE_ENGINE)
+                net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+                if self._dnn_net_works(net):
+                    logger.info("Using INT8 DNN face detector on OpenVINO")
+                    return net
+            except cv2.error as e:
+                logger.info(f"INT8 DNN face detector not available: {e}")
+        
+        return cv2.dnn.readNetFromTensorflow('models/opencv_face_detector_uint8.pb',
+                                             'models/opencv_face_detector.pbtxt')
+    
+    def _dnn_net_works(self, net) -> bool:
+        """Run one warm-up inference; backends reject unsupported targets only at forward time."""
+        try:
+            self._blob.fill(0)
+            net.setInput(self._blob)
+            net.forward()
+            return True
+        except cv2.error:
+            return False
+    
     def detect_faces_gpu(self, image: np.ndarray) -> list:
         """GPU-accelerated face detection."""
+        return self.detect_faces_batch([image])[0]
+    
+    def detect_faces_batch(self, frames: list) -> list:
+        """Detect faces in a list of equally sized frames.
+        
+        On GPU the frames are sent to MTCNN in batches of ``self.batch_size``
+        so each detect call covers several frames.
+        
+        Args:
+            frames: List of HxWx3 uint8 images with identical shapes
+            
+        Returns:
+            List with one list of (x, y, w, h) face rectangles per frame
+        """
+        if not frames:
+            return []
+        
         if hasattr(self, 'mtcnn') and self.device.type in ['cuda', 'mps']:
             try:
-                # Convert to tensor and move to GPU
-                image_tensor = transforms.ToTensor()(image).unsqueeze(0).to(self.device)
-                
-                # Detect faces using GPU
-                boxes, probs = self.mtcnn.detect(image_tensor)
-                
-                if boxes is not None:
-                    faces = []
-                    for box, prob in zip(boxes[0], probs[0]):
-                        if prob > 0.9:  # Confidence threshold
-                            x1, y1, x2, y2 = box.astype(int)
-                            faces.append((x1, y1, x2-x1, y2-y1))
-                    return faces
+                results = []
+                for start in range(0, len(frames), self.batch_size):
+                    batch = torch.from_numpy(np.stack(frames[start:start + self.batch_size]))
+                    if self.device.type == 'cuda':
+                        batch = batch.pin_memory()
+                    batch = batch.to(self.device, non_blocking=True)
+                    results.extend(self.detect_faces_tensor(batch))
+                return results
             except Exception as e:
                 logger.warning(f"GPU face detection failed: {e}")
         
         # CPU fallback
-        return self.detect_faces_cpu(image)
+        return [self.detect_faces_cpu(frame) for frame in frames]
     
-    def detect_faces_cpu(self, image: np.ndarray) -> list:
-        """CPU-based face detection with optional GPU preprocessing."""
-        # Use GPU for image preprocessing if available
-        processed_image = gpu_manager.optimize_image_processing(image)
-        gray = cv2.cvtColor(processed_image, cv2.COLOR_BGR2GRAY)
+    def detect_faces_tensor(self, batch: torch.Tensor) -> list:
+        """Detect faces with MTCNN in frames that are already on the device.
+        
+        Only the boxes are copied back to the host, so the frames can go
+        on to the swap without another upload.
+        
+        Args:
+            batch: (N, H, W, 3) RGB tensor on self.device
+            
+        Returns:
+            List with one list of (x, y, w, h) face rectangles per frame
+        """
+        # MTCNN takes NHWC input and permutes it on the device
+        boxes, probs = self.mtcnn.detect(batch)
+        return [self._boxes_to_rects(frame_boxes, frame_probs)
+                for frame_boxes, frame_probs in zip(boxes, probs)]
+    
+    @staticmethod
+    def _boxes_to_rects(boxes, probs) -> list:
+        """Convert MTCNN corner boxes to (x, y, w, h) rectangles above the confidence threshold."""
+        if boxes is None:
+            return []
+        keep = np.asarray(boxes)[np.asarray(probs) > 0.9].astype(np.int32)  # Confidence threshold
+        rects = np.concatenate([keep[:, :2], keep[:, 2:] - keep[:, :2]], axis=1)
+        return [tuple(rect) for rect in rects.tolist()]
+    
+    def detect_faces_cpu(self, image: np.ndarray, src_is_rgb: bool = False) -> list:
+        """CPU-based face detection with optional GPU preprocessing.
+        
+        Args:
+            image: Input frame
+            src_is_rgb: True if the frame is RGB rather than OpenCV's BGR
+        """
+        if self.face_cascade is None:
+            # GPU hosts only get here once MTCNN has failed
+            self._init_cpu_detector()
         
         # Try DNN detector first
         if self.dnn_net is not None:
             try:
-                blob = cv2.dnn.blobFromImage(image, 1.0, (300, 300), [104, 117, 123])
-                self.dnn_net.setInput(blob)
+                self.dnn_net.setInput(self._make_blob(image, src_is_rgb))
                 detections = self.dnn_net.forward()
                 
                 faces = []
@@ -102,9 +225,18 @@ class FaceDetector:
             except:
                 pass
         
-        # Haar cascade fallback
+        # Haar cascade fallback, the only path that needs the filtered grayscale frame
+        processed_image = gpu_manager.optimize_image_processing(image)
+        gray = cv2.cvtColor(processed_image, cv2.COLOR_RGB2GRAY if src_is_rgb else cv2.COLOR_BGR2GRAY)
         faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
         return faces.tolist() if len(faces) > 0 else []
+    
+    def _make_blob(self, image: np.ndarray, src_is_rgb: bool = False) -> np.ndarray:
+        """Mean-subtracted NCHW BGR blob for the DNN detector, written into the reused buffers."""
+        cv2.resize(image, DNN_INPUT_SIZE, dst=self._dnn_input)
+        hwc = self._dnn_input[:, :, ::-1] if src_is_rgb else self._dnn_input
+        np.subtract(hwc.transpose(2, 0, 1), DNN_MEAN_BGR[:, None, None], out=self._blob[0])
+        return self._blob
 
     def detect_faces(self, image: np.ndarray) -> list:
         """Main face detection method that chooses optimal approach."""
@@ -2,34 +2,113 @@ import cv2
 import dlib
 import numpy as np
 import os
+import hashlib
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List, Tuple, Optional
 import logging
 
+import config
+from utils.video_utils import VideoUtils, CudaVideoReader
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except Exception:
+    ONNXRUNTIME_AVAILABLE = False
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Face chip geometry and per-channel RGB mean of dlib's recognition network input
+FACE_CHIP_SIZE = 150
+FACE_CHIP_PADDING = 0.25
+FACE_CHIP_MEAN = np.array([122.782, 117.001, 104.298], dtype=np.float32)
+
+# ONNX Runtime providers that run the FP16 recognition model; the rest get INT8
+ONNX_GPU_PROVIDERS = ('TensorrtExecutionProvider', 'CUDAExecutionProvider', 'CoreMLExecutionProvider')
+
+# dlib build flags for SIMD paths, with the OpenCV CPU feature ids (CV_CPU_AVX,
+# CV_CPU_NEON) they need; not every cv2 build exports the cv2.CPU_* names
+DLIB_SIMD_FEATURES = (('USE_AVX_INSTRUCTIONS', 10, 'AVX'), ('USE_NEON_INSTRUCTIONS', 100, 'NEON'))
+
+class FaceData:
+    """
+    A unique face found in a video and the swap assigned to it.
+    
+    Slotted so the per-frame lookups in the swap loop are plain attribute
+    loads. The smoother fields are filled in by FaceSwapper the first time
+    the face is swapped.
+    """
+    
+    __slots__ = ('image', 'encoding', 'rect', 'landmarks',
+                 'swap_image_path', 'swap_image', 'swap_landmarks',
+                 'landmark_smoother', 'mask_smoother', 'color_smoother')
+    
+    def __init__(self, image: np.ndarray, encoding: np.ndarray,
+                 rect: dlib.rectangle, landmarks: np.ndarray):
+        self.image = image
+        self.encoding = encoding
+        self.rect = rect
+        self.landmarks = landmarks
+        self.swap_image_path = None
+        self.swap_image = None
+        self.swap_landmarks = None
+        self.landmark_smoother = None
+        self.mask_smoother = None
+        self.color_smoother = None
+
 class FaceDetector:
     """
     Core face detection and recognition system using Dlib.
     Handles face detection, landmark prediction, and face encoding.
     """
     
-    def __init__(self, models_dir: str = "models", test_mode: bool = False):
+    def __init__(self, models_dir: str = "models", test_mode: bool = False,
+                 onnx_providers: Optional[list] = None):
         """
         Initialize the face detector with Dlib.
         
         Args:
             models_dir: Directory containing the Dlib model files
             test_mode: If True, skip model loading for testing
+            onnx_providers: ONNX Runtime execution providers for the optional
+                ONNX recognition model, by default the best available ones
         """
         self.models_dir = models_dir
         self.test_mode = test_mode
+        self.onnx_providers = onnx_providers
         self.detector = None
         self.predictor = None
+        # Per-thread HOG detectors; dlib's object_detector must not be shared
+        # by threads, so scan workers and the swap loop each build their own
+        self._thread_state = threading.local()
         self.face_encoder = None
+        self.onnx_encoder = None
+        self._onnx_input_dtype = np.float32
+        # File name of the loaded ONNX export; its precision changes the encodings
+        self._onnx_model_name = None
         self.unique_faces = []
+        # Cached is_ready_for_processing result, None once faces or swaps change
+        self._ready = None
+        # Encodings of unique_faces, one row per face, for vectorized matching
+        self._encoding_matrix = np.empty((0, 128), dtype=np.float32)
+        self._encoding_norms_sq = np.empty(0, dtype=np.float32)
         self.face_recognition_threshold = 0.6
+        self.face_detection_scale = config.CONFIG.face_detection_scale
+        self.detector_max_long_edge = config.CONFIG.detector_max_long_edge
+        self.scan_prefetch_frames = config.CONFIG.scan_prefetch_frames
+        self.scan_detect_workers = config.CONFIG.scan_detect_workers
+        self.scan_frame_skip = config.CONFIG.scan_frame_skip
+        self.scan_sample_fps = config.CONFIG.scan_sample_fps
+        if getattr(dlib, 'DLIB_USE_CUDA', False):
+            self.recognition_batch_size = config.CONFIG.recognition_batch_size_gpu
+        else:
+            self.recognition_batch_size = config.CONFIG.recognition_batch_size
         
         if not test_mode:
             self._load_models()
@@ -41,7 +120,9 @@ class FaceDetector:
         try:
             # Load face detector
             self.detector = dlib.get_frontal_face_detector()
+            self._thread_state.detector = self.detector
             logger.info("Face detector loaded successfully")
+            self._check_dlib_build()
             
             # Load facial landmark predictor
             predictor_path = os.path.join(self.models_dir, "shape_predictor_68_face_landmarks.dat")
@@ -59,17 +140,99 @@ class FaceDetector:
             self.face_encoder = dlib.face_recognition_model_v1(encoder_path)
             logger.info("Face recognition model loaded successfully")
             
+            self.onnx_encoder = self._load_onnx_encoder()
+            
         except Exception as e:
             logger.error(f"Error loading models: {e}")
             raise
     
-    def detect_faces(self, frame: np.ndarray, scale_factor: float = 0.5) -> List[dlib.rectangle]:
+    @staticmethod
+    def _check_dlib_build():
+        """Warn when dlib was built without SIMD instructions this CPU supports."""
+        # Detection, landmarks and encoding all run on dlib; without SIMD they are several times slower
+        for build_flag, cpu_feature, name in DLIB_SIMD_FEATURES:
+            if getattr(dlib, build_flag, None) is False and cv2.checkHardwareSupport(cpu_feature):
+                logger.warning(f"dlib was built without {name} instructions, which this CPU supports; "
+                               f"rebuild it with: python scripts/build.py native-dlib")
+    
+    def _load_onnx_encoder(self):
+        """
+        Create an ONNX Runtime session for the recognition network.
+        
+        An FP16 export is preferred on GPU execution providers and an INT8
+        one on the CPU, when present; otherwise the FP32 export is used.
+        
+        Returns:
+            InferenceSession, or None if onnxruntime or the exported model is missing
+        """
+        if not ONNXRUNTIME_AVAILABLE:
+            return None
+        
+        providers = self.onnx_providers or self._default_onnx_providers()
+        first = providers[0][0] if isinstance(providers[0], tuple) else providers[0]
+        on_gpu = first in ONNX_GPU_PROVIDERS
+        
+        variants = [config.FACE_RECOGNITION_ONNX_MODEL_FP16 if on_gpu else config.FACE_RECOGNITION_ONNX_MODEL_INT8,
+                    config.FACE_RECOGNITION_ONNX_MODEL]
+        for variant in variants:
+            onnx_path = os.path.join(self.models_dir, variant.name)
+            if not os.path.exists(onnx_path):
+                continue
+            try:
+                session = ort.InferenceSession(onnx_path, providers=providers)
+            except Exception as e:
+                logger.warning(f"Could not load ONNX face recognition model {variant.name}: {e}")
+                continue
+            
+            # FP16 exports without kept float32 I/O take half-precision input
+            if session.get_inputs()[0].type == 'tensor(float16)':
+                self._onnx_input_dtype = np.float16
+            logger.info(f"ONNX face recognition model {variant.name} loaded ({session.get_providers()[0]})")
+            self._onnx_model_name = variant.name
+            return session
+        
+        return None
+    
+    @staticmethod
+    def _default_onnx_providers() -> list:
+        """Fastest available ONNX Runtime execution providers, CPU last."""
+        available = ort.get_available_providers()
+        providers = []
+        if 'TensorrtExecutionProvider' in available:
+            providers.append(('TensorrtExecutionProvider', {'trt_fp16_enable': True}))
+        if 'CUDAExecutionProvider' in available:
+            providers.append(('CUDAExecutionProvider', {'cudnn_conv_algo_search': 'HEURISTIC'}))
+        if 'CoreMLExecutionProvider' in available:
+            providers.append('CoreMLExecutionProvider')
+        if 'OpenVINOExecutionProvider' in available:
+            providers.append('OpenVINOExecutionProvider')
+        providers.append('CPUExecutionProvider')
+        return providers
+    
+    def warm_up(self):
+        """
+        Run the recognition network once on a blank face chip.
+        
+        The first ONNX Runtime inference pays for cuDNN algorithm search and
+        TensorRT engine builds; doing it at startup keeps that out of the scan.
+        """
+        if self.onnx_encoder is None:
+            return
+        try:
+            self._encode_chips_onnx([np.zeros((FACE_CHIP_SIZE, FACE_CHIP_SIZE, 3), dtype=np.uint8)])
+        except Exception as e:
+            logger.warning(f"ONNX face recognition warm-up failed: {e}")
+    
+    def detect_faces(self, frame: np.ndarray, scale_factor: Optional[float] = None) -> List[dlib.rectangle]:
         """
         Detect faces in a frame.
         
         Args:
             frame: Input image frame
-            scale_factor: Scale factor for faster detection (smaller = faster)
+            scale_factor: Scale factor for faster detection (smaller = faster),
+                defaults to the configured face detection scale. The frame is
+                further downscaled if its long edge would exceed the
+                configured detector maximum.
             
         Returns:
             List of face rectangles
@@ -82,27 +245,43 @@ class FaceDetector:
             raise RuntimeError("Face detector not loaded")
             
         try:
+            if scale_factor is None:
+                scale_factor = self.face_detection_scale
+            scale_factor = min(scale_factor, self.detector_max_long_edge / max(frame.shape[:2]))
+            
             # Scale down for faster detection if needed
             if scale_factor < 1.0:
-                small_frame = cv2.resize(frame, None, fx=scale_factor, fy=scale_factor)
-                faces = self.detector(small_frame)
-                # Scale back up the coordinates
-                scaled_faces = []
-                for face in faces:
-                    scaled_face = dlib.rectangle(
-                        int(face.left() / scale_factor),
-                        int(face.top() / scale_factor),
-                        int(face.right() / scale_factor),
-                        int(face.bottom() / scale_factor)
-                    )
-                    scaled_faces.append(scaled_face)
-                return scaled_faces
+                small_frame = cv2.resize(frame, None, fx=scale_factor, fy=scale_factor,
+                                         interpolation=cv2.INTER_AREA)
+                faces = self._thread_detector()(small_frame)
+                if len(faces) == 0:
+                    return []
+                
+                # Scale back up the coordinates of all faces at once
+                boxes = np.array([(f.left(), f.top(), f.right(), f.bottom()) for f in faces], dtype=np.float64)
+                boxes = (boxes / scale_factor).astype(np.int64)
+                return [dlib.rectangle(*box) for box in boxes.tolist()]
             else:
-                return self.detector(frame)
+                return self._thread_detector()(frame)
         except Exception as e:
             logger.error(f"Error detecting faces: {e}")
             return []
     
+    def _thread_detector(self):
+        """
+        HOG face detector owned by the calling thread.
+        
+        dlib documents object_detector as unsafe for concurrent use, so each
+        thread gets its own; building one only unpacks the small embedded
+        model. The landmark predictor is shared, since dlib allows
+        shape_predictor to be used from several threads at once.
+        """
+        detector = getattr(self._thread_state, 'detector', None)
+        if detector is None:
+            detector = dlib.get_frontal_face_detector()
+            self._thread_state.detector = detector
+        return detector
+    
     def get_face_landmarks(self, frame: np.ndarray, face_rect: dlib.rectangle) -> np.ndarray:
         """
         Get 68 facial landmarks for a detected face.
@@ -115,8 +294,12 @@ class FaceDetector:
             Array of 68 (x, y) landmark coordinates
         """
         landmarks = self.predictor(frame, face_rect)
-        landmarks_array = np.array([[p.x, p.y] for p in landmarks.parts()])
-        return landmarks_array
+        return self.shape_to_array(landmarks)
+    
+    @staticmethod
+    def shape_to_array(shape) -> np.ndarray:
+        """Convert a dlib full_object_detection to an array of (x, y) points."""
+        return np.array([[p.x, p.y] for p in shape.parts()])
     
     def get_face_encoding(self, frame: np.ndarray, landmarks) -> np.ndarray:
         """
@@ -129,9 +312,63 @@ class FaceDetector:
         Returns:
             128-dimensional face encoding vector
         """
+        if self.onnx_encoder is not None:
+            chip = dlib.get_face_chip(frame, landmarks, size=FACE_CHIP_SIZE, padding=FACE_CHIP_PADDING)
+            return self._encode_chips_onnx([chip])[0]
+        
         face_encoding = self.face_encoder.compute_face_descriptor(frame, landmarks)
         return np.array(face_encoding)
     
+    def get_face_encodings_batch(self, frames: List[np.ndarray], shapes: list) -> List[List[np.ndarray]]:
+        """
+        Get face encodings for several frames in one pass of the recognition network.
+        
+        Args:
+            frames: Input image frames
+            shapes: dlib.full_object_detections of the faces in each frame
+            
+        Returns:
+            Per frame, the 128-dimensional encodings of its faces
+        """
+        if self.onnx_encoder is not None:
+            chips = []
+            for frame, frame_shapes in zip(frames, shapes):
+                chips.extend(dlib.get_face_chips(frame, frame_shapes, size=FACE_CHIP_SIZE,
+                                                 padding=FACE_CHIP_PADDING))
+            encodings = self._encode_chips_onnx(chips) if chips else []
+            
+            results = []
+            start = 0
+            for frame_shapes in shapes:
+                results.append(list(encodings[start:start + len(frame_shapes)]))
+                start += len(frame_shapes)
+            return results
+        
+        descriptors = self.face_encoder.compute_face_descriptor(frames, shapes)
+        return [[np.array(d) for d in frame_descriptors] for frame_descriptors in descriptors]
+    
+    def _encode_chips_onnx(self, chips: List[np.ndarray]) -> np.ndarray:
+        """
+        Run aligned RGB face chips through the ONNX recognition network in one batch.
+        
+        Args:
+            chips: 150x150 RGB face chips from dlib.get_face_chip(s)
+            
+        Returns:
+            (N, 128) array of face encodings
+        """
+        # Same input normalization as dlib's input_rgb_image_sized layer; the
+        # chips are already RGB, and blobFromImages subtracts, scales and
+        # writes NCHW float32 in a single pass
+        batch = cv2.dnn.blobFromImages(chips, 1.0 / 256.0, mean=tuple(FACE_CHIP_MEAN.tolist()),
+                                       swapRB=False, crop=False)
+        if self._onnx_input_dtype is not np.float32:
+            batch = batch.astype(self._onnx_input_dtype)
+        
+        input_name = self.onnx_encoder.get_inputs()[0].name
+        encodings = self.onnx_encoder.run(None, {input_name: batch})[0]
+        return encodings.reshape(len(chips), -1).astype(np.float64)
+    
     def crop_face(self, frame: np.ndarray, face_rect: dlib.rectangle, padding: int = 50) -> np.ndarray:
         """
         Crop face from frame with padding.
@@ -162,14 +399,20 @@ class FaceDetector:
             face_encoding: 128-dimensional face encoding
             
         Returns:
-            Index of matching face in unique_faces list, or None if no match
+            Index of the closest matching face in unique_faces list, or None if no match
         """
-        for i, unique_face in enumerate(self.unique_faces):
-            # Calculate Euclidean distance between encodings
-            distance = np.linalg.norm(face_encoding - unique_face['encoding'])
-            
-            if distance < self.face_recognition_threshold:
-                return i
+        if len(self._encoding_matrix) == 0:
+            return None
+        
+        # Squared Euclidean distances as |a|^2 - 2 a.b + |b|^2 with the stored
+        # norms, so matching costs one matrix-vector product
+        face_encoding = np.asarray(face_encoding, dtype=np.float32)
+        distances_sq = self._encoding_norms_sq - 2.0 * (self._encoding_matrix @ face_encoding)
+        distances_sq += face_encoding @ face_encoding
+        best_index = int(distances_sq.argmin())
+        
+        if distances_sq[best_index] < self.face_recognition_threshold ** 2:
+            return best_index
         
         return None
     
@@ -187,17 +430,14 @@ class FaceDetector:
         Returns:
             Index of the newly added face
         """
-        unique_face = {
-            'image': face_image,
-            'encoding': face_encoding,
-            'rect': face_rect,
-            'landmarks': landmarks,
-            'swap_image_path': None,
-            'swap_image': None,
-            'swap_landmarks': None
-        }
-        
-        self.unique_faces.append(unique_face)
+        # Own the crop: a view would keep its whole frame alive, and contiguous
+        # pixels let the face card wrap them in a QImage without another copy
+        face_image = np.ascontiguousarray(face_image)
+        self.unique_faces.append(FaceData(face_image, face_encoding, face_rect, landmarks))
+        self._ready = None
+        encoding_row = np.asarray(face_encoding, dtype=np.float32).reshape(1, -1)
+        self._encoding_matrix = np.vstack([self._encoding_matrix, encoding_row])
+        self._encoding_norms_sq = np.append(self._encoding_norms_sq, encoding_row[0] @ encoding_row[0])
         return len(self.unique_faces) - 1
     
     def set_swap_image(self, face_index: int, swap_image_path: str):
@@ -224,112 +464,395 @@ class FaceDetector:
             landmarks = self.get_face_landmarks(swap_image, face_rect)
             
             # Store swap image data
-            self.unique_faces[face_index]['swap_image_path'] = swap_image_path
-            self.unique_faces[face_index]['swap_image'] = swap_image
-            self.unique_faces[face_index]['swap_landmarks'] = landmarks
+            unique_face = self.unique_faces[face_index]
+            unique_face.swap_image_path = swap_image_path
+            unique_face.swap_image = swap_image
+            unique_face.swap_landmarks = landmarks
+            self._ready = None
             
             logger.info(f"Swap image set for face {face_index}: {swap_image_path}")
         else:
             raise IndexError(f"Face index {face_index} out of range")
     
-    def scan_video_for_faces(self, video_path: str, progress_callback=None) -> List[dict]:
+    def clear_swap_image(self, face_index: int):
+        """
+        Remove the swap image of a unique face.
+        
+        Args:
+            face_index: Index of face in unique_faces list
+        """
+        if 0 <= face_index < len(self.unique_faces):
+            unique_face = self.unique_faces[face_index]
+            unique_face.swap_image_path = None
+            unique_face.swap_image = None
+            unique_face.swap_landmarks = None
+            self._ready = None
+    
+    def scan_video_for_faces(self, video_path: str, progress_callback=None,
+                             cancel_event: Optional[threading.Event] = None,
+                             sample_fps: Optional[float] = None) -> List[FaceData]:
         """
         Scan entire video to find all unique faces.
         
         Args:
             video_path: Path to video file
             progress_callback: Optional callback function for progress updates
+            cancel_event: Optional event that stops the scan once set; a
+                cancelled scan is not written to the scan cache
+            sample_fps: Frames to analyze per second of video, defaulting to
+                the configured rate; zero analyzes every scan_frame_skip-th frame
             
         Returns:
             List of unique face dictionaries
         """
         # Clear existing faces
-        self.unique_faces = []
+        self.clear_unique_faces()
+        
+        # Skip frames for faster processing
+        frame_skip = self._scan_frame_skip(video_path, sample_fps)
+        
+        # Reuse the results of an earlier scan with the same settings
+        cache_path = self._scan_cache_path(video_path, frame_skip)
+        if cache_path is not None and self._load_scan_cache(cache_path):
+            logger.info(f"Loaded {len(self.unique_faces)} unique faces from scan cache: {video_path}")
+            if progress_callback:
+                progress_callback(100)
+            return self.unique_faces
         
         # Open video
-        cap = cv2.VideoCapture(video_path)
+        cap = VideoUtils.open_capture(video_path)
         if not cap.isOpened():
             raise ValueError(f"Could not open video: {video_path}")
         
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        frame_count = 0
+        total_frames = VideoUtils.get_frame_count(video_path, cap)
         
-        # Skip frames for faster processing (analyze every 10th frame)
-        frame_skip = 10
+        # Decode on the GPU when OpenCV was built with cudacodec; the CPU
+        # capture is only kept for the frame count
+        frames_are_rgb = False
+        gpu_reader = CudaVideoReader.open(video_path)
+        if gpu_reader is not None:
+            cap.release()
+            cap = gpu_reader
+            frames_are_rgb = True
+            logger.info("Decoding video on the GPU")
         
         logger.info(f"Scanning video for faces: {video_path}")
         logger.info(f"Total frames: {total_frames}, analyzing every {frame_skip}th frame")
         
+        # Frames are decoded on a reader thread so decoding overlaps with
+        # detection; the bounded queue keeps it at most a few frames ahead
+        frame_queue = queue.Queue(maxsize=self.scan_prefetch_frames)
+        stop_event = threading.Event()
+        reader = threading.Thread(
+            target=self._read_sampled_frames,
+            args=(cap, frame_skip, frame_queue, stop_event, frames_are_rgb),
+            name="FaceScanReader",
+            daemon=True
+        )
+        
+        # Sampled frames with faces, encoded together once the batch is full
+        pending = []
+        
         try:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
+            reader.start()
+            cancelled = False
+            # Detection and landmarks of several sampled frames run on a thread
+            # pool, each worker with its own detector; results still arrive in
+            # frame order, so unique faces are numbered as in a sequential scan
+            with ThreadPoolExecutor(max_workers=self.scan_detect_workers,
+                                    thread_name_prefix="FaceScanDetect") as pool:
+                for frame_count, rgb_frame, faces, shapes in self._detect_sampled_frames(
+                        frame_queue, pool, self.scan_detect_workers):
+                    if cancel_event is not None and cancel_event.is_set():
+                        cancelled = True
+                        break
+                    
+                    if len(faces) > 0:
+                        pending.append((frame_count, rgb_frame, list(faces), shapes))
+                    
+                    if len(pending) >= self.recognition_batch_size:
+                        self._add_faces_from_batch(pending)
+                        pending = []
+                    
+                    # Update progress
+                    if progress_callback:
+                        progress = (frame_count / total_frames) * 100
+                        progress_callback(progress)
+            
+            if pending and not cancelled:
+                self._add_faces_from_batch(pending)
+            
+            if cache_path is not None and not cancelled:
+                self._save_scan_cache(cache_path)
+        
+        finally:
+            stop_event.set()
+            # Unblock a reader waiting on a full queue
+            while reader.is_alive():
+                try:
+                    frame_queue.get_nowait()
+                except queue.Empty:
+                    reader.join(0.1)
+            cap.release()
+        
+        logger.info(f"Face scanning complete. Found {len(self.unique_faces)} unique faces.")
+        return self.unique_faces
+    
+    def _detect_sampled_frames(self, frame_queue: queue.Queue, pool: ThreadPoolExecutor, depth: int):
+        """
+        Detect faces in the frames of frame_queue, up to depth frames at a time.
+        
+        Args:
+            frame_queue: Queue of (frame_number, rgb_frame) items ending with None
+            pool: Executor that runs the detections
+            depth: Number of frames being detected concurrently
+            
+        Yields:
+            (frame_number, rgb_frame, face_rects, shapes) tuples in queue order
+        """
+        in_flight = deque()
+        while True:
+            item = frame_queue.get()
+            if item is None:
+                break
+            frame_number, rgb_frame = item
+            in_flight.append((frame_number, rgb_frame, pool.submit(self._detect_frame_faces, rgb_frame)))
+            if len(in_flight) >= depth:
+                frame_number, rgb_frame, future = in_flight.popleft()
+                yield (frame_number, rgb_frame) + future.result()
+        
+        while in_flight:
+            frame_number, rgb_frame, future = in_flight.popleft()
+            yield (frame_number, rgb_frame) + future.result()
+    
+    def _detect_frame_faces(self, rgb_frame: np.ndarray) -> tuple:
+        """Face rectangles and their landmark detections for one RGB frame."""
+        faces = self.detect_faces(rgb_frame)
+        shapes = dlib.full_object_detections()
+        for face_rect in faces:
+            shapes.append(self.predictor(rgb_frame, face_rect))
+        return faces, shapes
+    
+    def _scan_frame_skip(self, video_path: str, sample_fps: Optional[float] = None) -> int:
+        """
+        Sampling interval in frames for a scan of video_path.
+        
+        Args:
+            video_path: Path to video file
+            sample_fps: Frames to analyze per second of video, or None for
+                the configured rate
+            
+        Returns:
+            Every how many frames one is analyzed
+        """
+        if sample_fps is None:
+            sample_fps = self.scan_sample_fps
+        if sample_fps <= 0:
+            return self.scan_frame_skip
+        
+        # Only the container header is read for the frame rate
+        cap = cv2.VideoCapture(video_path)
+        source_fps = cap.get(cv2.CAP_PROP_FPS) if cap.isOpened() else 0.0
+        cap.release()
+        if source_fps <= 0:
+            return self.scan_frame_skip
+        return max(1, int(round(source_fps / sample_fps)))
+    
+    def _scan_cache_path(self, video_path: str, frame_skip: int) -> Optional[Path]:
+        """
+        Get the scan cache file for a video and the current scan settings.
+        
+        The key covers the video's path, size and modification time, so
+        editing or replacing the video invalidates its cache, and the
+        recognition model, since FP32, FP16 and INT8 exports give slightly
+        different encodings.
+        
+        Returns:
+            Path of the .npz cache file, or None if the video cannot be stat'ed
+        """
+        try:
+            stat = os.stat(video_path)
+        except OSError:
+            return None
+        
+        encoder = self._onnx_model_name if self.onnx_encoder is not None else 'dlib'
+        key_source = (f"{os.path.abspath(video_path)}|{stat.st_mtime_ns}|{stat.st_size}|{frame_skip}|"
+                      f"{self.face_detection_scale}|{self.detector_max_long_edge}|"
+                      f"{self.face_recognition_threshold}|{encoder}")
+        key = hashlib.sha1(key_source.encode()).hexdigest()
+        return config.SCAN_CACHE_DIR / f"{key}.npz"
+    
+    def _load_scan_cache(self, cache_path: Path) -> bool:
+        """
+        Rebuild unique_faces from a scan cache file.
+        
+        Returns:
+            True if the cache was loaded, False if it is missing or unreadable
+        """
+        if not cache_path.exists():
+            return False
+        
+        try:
+            with np.load(cache_path) as data:
+                encodings = data['encodings']
+                boxes = data['boxes']
+                landmarks = data['landmarks']
+                images = [data[f'image_{i}'] for i in range(len(encodings))]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable scan cache {cache_path}: {e}")
+            return False
+        
+        for face_image, face_encoding, box, face_landmarks in zip(images, encodings, boxes, landmarks):
+            face_rect = dlib.rectangle(*(int(v) for v in box))
+            self.add_unique_face(face_image, face_encoding, face_rect, face_landmarks)
+        return True
+    
+    def _save_scan_cache(self, cache_path: Path):
+        """Write the unique faces found by a scan to a scan cache file."""
+        arrays = {
+            'encodings': np.array([face.encoding for face in self.unique_faces]).reshape(-1, 128),
+            'boxes': np.array([[face.rect.left(), face.rect.top(),
+                                face.rect.right(), face.rect.bottom()]
+                               for face in self.unique_faces], dtype=np.int64).reshape(-1, 4),
+            'landmarks': np.array([face.landmarks for face in self.unique_faces]).reshape(-1, 68, 2),
+        }
+        for i, face in enumerate(self.unique_faces):
+            arrays[f'image_{i}'] = face.image
+        
+        partial_path = cache_path.with_suffix('.part')
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(partial_path, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(partial_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write scan cache {cache_path}: {e}")
+            try:
+                partial_path.unlink()
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _read_sampled_frames(cap, frame_skip: int, frame_queue: queue.Queue, stop_event: threading.Event,
+                             frames_are_rgb: bool = False):
+        """
+        Decode every frame_skip-th frame of cap onto frame_queue.
+        
+        Every frame is grabbed, but only sampled frames are retrieved, so
+        frames in between skip conversion and the copy out. Each sampled
+        frame is queued as (frame_number, rgb_frame), followed by None once
+        the video ends or stop_event is set.
+        
+        Args:
+            cap: Opened cv2.VideoCapture or CudaVideoReader
+            frame_skip: Sampling interval in frames
+            frame_queue: Bounded queue feeding the detection stage
+            stop_event: Set by the consumer to end reading early
+            frames_are_rgb: True if cap already returns RGB frames
+        """
+        frame_count = 0
+        try:
+            while not stop_event.is_set():
+                if not cap.grab():
                     break
-                
                 frame_count += 1
                 
                 # Skip frames for faster processing
                 if frame_count % frame_skip != 0:
                     continue
                 
-                # Convert BGR to RGB for Dlib
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
                 
-                # Detect faces in frame
-                faces = self.detect_faces(rgb_frame, scale_factor=0.5)
+                # Convert BGR to RGB for Dlib
+                rgb_frame = frame if frames_are_rgb else cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 
-                for face_rect in faces:
+                while not stop_event.is_set():
                     try:
-                        # Get landmarks and encoding
-                        landmarks = self.get_face_landmarks(rgb_frame, face_rect)
-                        dlib_landmarks = self.predictor(rgb_frame, face_rect)
-                        face_encoding = self.get_face_encoding(rgb_frame, dlib_landmarks)
-                        
-                        # Check if this is a new unique face
-                        similar_face_index = self.find_similar_face(face_encoding)
-                        
-                        if similar_face_index is None:
-                            # New unique face found
-                            face_image = self.crop_face(rgb_frame, face_rect)
-                            face_index = self.add_unique_face(face_image, face_encoding, face_rect, landmarks)
-                            logger.info(f"New unique face found: #{face_index}")
-                    
-                    except Exception as e:
-                        logger.warning(f"Error processing face in frame {frame_count}: {e}")
+                        frame_queue.put((frame_count, rgb_frame), timeout=0.1)
+                        break
+                    except queue.Full:
                         continue
-                
-                # Update progress
-                if progress_callback:
-                    progress = (frame_count / total_frames) * 100
-                    progress_callback(progress)
-        
+        except Exception as e:
+            logger.error(f"Error reading video frames: {e}")
         finally:
-            cap.release()
+            frame_queue.put(None)
+    
+    def _add_faces_from_batch(self, batch: list):
+        """
+        Encode the faces of a batch of sampled frames and record new unique faces.
         
-        logger.info(f"Face scanning complete. Found {len(self.unique_faces)} unique faces.")
-        return self.unique_faces
+        Args:
+            batch: List of (frame_number, rgb_frame, face_rects, shapes) tuples
+        """
+        try:
+            encodings = self.get_face_encodings_batch(
+                [rgb_frame for _, rgb_frame, _, _ in batch],
+                [shapes for _, _, _, shapes in batch]
+            )
+        except Exception as e:
+            logger.warning(f"Batched face encoding failed, encoding frames one by one: {e}")
+            encodings = None
+        
+        for i, (frame_number, rgb_frame, faces, shapes) in enumerate(batch):
+            for j, face_rect in enumerate(faces):
+                try:
+                    if encodings is not None:
+                        face_encoding = encodings[i][j]
+                    else:
+                        face_encoding = self.get_face_encoding(rgb_frame, shapes[j])
+                    
+                    # Check if this is a new unique face
+                    similar_face_index = self.find_similar_face(face_encoding)
+                    
+                    if similar_face_index is None:
+                        # New unique face found
+                        landmarks = self.shape_to_array(shapes[j])
+                        face_image = self.crop_face(rgb_frame, face_rect)
+                        face_index = self.add_unique_face(face_image, face_encoding, face_rect, landmarks)
+                        logger.info(f"New unique face found: #{face_index}")
+                
+                except Exception as e:
+                    logger.warning(f"Error processing face in frame {frame_number}: {e}")
+                    continue
     
-    def get_unique_faces(self) -> List[dict]:
+    def get_unique_faces(self) -> List[FaceData]:
         """Get the list of unique faces found."""
         return self.unique_faces
     
     def clear_unique_faces(self):
         """Clear all unique faces."""
         self.unique_faces = []
+        self._encoding_matrix = np.empty((0, 128), dtype=np.float32)
+        self._encoding_norms_sq = np.empty(0, dtype=np.float32)
+        self._ready = None
         logger.info("Unique faces cleared")
-    
+
+    def set_unique_faces(self, faces: List[FaceData]):
+        """
+        Replace the unique faces, keeping their assigned swap images.
+
+        Args:
+            faces: Faces found by another detector, e.g. the GUI's detector
+                handing its scan results to the video worker process
+        """
+        self.unique_faces = list(faces)
+        encodings = [np.asarray(face.encoding, dtype=np.float32).reshape(-1) for face in self.unique_faces]
+        self._encoding_matrix = np.array(encodings, dtype=np.float32).reshape(-1, 128)
+        self._encoding_norms_sq = np.einsum('ij,ij->i', self._encoding_matrix, self._encoding_matrix)
+        self._ready = None
+
     def is_ready_for_processing(self) -> bool:
         """Check if all unique faces have swap images assigned."""
-        if not self.unique_faces:
-            return False
-        
-        for face in self.unique_faces:
-            if face['swap_image_path'] is None:
-                return False
-        
-        return True
+        # Recomputed only after faces or swap images changed
+        if self._ready is None:
+            self._ready = bool(self.unique_faces) and all(
+                face.swap_image_path is not None for face in self.unique_faces
+            )
+        return self._ready
     
-    def get_face_match(self, face_encoding: np.ndarray) -> Optional[dict]:
+    def get_face_match(self, face_encoding: np.ndarray) -> Optional[FaceData]:
         """
         Find the best matching unique face for a given encoding.
         
@@ -1,3 +1,4 @@
+import functools
 import cv2
 import numpy as np
 import torch
@@ -7,28 +8,59 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=64)
+def _blending_mask(h: int, w: int, device: str, dtype: torch.dtype = torch.float32) -> torch.Tensor:
+    """Soft circular (1, 1, h, w) blending mask, cached per size, device and dtype."""
+    center_x, center_y = w // 2, h // 2
+    
+    # Squared distance from center via broadcasting a column against a row
+    dx2 = (torch.arange(w, device=device, dtype=torch.float32) - center_x).pow_(2)
+    dy2 = (torch.arange(h, device=device, dtype=torch.float32) - center_y).pow_(2)
+    dist = (dy2[:, None] + dx2[None, :]).sqrt_()
+    
+    # Create soft circular mask
+    radius = min(w, h) // 3
+    mask = (1.0 - dist / radius).clamp_(0, 1)
+    
+    # Broadcasts over the channel dimension of (1, 3, h, w) images
+    return mask[None, None].to(dtype)
+
+@functools.lru_cache(maxsize=64)
+def _gaussian_mask(h: int, w: int) -> np.ndarray:
+    """Separable Gaussian (h, w, 1) alpha mask peaking at 1 in the center, cached per size."""
+    mask = cv2.getGaussianKernel(h, h / 4) @ cv2.getGaussianKernel(w, w / 4).T
+    mask = (mask / mask.max()).astype(np.float32)[:, :, None]
+    mask.flags.writeable = False
+    return mask
+
 class FaceSwapper:
     def __init__(self):
         self.device = gpu_manager.device
         self.batch_size = gpu_manager.get_optimal_batch_size()
         
+        # Reused page-locked staging buffer for host-to-device uploads, grown
+        # but never shrunk, and the event marking when its last upload has finished
+        self._pinned = None
+        self._upload_done = None
+        
+        # Reused device buffer that swapped frames are written into
+        self._scratch = None
+        
+        # Half precision face math on GPUs with tensor cores (Volta and newer)
+        self.use_fp16 = (self.device.type == 'cuda'
+                         and torch.cuda.get_device_capability(self.device) >= (7, 0))
+        if self.use_fp16:
+            torch.set_float32_matmul_precision('high')
+        
     def swap_faces_gpu(self, source_image: np.ndarray, target_image: np.ndarray, 
                       source_face: tuple, target_face: tuple) -> np.ndarray:
         """GPU-accelerated face swapping."""
         try:
             # Convert to tensors and move to GPU
-            source_tensor = self._image_to_tensor(source_image).to(self.device)
-            target_tensor = self._image_to_tensor(target_image).to(self.device)
+            source_tensor = self._image_to_tensor(source_image)
+            target_tensor = self._image_to_tensor(target_image)
             
-            # Extract face regions
-            source_face_tensor = self._extract_face_tensor(source_tensor, source_face)
-            target_face_tensor = self._extract_face_tensor(target_tensor, target_face)
-            
-            # Perform GPU-accelerated blending and transformation
-            swapped_face = self._blend_faces_gpu(source_face_tensor, target_face_tensor)
-            
-            # Insert back into target image
-            result = self._insert_face_gpu(target_tensor, swapped_face, target_face)
+            result = self.swap_faces_gpu_tensor(source_tensor, target_tensor, source_face, target_face)
             
             # Convert back to numpy
             return self._tensor_to_image(result)
@@ -37,19 +69,114 @@ class FaceSwapper:
             logger.warning(f"GPU face swap failed: {e}, falling back to CPU")
             return self.swap_faces_cpu(source_image, target_image, source_face, target_face)
     
+    def swap_faces_gpu_tensor(self, source_tensor: torch.Tensor, target_tensor: torch.Tensor,
+                              source_face: tuple, target_face: tuple) -> torch.Tensor:
+        """
+        Face swap on images that are already on the device.
+        
+        Takes and returns (1, 3, H, W) RGB float tensors in [0, 1], so frames
+        can stay on the GPU across several operations and are only copied
+        back to the host when they are written out. The result lives in a
+        buffer that the next swap call reuses.
+        """
+        return self.swap_all_faces_gpu_tensor(target_tensor, [(source_tensor, source_face, target_face)])
+    
+    def swap_all_faces_gpu_tensor(self, target_tensor: torch.Tensor, swaps: list) -> torch.Tensor:
+        """
+        Swap several faces into one device-resident frame with a single frame copy.
+        
+        Args:
+            target_tensor: (1, 3, H, W) RGB float frame
+            swaps: List of (source_tensor, source_face, target_face) tuples
+            
+        Returns:
+            The swapped frame, held in a buffer that the next swap call reuses
+        """
+        with torch.autocast(device_type='cuda', dtype=torch.float16, enabled=self.use_fp16):
+            faces = []
+            for source_tensor, source_face, target_face in swaps:
+                # Extract face regions
+                source_face_tensor = self._extract_face_tensor(source_tensor, source_face)
+                target_face_tensor = self._extract_face_tensor(target_tensor, target_face)
+                if self.use_fp16:
+                    source_face_tensor = source_face_tensor.half()
+                    target_face_tensor = target_face_tensor.half()
+                
+                # Perform GPU-accelerated blending and transformation
+                faces.append((self._blend_faces_gpu(source_face_tensor, target_face_tensor), target_face))
+            
+            # Insert back into target image
+            return self._insert_faces_gpu(target_tensor, faces)
+    
+    def swap_frame_gpu(self, frame: np.ndarray, source_tensor: torch.Tensor, source_face: tuple,
+                       face_detector) -> np.ndarray:
+        """
+        Detect and swap every face in a frame with one upload and one download.
+        
+        The frame is uploaded once and detection, swapping and blending all
+        work on that device tensor; only the face boxes come back to the host
+        before the finished frame is downloaded.
+        
+        Args:
+            frame: BGR uint8 frame
+            source_tensor: (1, 3, H, W) RGB float source image from _image_to_tensor,
+                uploaded once and reused for every frame
+            source_face: (x, y, w, h) of the face in the source image
+            face_detector: face_detection.FaceDetector with MTCNN loaded on this device
+            
+        Returns:
+            The frame with every detected face swapped
+        """
+        frame_rgb = self._upload(frame).flip(-1)
+        frame_h, frame_w = frame.shape[:2]
+        
+        swaps = []
+        for x, y, w, h in face_detector.detect_faces_tensor(frame_rgb.unsqueeze(0))[0]:
+            # MTCNN boxes may reach past the frame edges
+            x0, y0 = max(x, 0), max(y, 0)
+            x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+            if x1 > x0 and y1 > y0:
+                swaps.append((source_tensor, source_face, (x0, y0, x1 - x0, y1 - y0)))
+        if not swaps:
+            return frame
+        
+        target_tensor = frame_rgb.permute(2, 0, 1).unsqueeze(0).float().mul_(1.0 / 255.0)
+        return self._tensor_to_image(self.swap_all_faces_gpu_tensor(target_tensor, swaps))
+    
     def _image_to_tensor(self, image: np.ndarray) -> torch.Tensor:
-        """Convert numpy image to tensor."""
-        # Convert BGR to RGB and normalize
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        tensor = torch.from_numpy(image_rgb).float() / 255.0
-        return tensor.permute(2, 0, 1).unsqueeze(0)  # CHW format with batch dimension
+        """Upload a BGR uint8 image as a (1, 3, H, W) RGB float tensor on the device."""
+        # HWC -> CHW, BGR -> RGB and normalization happen on the device
+        tensor = self._upload(image).permute(2, 0, 1).flip(0).unsqueeze(0)
+        return tensor.float().mul_(1.0 / 255.0)
+    
+    def _upload(self, image: np.ndarray) -> torch.Tensor:
+        """Copy a uint8 HWC image to the device as is."""
+        host = torch.from_numpy(np.ascontiguousarray(image))
+        
+        if self.device.type == 'cuda':
+            # Stage through pinned memory so the copy can run asynchronously
+            if self._upload_done is not None:
+                self._upload_done.synchronize()
+            # Source images and frames differ in shape; both go through a view
+            # of one allocation, which is only replaced when an image outgrows it
+            size = host.numel()
+            if self._pinned is None or self._pinned.numel() < size:
+                self._pinned = torch.empty(size, dtype=torch.uint8, pin_memory=True)
+            staging = self._pinned[:size].view(host.shape)
+            staging.copy_(host)
+            tensor = staging.to(self.device, non_blocking=True)
+            self._upload_done = torch.cuda.Event()
+            self._upload_done.record()
+        else:
+            tensor = host.to(self.device)
+        return tensor
     
     def _tensor_to_image(self, tensor: torch.Tensor) -> np.ndarray:
         """Convert tensor back to numpy image."""
-        # Move to CPU and convert
-        image = tensor.squeeze(0).permute(1, 2, 0).cpu().numpy()
-        image = (image * 255).astype(np.uint8)
-        return cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        # RGB -> BGR and quantization on the device, then a single uint8 download
+        image = tensor.squeeze(0).flip(0).permute(1, 2, 0)
+        image = (image * 255).to(torch.uint8)
+        return np.ascontiguousarray(image.cpu().numpy())
     
     def _extract_face_tensor(self, image_tensor: torch.Tensor, face_coords: tuple) -> torch.Tensor:
         """Extract face region as tensor."""
@@ -63,43 +190,38 @@ class FaceSwapper:
         source_resized = F.interpolate(source_face, size=target_size, mode='bilinear', align_corners=False)
         
         # Create blending mask using GPU operations
-        mask = self._create_blending_mask_gpu(target_size)
+        mask = self._create_blending_mask_gpu(target_size, source_resized.dtype)
         
         # Perform blending
         blended = source_resized * mask + target_face * (1 - mask)
         
         return blended
     
-    def _create_blending_mask_gpu(self, size: tuple) -> torch.Tensor:
+    def _create_blending_mask_gpu(self, size: tuple, dtype: torch.dtype = torch.float32) -> torch.Tensor:
         """Create a smooth blending mask on GPU."""
         h, w = size
-        center_x, center_y = w // 2, h // 2
-        
-        # Create coordinate grids
-        y, x = torch.meshgrid(torch.arange(h, device=self.device), 
-                             torch.arange(w, device=self.device), indexing='ij')
-        
-        # Calculate distance from center
-        dist = torch.sqrt((x - center_x)**2 + (y - center_y)**2)
-        
-        # Create soft circular mask
-        radius = min(w, h) // 3
-        mask = torch.clamp(1.0 - dist / radius, 0, 1)
-        
-        # Add batch and channel dimensions
-        return mask.unsqueeze(0).unsqueeze(0).repeat(1, 3, 1, 1)
+        return _blending_mask(int(h), int(w), str(self.device), dtype)
     
     def _insert_face_gpu(self, target_image: torch.Tensor, face: torch.Tensor, 
                         face_coords: tuple) -> torch.Tensor:
         """Insert blended face back into target image."""
-        x, y, w, h = face_coords
-        result = target_image.clone()
-        
-        # Resize face to exact coordinates
-        face_resized = F.interpolate(face, size=(h, w), mode='bilinear', align_corners=False)
+        return self._insert_faces_gpu(target_image, [(face, face_coords)])
+    
+    def _insert_faces_gpu(self, target_image: torch.Tensor, faces: list) -> torch.Tensor:
+        """Insert blended faces into a copy of the target image kept in a reused buffer."""
+        if (self._scratch is None or self._scratch.shape != target_image.shape
+                or self._scratch.dtype != target_image.dtype or self._scratch.device != target_image.device):
+            self._scratch = torch.empty_like(target_image)
+        result = self._scratch
+        if result.data_ptr() != target_image.data_ptr():
+            result.copy_(target_image)
         
-        # Insert face
-        result[:, :, y:y+h, x:x+w] = face_resized
+        for face, (x, y, w, h) in faces:
+            # Resize face to exact coordinates
+            face_resized = F.interpolate(face, size=(h, w), mode='bilinear', align_corners=False)
+            
+            # Insert face
+            result[:, :, y:y+h, x:x+w] = face_resized
         
         return result
     
@@ -118,16 +240,16 @@ class FaceSwapper:
         source_face_img = source_processed[y1:y1+h1, x1:x1+w1]
         target_face_img = target_processed[y2:y2+h2, x2:x2+w2]
         
-        # Resize source face to match target face
-        source_face_resized = cv2.resize(source_face_img, (w2, h2))
+        # Feathered alpha blend of the resized source face into the target region
+        roi = target_face_img
+        h, w = roi.shape[:2]
+        source_face_resized = cv2.resize(source_face_img, (w, h))
+        mask = _gaussian_mask(h, w)
         
-        # Create seamless clone
-        center = (x2 + w2//2, y2 + h2//2)
-        mask = 255 * np.ones(source_face_resized.shape, source_face_resized.dtype)
+        blended = roi + mask * (source_face_resized.astype(np.float32) - roi)
+        np.copyto(roi, blended, casting='unsafe')
         
-        result = cv2.seamlessClone(source_face_resized, target_processed, mask, center, cv2.NORMAL_CLONE)
-        
-        return result
+        return target_processed
     
     def swap_faces(self, source_image: np.ndarray, target_image: np.ndarray,
                   source_face: tuple, target_face: tuple) -> np.ndarray:
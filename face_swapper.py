@@ -1,7 +1,7 @@
 import cv2
 import numpy as np
 import dlib
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 import logging
 
 # Set up logging
@@ -15,6 +15,12 @@ from utils import warps
 from utils import blending
 from utils import color_match
 
+# Margin kept around the source face crop, as a fraction of the face size
+SOURCE_CROP_MARGIN = 0.3
+# Tracker used when the configured type is missing; KCF and CSRT are only in
+# opencv-contrib, MIL ships with every OpenCV build
+FALLBACK_TRACKER_TYPE = 'MIL'
+
 class FaceSwapper:
     """
     Face swapping engine using 2D affine transformation and Poisson blending.
@@ -23,16 +29,180 @@ class FaceSwapper:
     
     def __init__(self):
         """Initialize the face swapper and configure smoothing/warping/blending."""
-        self.blend_method = getattr(config, 'BLEND_METHOD', cv2.NORMAL_CLONE)
-        self.warp_mode = getattr(config, 'WARP_MODE', 'delaunay')
-        self.smooth_method = getattr(config, 'SMOOTHING_METHOD', 'one_euro')
-        self.smooth_params = getattr(config, 'SMOOTHING_PARAMS', {})
-        self.blend_mode = getattr(config, 'BLEND_MODE', 'laplacian')
-        self.laplacian_levels = getattr(config, 'LAPLACIAN_LEVELS', 4)
-        self.adaptive_feather = getattr(config, 'ADAPTIVE_FEATHER_RADIUS', 20)
-        self.enable_color = getattr(config, 'ENABLE_COLOR_MATCHING', True)
-        self.color_strength = getattr(config, 'COLOR_MATCH_STRENGTH', 0.9)
-        self.color_temporal_alpha = getattr(config, 'COLOR_TEMPORAL_ALPHA', 0.6)
+        settings = config.CONFIG
+        self.blend_method = config.get_blend_method()
+        self.warp_mode = settings.warp_mode
+        self.smooth_method = settings.smoothing_method
+        self.smooth_params = settings.smoothing_params
+        self.blend_mode = settings.blend_mode
+        self.laplacian_levels = settings.laplacian_levels
+        self.adaptive_feather = settings.adaptive_feather_radius
+        self.mask_feather = settings.mask_feather_amount
+        self.enable_color = settings.enable_color_matching
+        self.color_strength = settings.color_match_strength
+        self.color_correction_strength = settings.color_correction_strength
+        self.color_temporal_alpha = settings.color_temporal_alpha
+        self.mask_smooth_method = settings.mask_smooth_method
+        self.detector_step = settings.detector_step
+        self.tracker_type = settings.tracker_type
+        self.track_reseed_iou = settings.track_reseed_iou
+        # Feathered mask buffer reused across frames and the region dirtied last time
+        self._mask_buf = None
+        self._mask_roi = None
+        # RGB copy of the current frame for dlib, reused across frames
+        self._rgb_buf = None
+        self.reset_tracking()
+        self._tracker_factory = self._find_tracker_factory(self.tracker_type)
+        if self._tracker_factory is None and self.tracker_type != FALLBACK_TRACKER_TYPE:
+            self._tracker_factory = self._find_tracker_factory(FALLBACK_TRACKER_TYPE)
+            if self._tracker_factory is not None:
+                logger.info(f"OpenCV tracker '{self.tracker_type}' not available, "
+                            f"using '{FALLBACK_TRACKER_TYPE}'")
+        if self._tracker_factory is None:
+            logger.info(f"OpenCV tracker '{self.tracker_type}' not available, detecting faces on every frame")
+    
+    def reset_tracking(self):
+        """Drop tracked faces; call before processing a new video."""
+        self._frame_index = 0
+        self._tracks = []
+        self._source_cache = {}
+    
+    def _source_entry(self, source_image: np.ndarray, source_landmarks: np.ndarray) -> dict:
+        """
+        Source-side data for a swap image, computed once and reused every frame.
+        
+        The swap image and its landmarks do not change during a video, so
+        the face is cropped out of the (often much larger) source photo once
+        and its landmarks are shifted into the crop.
+        
+        Args:
+            source_image: Source face image
+            source_landmarks: Source face landmarks
+            
+        Returns:
+            Dictionary with the cropped 'image', matching 'landmarks' and
+            the landmarks' Delaunay 'triangles'
+        """
+        entry = self._source_cache.get(id(source_image))
+        if entry is not None and entry['source'] is source_image and entry['source_landmarks'] is source_landmarks:
+            return entry
+        
+        points = np.asarray(source_landmarks)
+        x, y, w, h = cv2.boundingRect(points.astype(np.int32))
+        margin = int(max(w, h) * SOURCE_CROP_MARGIN) + 1
+        x0, y0 = max(x - margin, 0), max(y - margin, 0)
+        x1 = min(x + w + margin, source_image.shape[1])
+        y1 = min(y + h + margin, source_image.shape[0])
+        
+        crop = np.ascontiguousarray(source_image[y0:y1, x0:x1])
+        landmarks = points - (x0, y0)
+        
+        # Landmark connectivity is the same from frame to frame, so triangulate once
+        triangles = warps.get_delaunay_triangles(landmarks, (0, 0, crop.shape[1], crop.shape[0]))
+        
+        entry = {
+            'source': source_image,
+            'source_landmarks': source_landmarks,
+            'image': crop,
+            'landmarks': landmarks,
+            'triangles': np.asarray(triangles, dtype=np.int32).reshape(-1, 3),
+        }
+        self._source_cache[id(source_image)] = entry
+        return entry
+    
+    @staticmethod
+    def _find_tracker_factory(tracker_type: str):
+        """Constructor of an OpenCV tracker type, or None if this OpenCV build lacks it."""
+        name = f"Tracker{tracker_type}_create"
+        factory = getattr(cv2, name, None)
+        if factory is None and hasattr(cv2, 'legacy'):
+            factory = getattr(cv2.legacy, name, None)
+        return factory
+    
+    def _create_tracker(self):
+        """Create an OpenCV tracker of the configured or fallback type, or None if unavailable."""
+        return self._tracker_factory() if self._tracker_factory is not None else None
+    
+    @staticmethod
+    def _rect_iou(a: dlib.rectangle, b: dlib.rectangle) -> float:
+        """Intersection over union of two dlib rectangles."""
+        inter = a.intersect(b)
+        inter_area = inter.area() if not inter.is_empty() else 0
+        union_area = a.area() + b.area() - inter_area
+        return inter_area / union_area if union_area > 0 else 0.0
+    
+    def _detect_targets(self, frame: np.ndarray, rgb_frame: np.ndarray, face_detector) -> list:
+        """
+        Run full detection and re-seed trackers.
+        
+        Returns:
+            List of (face_rect, matched_face, shape) tuples, where shape is the
+            dlib landmark detection if one was computed for matching, else None
+        """
+        previous_tracks = self._tracks
+        self._tracks = []
+        
+        # Reuse the identity of an overlapping tracked face instead of re-encoding
+        targets = []
+        unmatched = []
+        for face_rect in face_detector.detect_faces(rgb_frame):
+            matched_face = None
+            for track in previous_tracks:
+                if self._rect_iou(face_rect, track['rect']) >= self.track_reseed_iou:
+                    matched_face = track['face']
+                    break
+            
+            targets.append((face_rect, matched_face, None))
+            if matched_face is None:
+                unmatched.append(len(targets) - 1)
+        
+        # Encode the remaining faces together in one recognition pass
+        if unmatched:
+            try:
+                shapes = dlib.full_object_detections()
+                for i in unmatched:
+                    shapes.append(face_detector.predictor(rgb_frame, targets[i][0]))
+                encodings = face_detector.get_face_encodings_batch([rgb_frame], [shapes])[0]
+                
+                for i, shape, face_encoding in zip(unmatched, shapes, encodings):
+                    targets[i] = (targets[i][0], face_detector.get_face_match(face_encoding), shape)
+            except Exception as e:
+                logger.warning(f"Error matching faces in frame: {e}")
+        
+        for face_rect, matched_face, _ in targets:
+            try:
+                tracker = self._create_tracker()
+                if tracker is not None:
+                    box = (face_rect.left(), face_rect.top(), face_rect.width(), face_rect.height())
+                    tracker.init(frame, box)
+                    self._tracks.append({'tracker': tracker, 'rect': face_rect, 'face': matched_face})
+            except Exception as e:
+                logger.warning(f"Error starting face tracker: {e}")
+                continue
+        
+        return targets
+    
+    def _track_targets(self, frame: np.ndarray) -> list:
+        """
+        Advance trackers to the current frame, dropping the ones that lost their face.
+        
+        Returns:
+            List of (face_rect, matched_face, None) tuples
+        """
+        targets = []
+        live_tracks = []
+        
+        for track in self._tracks:
+            ok, box = track['tracker'].update(frame)
+            if not ok:
+                continue
+            x, y, w, h = (int(v) for v in box)
+            track['rect'] = dlib.rectangle(x, y, x + w, y + h)
+            live_tracks.append(track)
+            targets.append((track['rect'], track['face'], None))
+        
+        self._tracks = live_tracks
+        return targets
         
     def get_convex_hull_mask(self, landmarks: np.ndarray, frame_shape: Tuple[int, int]) -> np.ndarray:
         """
@@ -45,6 +215,17 @@ class FaceSwapper:
         Returns:
             Binary mask of the face region
         """
+        hull = self._face_hull(landmarks)
+        
+        # Create mask
+        mask = np.zeros(frame_shape[:2], dtype=np.uint8)
+        cv2.fillPoly(mask, [hull], 255)
+        
+        return mask
+    
+    @staticmethod
+    def _face_hull(landmarks: np.ndarray) -> np.ndarray:
+        """Convex hull of the jawline and eyebrow landmarks."""
         # Use jawline, eyebrows, and forehead points for better coverage
         # Points for face boundary (jawline + forehead)
         face_boundary_points = np.concatenate([
@@ -54,13 +235,7 @@ class FaceSwapper:
         ])
         
         # Create convex hull
-        hull = cv2.convexHull(face_boundary_points)
-        
-        # Create mask
-        mask = np.zeros(frame_shape[:2], dtype=np.uint8)
-        cv2.fillPoly(mask, [hull], 255)
-        
-        return mask
+        return cv2.convexHull(face_boundary_points)
     
     def get_delaunay_triangulation(self, landmarks: np.ndarray, frame_shape: Tuple[int, int]) -> list:
         """
@@ -73,46 +248,22 @@ class FaceSwapper:
         Returns:
             List of triangle indices
         """
-        h, w = frame_shape[:2]
+        # Frame corners and Subdiv2D rectangle are fixed for a given frame size
+        context = warps.frame_context(*frame_shape[:2])
         
         # Add corner points to landmarks for better triangulation
-        corner_points = np.array([
-            [0, 0], [w-1, 0], [w-1, h-1], [0, h-1]
-        ])
-        
-        # Combine landmarks with corner points
-        all_points = np.vstack([landmarks, corner_points])
+        all_points = np.vstack([landmarks, context['corners']])
         
         # Create rectangle for Delaunay triangulation
-        rect = (0, 0, w, h)
-        subdiv = cv2.Subdiv2D(rect)
+        subdiv = cv2.Subdiv2D(context['rect'])
         
         # Insert points
         for point in all_points:
             subdiv.insert((int(point[0]), int(point[1])))
         
-        # Get triangles
+        # Get triangles as indices into all_points
         triangle_list = subdiv.getTriangleList()
-        triangles = []
-        
-        for t in triangle_list:
-            # Convert triangle coordinates to point indices
-            pt1 = (int(t[0]), int(t[1]))
-            pt2 = (int(t[2]), int(t[3]))
-            pt3 = (int(t[4]), int(t[5]))
-            
-            # Find indices of these points
-            indices = []
-            for pt in [pt1, pt2, pt3]:
-                for i, point in enumerate(all_points):
-                    if abs(point[0] - pt[0]) < 1 and abs(point[1] - pt[1]) < 1:
-                        indices.append(i)
-                        break
-            
-            if len(indices) == 3:
-                triangles.append(indices)
-        
-        return triangles
+        return warps.triangle_list_to_indices(triangle_list, all_points.astype(int), max_distance=1.0).tolist()
     
     def warp_triangle(self, src_img: np.ndarray, dst_img: np.ndarray,
                      src_tri: np.ndarray, dst_tri: np.ndarray) -> np.ndarray:
@@ -159,50 +310,21 @@ class FaceSwapper:
         mask = np.zeros((dst_rect[3], dst_rect[2]), dtype=np.uint8)
         cv2.fillPoly(mask, [dst_tri_offset.astype(np.int32)], 255)
         
-        # Apply mask to warped image
-        warped_masked = cv2.bitwise_and(warped, warped, mask=mask)
-        
-        # Create inverse mask
-        mask_inv = cv2.bitwise_not(mask)
+        # Copy the warped triangle into the destination where the mask is set
         dst_area = dst_img[dst_rect[1]:dst_rect[1] + dst_rect[3],
                           dst_rect[0]:dst_rect[0] + dst_rect[2]]
-        dst_area_masked = cv2.bitwise_and(dst_area, dst_area, mask=mask_inv)
-        
-        # Combine warped triangle with destination
-        final_area = cv2.add(dst_area_masked, warped_masked)
-        dst_img[dst_rect[1]:dst_rect[1] + dst_rect[3],
-               dst_rect[0]:dst_rect[0] + dst_rect[2]] = final_area
+        cv2.copyTo(warped, mask, dst_area)
         
         return dst_img
     
     def align_face_simple(self, src_image: np.ndarray, src_landmarks: np.ndarray,
                          dst_landmarks: np.ndarray, frame_shape: Tuple[int, int]) -> np.ndarray:
         """Simple face alignment using affine transformation on key points."""
-        # Use key facial points for alignment (eyes and mouth)
-        src_points = np.array([
-            np.mean(src_landmarks[36:42], axis=0),  # Left eye
-            np.mean(src_landmarks[42:48], axis=0),  # Right eye
-            np.mean(src_landmarks[48:68], axis=0),  # Mouth
-        ], dtype=np.float32)
-        
-        dst_points = np.array([
-            np.mean(dst_landmarks[36:42], axis=0),  # Left eye
-            np.mean(dst_landmarks[42:48], axis=0),  # Right eye
-            np.mean(dst_landmarks[48:68], axis=0),  # Mouth
-        ], dtype=np.float32)
-        
-        # Calculate transformation matrix
-        transform_matrix = cv2.getAffineTransform(src_points, dst_points)
-        
-        # Warp source image
-        aligned_face = cv2.warpAffine(src_image, transform_matrix,
-                                    (frame_shape[1], frame_shape[0]),
-                                    flags=cv2.INTER_LINEAR)
-        
-        return aligned_face
+        # Eye and mouth centers, warped only over the region the source lands on
+        return warps.apply_affine_warp(src_image, src_landmarks, dst_landmarks, frame_shape)
     
     def color_correct_face(self, src_face: np.ndarray, dst_face: np.ndarray,
-                          landmarks: np.ndarray) -> np.ndarray:
+                          landmarks: np.ndarray, strength: Optional[float] = None) -> np.ndarray:
         """
         Apply color correction to match the target face's lighting.
         
@@ -210,67 +332,90 @@ class FaceSwapper:
             src_face: Source face region
             dst_face: Target face region
             landmarks: Facial landmarks for mask creation
+            strength: 0 keeps the source colors, 1 fully matches the target's
+                mean color; defaults to the configured color correction strength
             
         Returns:
             Color-corrected source face
         """
-        # Create mask for face region
-        mask = self.get_convex_hull_mask(landmarks, src_face.shape)
+        if strength is None:
+            strength = self.color_correction_strength
+        # Create mask for face region, only over the hull's bounding box
+        hull = self._face_hull(landmarks)
+        x, y, w, h = cv2.boundingRect(hull)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, src_face.shape[1]), min(y + h, src_face.shape[0])
+        if x1 <= x0 or y1 <= y0:
+            return src_face
+        mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        cv2.fillPoly(mask, [hull - (x0, y0)], 255)
         
         # Calculate mean colors in face region
-        src_mean = cv2.mean(src_face, mask=mask)[:3]
-        dst_mean = cv2.mean(dst_face, mask=mask)[:3]
-        
-        # Calculate color correction factors
-        correction_factors = []
-        for i in range(3):
-            if src_mean[i] > 0:
-                correction_factors.append(dst_mean[i] / src_mean[i])
-            else:
-                correction_factors.append(1.0)
+        src_mean = np.array(cv2.mean(src_face[y0:y1, x0:x1], mask=mask)[:3])
+        dst_mean = np.array(cv2.mean(dst_face[y0:y1, x0:x1], mask=mask)[:3])
         
-        # Apply color correction
-        corrected_face = src_face.copy().astype(np.float32)
-        for i in range(3):
-            corrected_face[:, :, i] *= correction_factors[i]
-        
-        # Clamp values to valid range
-        corrected_face = np.clip(corrected_face, 0, 255).astype(np.uint8)
-        
-        return corrected_face
+        # Per-channel gains, scaled and saturated to uint8 in one OpenCV pass
+        gains = np.divide(dst_mean, src_mean, out=np.ones(3), where=src_mean > 0)
+        gains = 1.0 + strength * (gains - 1.0)
+        return cv2.multiply(src_face, (*gains, 1.0))
     
     def create_seamless_mask(self, landmarks: np.ndarray, frame_shape: Tuple[int, int],
-                           feather_amount: int = 10) -> np.ndarray:
+                           feather_amount: Optional[int] = None) -> np.ndarray:
         """
         Create a feathered mask for seamless blending.
         
         Args:
             landmarks: Facial landmarks
             frame_shape: Shape of the frame
-            feather_amount: Amount of feathering in pixels
+            feather_amount: Amount of feathering in pixels, by default the
+                configured mask feather amount
             
         Returns:
-            Feathered mask
+            Feathered mask. It lives in a buffer reused by the next call, so
+            consume it before creating another mask.
         """
         # Create base mask
-        mask = self.get_convex_hull_mask(landmarks, frame_shape)
+        mask = self._mask_buffer(frame_shape)
+        hull = self._face_hull(landmarks)
+        cv2.fillPoly(mask, [hull], 255)
         
         # Apply adaptive feathering for laplacian blending or Gaussian blur as fallback
         try:
             if self.blend_mode == 'laplacian':
                 feather = blending.create_adaptive_feather_mask(mask, feather_radius=self.adaptive_feather)
+                self._mask_roi = (slice(None), slice(None))
                 return feather
         except Exception:
             # fallback to gaussian blur
             pass
 
+        if feather_amount is None:
+            feather_amount = self.mask_feather
+        # Only the hull's bounding box plus the kernel radius can become non-zero
+        radius = max(feather_amount, 0)
+        x, y, w, h = cv2.boundingRect(hull)
+        roi = (slice(max(y - radius, 0), y + h + radius),
+               slice(max(x - radius, 0), x + w + radius))
+        self._mask_roi = roi
         if feather_amount > 0:
-            mask = cv2.GaussianBlur(mask, (feather_amount * 2 + 1, feather_amount * 2 + 1), 0)
+            region = mask[roi]
+            cv2.GaussianBlur(region, (feather_amount * 2 + 1, feather_amount * 2 + 1), 0, dst=region)
 
         return mask
     
+    def _mask_buffer(self, frame_shape: Tuple[int, int]) -> np.ndarray:
+        """Zeroed frame-sized mask buffer, clearing only what the previous mask touched."""
+        shape = tuple(frame_shape[:2])
+        if self._mask_buf is None or self._mask_buf.shape != shape:
+            self._mask_buf = np.zeros(shape, dtype=np.uint8)
+        elif self._mask_roi is not None:
+            self._mask_buf[self._mask_roi] = 0
+        self._mask_roi = None
+        return self._mask_buf
+    
     def swap_face(self, target_frame: np.ndarray, target_landmarks: np.ndarray,
-                  source_image: np.ndarray, source_landmarks: np.ndarray) -> np.ndarray:
+                  source_image: np.ndarray, source_landmarks: np.ndarray,
+                  source_entry: Optional[dict] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Perform face swap using 2D warping and blending.
         
@@ -279,13 +424,19 @@ class FaceSwapper:
             target_landmarks: Target face landmarks
             source_image: Source face image
             source_landmarks: Source face landmarks
+            source_entry: Cached source-side data from _source_entry
+            out: Optional array of the frame's shape that receives the result;
+                may be target_frame itself to swap in place
             
         Returns:
-            Frame with face swapped
+            Frame with face swapped (out when given)
         """
         try:
-            # Create a copy of the target frame
-            result_frame = target_frame.copy()
+            # Warp from the cached face crop rather than the full source image
+            if source_entry is None:
+                source_entry = self._source_entry(source_image, source_landmarks)
+            source_image = source_entry['image']
+            source_landmarks = source_entry['landmarks']
             
             # Step 1: Warp source face to target landmarks using configured warp
             try:
@@ -294,22 +445,23 @@ class FaceSwapper:
                 elif self.warp_mode == 'tps':
                     aligned_source = warps.warp_tps(source_image, source_landmarks, target_landmarks, target_frame.shape)
                 else:
-                    aligned_source = warps.warp_delaunay(source_image, source_landmarks, target_landmarks, target_frame.shape)
+                    aligned_source = warps.warp_delaunay(source_image, source_landmarks, target_landmarks, target_frame.shape,
+                                                        triangles=source_entry['triangles'])
             except Exception as e:
                 logger.warning(f"Warping ({self.warp_mode}) failed, falling back to simple affine: {e}")
                 aligned_source = self.align_face_simple(source_image, source_landmarks, target_landmarks, target_frame.shape)
 
             # Step 2: Create mask for blending (smoothed landmarks are handled by caller)
-            mask = self.create_seamless_mask(target_landmarks, target_frame.shape, feather_amount=6)
+            mask = self.create_seamless_mask(target_landmarks, target_frame.shape)
 
             # Step 3: Center for poisson clone
             center = tuple(np.mean(target_landmarks, axis=0).astype(int))
 
             # Step 4: Color matching (optional)
+            # The aligned source has the frame's shape, so one region check covers both
             target_face_region = self.extract_face_region(target_frame, target_landmarks)
-            source_face_region = self.extract_face_region(aligned_source, target_landmarks)
 
-            if self.enable_color and target_face_region is not None and source_face_region is not None:
+            if self.enable_color and target_face_region is not None:
                 try:
                     aligned_source_corrected = color_match.match_histograms_lab(aligned_source, target_frame, strength=self.color_strength)
                 except Exception:
@@ -320,12 +472,16 @@ class FaceSwapper:
             # Step 5: Blending
             if self.blend_mode == 'laplacian':
                 try:
-                    result_frame = blending.laplacian_blend(aligned_source_corrected, result_frame, mask, levels=self.laplacian_levels)
+                    result_frame = blending.laplacian_blend(aligned_source_corrected, target_frame, mask,
+                                                            levels=self.laplacian_levels, out=out)
                 except Exception as e:
                     logger.warning(f"Laplacian blending failed, falling back to Poisson/alpha: {e}")
-                    result_frame = blending.poisson_clone(aligned_source_corrected, result_frame, mask, center, flags=self.blend_method)
+                    result_frame = blending.poisson_clone(aligned_source_corrected, target_frame, mask, center,
+                                                          flags=self.blend_method, out=out)
             else:
-                result_frame = blending.poisson_clone(aligned_source_corrected, result_frame, mask, center, flags=self.blend_method)
+                # The blend writes a new frame, or out, and leaves target_frame untouched unless it is out
+                result_frame = blending.poisson_clone(aligned_source_corrected, target_frame, mask, center,
+                                                      flags=self.blend_method, out=out)
 
             return result_frame
             
@@ -345,14 +501,10 @@ class FaceSwapper:
             Extracted face region or None if extraction fails
         """
         try:
-            # Get bounding box with padding
-            x_coords = landmarks[:, 0]
-            y_coords = landmarks[:, 1]
-            
-            x_min = max(0, int(np.min(x_coords)) - 20)
-            y_min = max(0, int(np.min(y_coords)) - 20)
-            x_max = min(frame.shape[1], int(np.max(x_coords)) + 20)
-            y_max = min(frame.shape[0], int(np.max(y_coords)) + 20)
+            # Get bounding box with padding, clipped to the frame in one call
+            bbox = np.concatenate([landmarks.min(axis=0) - 20, landmarks.max(axis=0) + 20]).astype(np.int32)
+            np.clip(bbox, 0, (frame.shape[1], frame.shape[0]) * 2, out=bbox)
+            x_min, y_min, x_max, y_max = bbox.tolist()
             
             if x_max > x_min and y_max > y_min:
                 return frame[y_min:y_max, x_min:x_max]
@@ -363,7 +515,8 @@ class FaceSwapper:
             logger.warning(f"Face region extraction failed: {e}")
             return None
     
-    def process_video_frame(self, frame: np.ndarray, face_detector, face_data: dict) -> np.ndarray:
+    def process_video_frame(self, frame: np.ndarray, face_detector, face_data: dict,
+                            out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Process a single video frame for face swapping.
         
@@ -371,47 +524,53 @@ class FaceSwapper:
             frame: Input video frame
             face_detector: FaceDetector instance
             face_data: Dictionary containing unique faces and their swap data
+            out: Optional array of the frame's shape that receives the result,
+                instead of allocating new frames; may be frame itself
             
         Returns:
-            Processed frame with face swaps applied
+            Processed frame with face swaps applied (out when given)
         """
         try:
-            # Convert BGR to RGB for face detection
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Convert BGR to RGB for face detection into the reused buffer
+            if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+                self._rgb_buf = np.empty_like(frame)
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
             
-            # Detect faces in the frame
-            faces = face_detector.detect_faces(rgb_frame, scale_factor=0.5)
+            # Detect faces every detector_step frames, track them in between
+            if self._frame_index % self.detector_step == 0 or not self._tracks:
+                targets = self._detect_targets(frame, rgb_frame, face_detector)
+            else:
+                targets = self._track_targets(frame)
+            self._frame_index += 1
             
             # Process each detected face
-            for face_rect in faces:
+            for face_rect, matched_face, shape in targets:
                 try:
-                    # Get landmarks and encoding for this face
-                    landmarks = face_detector.get_face_landmarks(rgb_frame, face_rect)
-                    dlib_landmarks = face_detector.predictor(rgb_frame, face_rect)
-                    face_encoding = face_detector.get_face_encoding(rgb_frame, dlib_landmarks)
-                    
-                    # Find matching unique face
-                    matched_face = face_detector.get_face_match(face_encoding)
-                    
-                    if matched_face and matched_face.get('swap_image') is not None:
+                    if matched_face is not None and matched_face.swap_image is not None:
+                        # Get landmarks for this face, reusing the predictor run from matching
+                        if shape is not None:
+                            landmarks = face_detector.shape_to_array(shape)
+                        else:
+                            landmarks = face_detector.get_face_landmarks(rgb_frame, face_rect)
+                        
                         # Ensure per-face smoothing objects exist
-                        if 'landmark_smoother' not in matched_face:
-                            matched_face['landmark_smoother'] = LandmarkSmoother(method=self.smooth_method, **self.smooth_params.get(self.smooth_method, {}))
-                        if 'mask_smoother' not in matched_face:
-                            mask_method = getattr(config, 'MASK_SMOOTH_METHOD', self.smooth_method)
-                            matched_face['mask_smoother'] = LandmarkSmoother(method=mask_method, **self.smooth_params.get(mask_method, {}))
-                        if 'color_smoother' not in matched_face:
-                            matched_face['color_smoother'] = color_match.TemporalColorSmoother(alpha=self.color_temporal_alpha)
+                        if matched_face.landmark_smoother is None:
+                            matched_face.landmark_smoother = LandmarkSmoother(method=self.smooth_method, **self.smooth_params.get(self.smooth_method, {}))
+                        if matched_face.mask_smoother is None:
+                            mask_method = self.mask_smooth_method
+                            matched_face.mask_smoother = LandmarkSmoother(method=mask_method, **self.smooth_params.get(mask_method, {}))
+                        if matched_face.color_smoother is None:
+                            matched_face.color_smoother = color_match.TemporalColorSmoother(alpha=self.color_temporal_alpha)
 
                         # Smooth landmarks temporally to stabilize warps
                         try:
-                            smoothed_landmarks = matched_face['landmark_smoother'].smooth(landmarks)
+                            smoothed_landmarks = matched_face.landmark_smoother.smooth(landmarks)
                         except Exception:
                             smoothed_landmarks = landmarks
 
                         # Smooth mask shape (polygon) to avoid jitter
                         try:
-                            smoothed_mask_landmarks = matched_face['mask_smoother'].smooth(landmarks)
+                            smoothed_mask_landmarks = matched_face.mask_smoother.smooth(landmarks)
                         except Exception:
                             smoothed_mask_landmarks = landmarks
 
@@ -419,19 +578,44 @@ class FaceSwapper:
                         frame = self.swap_face(
                             frame,
                             smoothed_mask_landmarks,
-                            matched_face['swap_image'],
-                            matched_face['swap_landmarks']
+                            matched_face.swap_image,
+                            matched_face.swap_landmarks,
+                            self._source_entry(matched_face.swap_image, matched_face.swap_landmarks),
+                            out=out
                         )
                         
                 except Exception as e:
                     logger.warning(f"Error processing face in frame: {e}")
                     continue
             
-            return frame
-            
         except Exception as e:
             logger.error(f"Frame processing failed: {e}")
-            return frame
+        
+        # Frames without swaps, or whose swaps failed, still have to land in out
+        if out is not None and frame is not out:
+            np.copyto(out, frame)
+            return out
+        return frame
+    
+    def process_video_frames_batch(self, frames: List[np.ndarray], face_detector,
+                                   face_data: dict, in_place: bool = False) -> List[np.ndarray]:
+        """
+        Process a batch of consecutive video frames for face swapping.
+        
+        Frames are swapped in order, because each frame's detection or
+        tracking step depends on the faces found in the previous one.
+        
+        Args:
+            frames: Consecutive input video frames
+            face_detector: FaceDetector instance
+            face_data: Dictionary containing unique faces and their swap data
+            in_place: Write each result into its input frame instead of new arrays
+            
+        Returns:
+            Processed frames, in input order
+        """
+        return [self.process_video_frame(frame, face_detector, face_data, out=frame if in_place else None)
+                for frame in frames]
     
     def set_blend_method(self, method: int):
         """
@@ -1,15 +1,204 @@
 import sys
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                               QPushButton, QFileDialog, QFrame, QSizePolicy)
-from PySide6.QtCore import Qt, Signal, QSize
-from PySide6.QtGui import QPixmap, QFont, QPainter, QBrush, QPen
-import cv2
-import numpy as np
+                               QPushButton, QFileDialog, QFrame, QSizePolicy, QMenu)
+from PySide6.QtCore import Qt, Signal, QSize, QEvent, QSignalBlocker
+from PySide6.QtGui import QPixmap, QImage, QImageReader, QFont, QPainter, QBitmap
 import os
 import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from face_detector import FaceData
 
 logger = logging.getLogger(__name__)
 
+# Stylesheets shared by every card, so Qt sees identical strings. The circle
+# templates take the border radius and are formatted once per size.
+FACE_CIRCLE_QSS = """
+    QLabel {{
+        border: 2px solid #bdc3c7;
+        border-radius: {radius}px;
+        background-color: #ecf0f1;
+    }}
+"""
+# Both swap-circle states in one stylesheet, selected by the "state" property
+SWAP_CIRCLE_QSS = """
+    QLabel[state="empty"] {{
+        border: 2px dashed #95a5a6;
+        border-radius: {radius}px;
+        background-color: #f8f9fa;
+        color: #7f8c8d;
+        font-size: 24px;
+        font-weight: bold;
+    }}
+    QLabel[state="empty"]:hover {{
+        border-color: #3498db;
+        background-color: #e3f2fd;
+        color: #2196f3;
+    }}
+    QLabel[state="filled"] {{
+        border: 2px solid #27ae60;
+        border-radius: {radius}px;
+        background-color: #ecf0f1;
+    }}
+    QLabel[state="filled"]:hover {{
+        border-color: #229954;
+    }}
+"""
+TITLE_QSS = "color: #2c3e50; margin-bottom: 5px;"
+CAPTION_QSS = "color: #7f8c8d; font-size: 9px;"
+CAPTION_READY_QSS = "color: #27ae60; font-size: 9px; font-weight: bold;"
+ARROW_QSS = "color: #95a5a6; font-size: 16px; font-weight: bold;"
+CLEAR_BUTTON_QSS = """
+    QPushButton {
+        background-color: #e74c3c;
+        color: white;
+        border: none;
+        padding: 4px 12px;
+        border-radius: 3px;
+        font-size: 9px;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background-color: #c0392b;
+    }
+"""
+FACE_CARD_QSS = """
+    FaceCard {
+        background-color: white;
+        border: 1px solid #ddd;
+        border-radius: 8px;
+    }
+    FaceCard:hover {
+        border-color: #3498db;
+    }
+"""
+
+@lru_cache(maxsize=None)
+def title_font() -> QFont:
+    """Card title font, built once and shared; QFont is implicitly shared in Qt."""
+    # Not a module constant: fonts need the QApplication, which is created after import
+    return QFont("Arial", 10, QFont.Weight.Bold)
+
+@lru_cache(maxsize=None)
+def circle_style(template: str, circle_size: int) -> str:
+    """Circle stylesheet template filled in for circle_size."""
+    return template.format(radius=circle_size // 2)
+
+# Swap images already decoded, keyed by (path, modification time)
+SWAP_PIXMAP_CACHE_SIZE = 32
+_swap_pixmap_cache = OrderedDict()
+
+def load_swap_pixmap(image_path: str, min_side: int = 0) -> QPixmap:
+    """Load a swap image as a QPixmap, decoding each file version only once.
+    
+    Picking the same file again, or for several faces, returns the same
+    pixmap, which also lets circular_pixmap reuse its cached circle.
+    
+    Args:
+        image_path: Path to the image file
+        min_side: If set, decode at the smallest size whose shorter side is
+            still at least min_side pixels; formats such as JPEG then skip
+            decoding the full resolution
+        
+    Returns:
+        Loaded pixmap, null if the file could not be read
+    """
+    key = (image_path, os.path.getmtime(image_path), min_side)
+    cached = _swap_pixmap_cache.get(key)
+    if cached is not None:
+        _swap_pixmap_cache.move_to_end(key)
+        return cached
+    
+    reader = QImageReader(image_path)
+    size = reader.size()
+    shorter = min(size.width(), size.height())
+    if min_side > 0 and shorter > min_side:
+        reader.setScaledSize(size * (min_side / shorter))
+    pixmap = QPixmap.fromImage(reader.read())
+    if not pixmap.isNull():
+        _swap_pixmap_cache[key] = pixmap
+        if len(_swap_pixmap_cache) > SWAP_PIXMAP_CACHE_SIZE:
+            _swap_pixmap_cache.popitem(last=False)
+    return pixmap
+
+# Face pixmaps already cut to a circle, keyed by (source cacheKey, circle size, pixel ratio)
+CIRCLE_CACHE_SIZE = 64
+# Images larger than this many times the circle are pre-shrunk with a fast filter
+PREDOWNSCALE_FACTOR = 4
+_circle_cache = OrderedDict()
+
+def circular_pixmap(pixmap: QPixmap, circle_size: int, pixel_ratio: float = 1.0) -> QPixmap:
+    """Scale and center-crop pixmap to fill a circle of circle_size.
+    
+    The round shape comes from a shared per-size bitmap mask (see
+    circle_mask) rather than painting every image through an ellipse.
+    Results are cached, so setting the same pixmap again is a lookup.
+    """
+    key = (pixmap.cacheKey(), circle_size, pixel_ratio)
+    cached = _circle_cache.get(key)
+    if cached is not None:
+        _circle_cache.move_to_end(key)
+        return cached
+    
+    # Scale pixmap to fit circle, in device pixels for crisp HiDPI edges
+    side = int(round((circle_size - 4) * pixel_ratio))
+    if min(pixmap.width(), pixmap.height()) > side * PREDOWNSCALE_FACTOR:
+        # Large photos: cheap nearest-neighbour pass down to a few times the
+        # target first, so the smooth filter only runs on a small image
+        pixmap = pixmap.scaled(
+            side * PREDOWNSCALE_FACTOR, side * PREDOWNSCALE_FACTOR,
+            Qt.KeepAspectRatioByExpanding, Qt.FastTransformation
+        )
+    scaled = pixmap.scaled(
+        side, side, 
+        Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation
+    )
+    cropped = scaled.copy((scaled.width() - side) // 2, (scaled.height() - side) // 2, side, side)
+    cropped.setMask(circle_mask(side))
+    cropped.setDevicePixelRatio(pixel_ratio)
+    
+    _circle_cache[key] = cropped
+    if len(_circle_cache) > CIRCLE_CACHE_SIZE:
+        _circle_cache.popitem(last=False)
+    return cropped
+
+@lru_cache(maxsize=16)
+def circle_mask(side: int) -> QBitmap:
+    """Circular 1-bit mask of side x side pixels, drawn once per size and shared."""
+    # No antialiasing: a 1-bit mask cannot hold partial coverage, and the
+    # stylesheet border drawn over the edge already hides the stair-stepping
+    mask = QBitmap(side, side)
+    mask.fill(Qt.color0)
+    painter = QPainter(mask)
+    painter.setBrush(Qt.color1)
+    painter.setPen(Qt.NoPen)
+    painter.drawEllipse(0, 0, side, side)
+    painter.end()
+    return mask
+
+# One file dialog for all cards; it keeps its directory listing between picks
+SWAP_IMAGE_FILTER = "Image Files (*.jpg *.jpeg *.png *.bmp *.tiff *.tif);;All Files (*)"
+_shared_file_dialog: Optional[QFileDialog] = None
+
+def swap_image_dialog() -> QFileDialog:
+    """The shared swap image file dialog, created on first use."""
+    global _shared_file_dialog
+    if _shared_file_dialog is None:
+        # No parent, so it outlives the cards that are rebuilt on every scan
+        dlg = QFileDialog(None, "Select Swap Image")
+        dlg.setNameFilter(SWAP_IMAGE_FILTER)
+        dlg.setFileMode(QFileDialog.ExistingFile)
+        dlg.setOption(QFileDialog.DontUseNativeDialog, False)
+        dlg.setWindowModality(Qt.ApplicationModal)
+        _shared_file_dialog = dlg
+    return _shared_file_dialog
+
+# Sent when a widget moves to a screen with a different device pixel ratio (Qt 6.6+)
+DPR_CHANGE_EVENT = getattr(QEvent.Type, 'DevicePixelRatioChange', None)
+
 class CircleImageLabel(QLabel):
     """Custom label that displays images in a circle."""
     
@@ -18,41 +207,22 @@ class CircleImageLabel(QLabel):
         self.circle_size = size
         self.setFixedSize(size, size)
         self.setAlignment(Qt.AlignCenter)
-        self.setStyleSheet(f"""
-            QLabel {{
-                border: 2px solid #bdc3c7;
-                border-radius: {size//2}px;
-                background-color: #ecf0f1;
-            }}
-        """)
+        self.setStyleSheet(circle_style(FACE_CIRCLE_QSS, size))
         self.original_pixmap = None
     
     def setCirclePixmap(self, pixmap):
         """Set pixmap and make it circular."""
         if pixmap and not pixmap.isNull():
             self.original_pixmap = pixmap
-            # Scale pixmap to fit circle
-            scaled = pixmap.scaled(
-                self.circle_size - 4, self.circle_size - 4, 
-                Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation
-            )
-            
-            # Create circular mask
-            circular_pixmap = QPixmap(self.circle_size - 4, self.circle_size - 4)
-            circular_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(circular_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            
-            # Create circular path
-            painter.setBrush(QBrush(scaled))
-            painter.setPen(Qt.NoPen)
-            painter.drawEllipse(0, 0, self.circle_size - 4, self.circle_size - 4)
-            
-            painter.end()
-            self.setPixmap(circular_pixmap)
+            self.setPixmap(circular_pixmap(pixmap, self.circle_size, self.devicePixelRatioF()))
         else:
             self.clear()
+    
+    def changeEvent(self, event):
+        # Re-render at the new pixel ratio after moving to another screen
+        if event.type() == DPR_CHANGE_EVENT and self.original_pixmap is not None:
+            self.setPixmap(circular_pixmap(self.original_pixmap, self.circle_size, self.devicePixelRatioF()))
+        super().changeEvent(event)
 
 class SwapCircleLabel(QLabel):
     """Circle label that can show either a plus symbol or an image."""
@@ -67,72 +237,50 @@ class SwapCircleLabel(QLabel):
         self.has_image = False
         self.original_pixmap = None
         self.setCursor(Qt.PointingHandCursor)
+        # Parsed once; state changes only switch the "state" property
+        self.setStyleSheet(circle_style(SWAP_CIRCLE_QSS, size))
         self.reset_to_plus()
     
+    def _set_state(self, state: str):
+        """Switch between the "empty" and "filled" stylesheet rules."""
+        if self.property("state") != state:
+            self.setProperty("state", state)
+            # Re-match the property selectors without re-parsing the stylesheet
+            self.style().unpolish(self)
+            self.style().polish(self)
+    
     def reset_to_plus(self):
         """Reset to plus state."""
         self.has_image = False
         self.original_pixmap = None
-        self.clear()
+        # One repaint for the text and style change; setText also drops any pixmap
+        self.setUpdatesEnabled(False)
         self.setText("+")
-        self.setStyleSheet(f"""
-            QLabel {{
-                border: 2px dashed #95a5a6;
-                border-radius: {self.circle_size//2}px;
-                background-color: #f8f9fa;
-                color: #7f8c8d;
-                font-size: 24px;
-                font-weight: bold;
-            }}
-            QLabel:hover {{
-                border-color: #3498db;
-                background-color: #e3f2fd;
-                color: #2196f3;
-            }}
-        """)
+        self._set_state("empty")
+        self.setUpdatesEnabled(True)
     
     def setCirclePixmap(self, pixmap):
         """Set pixmap and make it circular."""
         if pixmap and not pixmap.isNull():
             self.has_image = True
             self.original_pixmap = pixmap
-            self.setText("")  # Clear the "+" text
-            
-            # Scale pixmap to fit circle
-            scaled = pixmap.scaled(
-                self.circle_size - 4, self.circle_size - 4, 
-                Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation
-            )
-            
-            # Create circular mask
-            circular_pixmap = QPixmap(self.circle_size - 4, self.circle_size - 4)
-            circular_pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(circular_pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
             
-            # Create circular path
-            painter.setBrush(QBrush(scaled))
-            painter.setPen(Qt.NoPen)
-            painter.drawEllipse(0, 0, self.circle_size - 4, self.circle_size - 4)
-            
-            painter.end()
-            self.setPixmap(circular_pixmap)
+            # One repaint for the pixmap and style change; setPixmap also clears the "+" text
+            self.setUpdatesEnabled(False)
+            self.setPixmap(circular_pixmap(pixmap, self.circle_size, self.devicePixelRatioF()))
             
             # Update styling for image state
-            self.setStyleSheet(f"""
-                QLabel {{
-                    border: 2px solid #27ae60;
-                    border-radius: {self.circle_size//2}px;
-                    background-color: #ecf0f1;
-                }}
-                QLabel:hover {{
-                    border-color: #229954;
-                }}
-            """)
+            self._set_state("filled")
+            self.setUpdatesEnabled(True)
         else:
             self.reset_to_plus()
     
+    def changeEvent(self, event):
+        # Re-render at the new pixel ratio after moving to another screen
+        if event.type() == DPR_CHANGE_EVENT and self.original_pixmap is not None:
+            self.setPixmap(circular_pixmap(self.original_pixmap, self.circle_size, self.devicePixelRatioF()))
+        super().changeEvent(event)
+    
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.clicked.emit()
@@ -142,8 +290,9 @@ class FaceCard(QWidget):
     """Widget displaying a face detection result with swap image selection."""
     
     swap_image_selected = Signal(int, str)  # face_index, image_path
+    swap_image_for_all = Signal(str)  # image_path to assign to every face
     
-    def __init__(self, face_index: int, face_data: dict, parent=None):
+    def __init__(self, face_index: int, face_data: 'FaceData', parent=None):
         super().__init__(parent)
         self.face_index = face_index
         self.face_data = face_data
@@ -160,8 +309,8 @@ class FaceCard(QWidget):
         # Face title
         title_label = QLabel(f"Face #{self.face_index + 1}")
         title_label.setAlignment(Qt.AlignCenter)
-        title_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
-        title_label.setStyleSheet("color: #2c3e50; margin-bottom: 5px;")
+        title_label.setFont(title_font())
+        title_label.setStyleSheet(TITLE_QSS)
         layout.addWidget(title_label)
         
         # Circles container
@@ -174,12 +323,11 @@ class FaceCard(QWidget):
         face_container.setSpacing(3)
         
         self.face_circle = CircleImageLabel(80)
-        self.face_circle.setMinimumSize(84, 84)  # Ensure minimum size
         face_container.addWidget(self.face_circle, alignment=Qt.AlignCenter)
         
         face_label = QLabel("Detected")
         face_label.setAlignment(Qt.AlignCenter)
-        face_label.setStyleSheet("color: #7f8c8d; font-size: 9px;")
+        face_label.setStyleSheet(CAPTION_QSS)
         face_container.addWidget(face_label)
         
         circles_layout.addLayout(face_container)
@@ -187,7 +335,7 @@ class FaceCard(QWidget):
         # Arrow or connector
         arrow_label = QLabel("→")
         arrow_label.setAlignment(Qt.AlignCenter)
-        arrow_label.setStyleSheet("color: #95a5a6; font-size: 16px; font-weight: bold;")
+        arrow_label.setStyleSheet(ARROW_QSS)
         arrow_label.setFixedWidth(15)
         circles_layout.addWidget(arrow_label)
         
@@ -197,12 +345,11 @@ class FaceCard(QWidget):
         
         self.swap_circle = SwapCircleLabel(80)
         self.swap_circle.clicked.connect(self.select_swap_image)
-        self.swap_circle.setMinimumSize(84, 84)  # Ensure minimum size
         swap_container.addWidget(self.swap_circle, alignment=Qt.AlignCenter)
         
         self.swap_label = QLabel("Add Swap")
         self.swap_label.setAlignment(Qt.AlignCenter)
-        self.swap_label.setStyleSheet("color: #7f8c8d; font-size: 9px;")
+        self.swap_label.setStyleSheet(CAPTION_QSS)
         swap_container.addWidget(self.swap_label)
         
         circles_layout.addLayout(swap_container)
@@ -213,120 +360,149 @@ class FaceCard(QWidget):
         self.clear_button = QPushButton("Clear")
         self.clear_button.clicked.connect(self.clear_swap_image)
         self.clear_button.setVisible(False)
-        self.clear_button.setStyleSheet("""
-            QPushButton {
-                background-color: #e74c3c;
-                color: white;
-                border: none;
-                padding: 4px 12px;
-                border-radius: 3px;
-                font-size: 9px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #c0392b;
-            }
-        """)
+        self.clear_button.setStyleSheet(CLEAR_BUTTON_QSS)
         layout.addWidget(self.clear_button, alignment=Qt.AlignCenter)
         
         # Set fixed size for the card with more width for both circles
         self.setFixedSize(240, 150)
-        self.setMinimumSize(240, 150)
         
         # Card styling
-        self.setStyleSheet("""
-            FaceCard {
-                background-color: white;
-                border: 1px solid #ddd;
-                border-radius: 8px;
-            }
-            FaceCard:hover {
-                border-color: #3498db;
-            }
-        """)
+        self.setStyleSheet(FACE_CARD_QSS)
     
     def load_face_image(self):
         """Load and display the detected face image in the circle."""
+        # Imported on first use so building the card widgets does not pull in NumPy
+        import numpy as np
+        
         try:
-            face_image = self.face_data['image']
+            face_image = self.face_data.image
             
             # Debug information
             logger.debug(f"Loading face image {self.face_index}: shape={face_image.shape}, dtype={face_image.dtype}")
             
-            # Ensure image is in the correct format
-            if len(face_image.shape) == 3 and face_image.shape[2] == 3:
-                # Image is already in BGR format from OpenCV
-                face_image_bgr = face_image.copy()
-            elif len(face_image.shape) == 3 and face_image.shape[2] == 4:
-                # Convert RGBA to BGR
-                face_image_bgr = cv2.cvtColor(face_image, cv2.COLOR_RGBA2BGR)
+            if (face_image.dtype == np.uint8 and face_image.ndim == 3
+                    and face_image.shape[2] == 3 and face_image.flags['C_CONTIGUOUS']):
+                # Common case: the detector's contiguous BGR uint8 crop, used as is
+                face_image_bgr = face_image
+                image_format = QImage.Format_BGR888
             else:
-                # Grayscale - convert to BGR
-                face_image_bgr = cv2.cvtColor(face_image, cv2.COLOR_GRAY2BGR)
+                face_image_bgr, image_format = self._normalize_face_image(face_image)
             
-            # Ensure the image data is in the correct range
-            if face_image_bgr.dtype != np.uint8:
-                if face_image_bgr.max() <= 1.0:
-                    face_image_bgr = (face_image_bgr * 255).astype(np.uint8)
-                else:
-                    face_image_bgr = face_image_bgr.astype(np.uint8)
-            
-            # Use OpenCV to encode image to JPEG format
-            success, buffer = cv2.imencode('.jpg', face_image_bgr)
-            if success:
-                # Load pixmap from encoded data
-                pixmap = QPixmap()
-                if pixmap.loadFromData(buffer.tobytes()):
-                    self.face_circle.setCirclePixmap(pixmap)
-                    logger.debug(f"Successfully loaded face image for face {self.face_index}")
-                else:
-                    logger.error(f"Failed to decode image data for face {self.face_index}")
+            # Wrap the pixel buffer directly; fromImage copies the pixels into the
+            # pixmap while face_image_bgr is still alive, so no QImage copy is needed
+            h, w = face_image_bgr.shape[:2]
+            qimage = QImage(face_image_bgr.data, w, h, face_image_bgr.strides[0], image_format)
+            pixmap = QPixmap.fromImage(qimage)
+            del qimage
+            if not pixmap.isNull():
+                self.face_circle.setCirclePixmap(pixmap)
+                logger.debug(f"Successfully loaded face image for face {self.face_index}")
             else:
-                logger.error(f"Failed to encode image for face {self.face_index}")
+                logger.error(f"Failed to convert image data for face {self.face_index}")
                 
         except Exception as e:
             logger.error(f"Error loading face image for face {self.face_index}: {e}")
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
     
+    @staticmethod
+    def _normalize_face_image(face_image):
+        """Convert an unusual face crop to a contiguous uint8 array and its QImage format."""
+        # Only needed for the rare non-BGR or non-uint8 crops
+        import cv2
+        import numpy as np
+        
+        # Ensure image is in the correct format
+        if len(face_image.shape) == 3 and face_image.shape[2] == 3:
+            # Image is already in BGR format from OpenCV
+            face_image_bgr = face_image
+            image_format = QImage.Format_BGR888
+        elif len(face_image.shape) == 3 and face_image.shape[2] == 4:
+            # Convert RGBA to BGR
+            face_image_bgr = cv2.cvtColor(face_image, cv2.COLOR_RGBA2BGR)
+            image_format = QImage.Format_BGR888
+        else:
+            # Grayscale is shown as is
+            face_image_bgr = face_image.reshape(face_image.shape[:2])
+            image_format = QImage.Format_Grayscale8
+        
+        # Ensure the image data is in the correct range
+        if face_image_bgr.dtype != np.uint8:
+            # One saturating scale-and-convert pass instead of float temporaries
+            if face_image_bgr.max() <= 1.0:
+                face_image_bgr = cv2.convertScaleAbs(face_image_bgr, alpha=255.0)
+            else:
+                face_image_bgr = cv2.convertScaleAbs(face_image_bgr)
+        face_image_bgr = np.ascontiguousarray(face_image_bgr)
+        return face_image_bgr, image_format
+    
     def select_swap_image(self):
         """Open file dialog to select swap image."""
-        image_path, _ = QFileDialog.getOpenFileName(
-            self,
-            "Select Swap Image",
-            "",
-            "Image Files (*.jpg *.jpeg *.png *.bmp *.tiff *.tif);;All Files (*)"
-        )
+        dialog = swap_image_dialog()
+        image_path = dialog.selectedFiles()[0] if dialog.exec() else ""
         
         if image_path:
             self.set_swap_image(image_path)
     
-    def set_swap_image(self, image_path: str):
-        """Set the swap image for this face."""
+    def set_swap_image(self, image_path: str) -> bool:
+        """Set the swap image for this face.
+        
+        Returns:
+            True if the image was loaded and assigned
+        """
         try:
             if not os.path.exists(image_path):
                 logger.error(f"Swap image file not found: {image_path}")
-                return
+                return False
             
             # Load and display the swap image
-            pixmap = QPixmap(image_path)
+            # Decode only as much resolution as the circle thumbnail can use
+            side = int(round((self.swap_circle.circle_size - 4) * self.devicePixelRatioF()))
+            pixmap = load_swap_pixmap(image_path, side * PREDOWNSCALE_FACTOR)
             if not pixmap.isNull():
                 self.swap_circle.setCirclePixmap(pixmap)
                 
                 self.swap_image_path = image_path
                 self.swap_label.setText("Ready")
-                self.swap_label.setStyleSheet("color: #27ae60; font-size: 9px; font-weight: bold;")
+                self.swap_label.setStyleSheet(CAPTION_READY_QSS)
                 self.clear_button.setVisible(True)
                 
                 # Emit signal
                 self.swap_image_selected.emit(self.face_index, image_path)
                 
                 logger.info(f"Swap image set for face {self.face_index}: {os.path.basename(image_path)}")
+                return True
             else:
                 logger.error(f"Failed to load swap image: {image_path}")
                 
         except Exception as e:
             logger.error(f"Error setting swap image for face {self.face_index}: {e}")
+        return False
+    
+    def set_swap_image_silent(self, image_path: str) -> bool:
+        """Set the swap image without emitting swap_image_selected.
+        
+        Used for batch assignment, where the caller emits once per card
+        after all cards are updated.
+        
+        Returns:
+            True if the image was loaded and assigned
+        """
+        blocker = QSignalBlocker(self)
+        try:
+            return self.set_swap_image(image_path)
+        finally:
+            blocker.unblock()
+    
+    def contextMenuEvent(self, event):
+        # Offer to reuse this card's swap image for every detected face
+        if self.swap_image_path is None:
+            super().contextMenuEvent(event)
+            return
+        menu = QMenu(self)
+        apply_all = menu.addAction("Use for All Faces")
+        if menu.exec(event.globalPos()) is apply_all:
+            self.swap_image_for_all.emit(self.swap_image_path)
     
     def clear_swap_image(self):
         """Clear the swap image."""
@@ -335,7 +511,7 @@ class FaceCard(QWidget):
         
         self.swap_image_path = None
         self.swap_label.setText("Add Swap")
-        self.swap_label.setStyleSheet("color: #7f8c8d; font-size: 9px;")
+        self.swap_label.setStyleSheet(CAPTION_QSS)
         self.clear_button.setVisible(False)
         
         # Emit signal with empty path
@@ -345,7 +521,9 @@ class FaceCard(QWidget):
     
     def has_swap_image(self) -> bool:
         """Check if this face has a swap image assigned."""
-        return self.swap_image_path is not None and os.path.exists(self.swap_image_path)
+        # The path is only stored after the image loaded, and the swap runs on
+        # the decoded copy, so there is no need to stat the file again
+        return self.swap_image_path is not None
     
     def get_swap_image_path(self) -> str:
         """Get the path to the swap image."""
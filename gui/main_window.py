@@ -1,5 +1,10 @@
 import sys
 import os
+import platform
+import subprocess
+import threading
+import time
+from functools import lru_cache
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                                QLabel, QPushButton, QFileDialog, QScrollArea, 
                                QGridLayout, QFrame, QMessageBox, QApplication)
@@ -9,93 +14,164 @@ import logging
 
 from gui.face_card import FaceCard
 from gui.progress_dialog import ProgressDialog
+from utils.video_utils import VideoUtils
 from face_detector import FaceDetector
 from face_swapper import FaceSwapper
+from video_worker import VideoWorker, process_video, PROGRESS_MIN_INTERVAL
+import config
 
 logger = logging.getLogger(__name__)
 
+# How long closing the window waits for a worker thread to stop, in milliseconds
+THREAD_STOP_TIMEOUT_MS = 2000
+
+# Window stylesheet, parsed once in setup_ui; widgets opt in through objectName
+MAIN_WINDOW_QSS = """
+    QLabel#titleLabel {
+        color: #2c3e50;
+        margin-bottom: 10px;
+    }
+    QLabel#instructionsLabel {
+        color: #7f8c8d;
+        font-size: 12px;
+        margin-bottom: 15px;
+    }
+    QLabel#sectionTitle {
+        color: #34495e;
+    }
+    QLabel#videoPathLabel {
+        border: 1px solid #bdc3c7;
+        padding: 8px;
+        background-color: #ecf0f1;
+        border-radius: 4px;
+    }
+    QPushButton#selectVideoButton {
+        background-color: #3498db;
+        color: white;
+        border: none;
+        padding: 10px 20px;
+        border-radius: 4px;
+        font-weight: bold;
+        min-width: 120px;
+    }
+    QPushButton#selectVideoButton:hover {
+        background-color: #2980b9;
+    }
+    QPushButton#selectVideoButton:pressed {
+        background-color: #21618c;
+    }
+    QLabel#scanProgressLabel, QLabel#processProgressLabel {
+        background-color: #f8f9fa;
+        border: 1px solid #dee2e6;
+        border-radius: 4px;
+        font-family: monospace;
+        color: #495057;
+    }
+    QLabel#scanProgressLabel {
+        padding: 8px;
+        margin: 10px 0px;
+    }
+    QLabel#processProgressLabel {
+        padding: 10px;
+        margin-top: 10px;
+    }
+    QScrollArea#facesScrollArea {
+        border: 1px solid #bdc3c7;
+        background-color: #f8f9fa;
+        border-radius: 4px;
+    }
+    QLabel#noFacesLabel {
+        color: #95a5a6;
+        font-style: italic;
+        padding: 50px;
+    }
+    QLabel#processStatusLabel {
+        color: #7f8c8d;
+    }
+    QPushButton#processButton, QPushButton#openVideoButton {
+        color: white;
+        border: none;
+        padding: 12px 25px;
+        border-radius: 6px;
+        font-weight: bold;
+        font-size: 14px;
+        min-width: 180px;
+    }
+    QPushButton#processButton {
+        background-color: #9b59b6;
+    }
+    QPushButton#processButton:hover {
+        background-color: #8e44ad;
+    }
+    QPushButton#processButton:pressed {
+        background-color: #7d3c98;
+    }
+    QPushButton#openVideoButton {
+        background-color: #28a745;
+    }
+    QPushButton#openVideoButton:hover {
+        background-color: #218838;
+    }
+    QPushButton#openVideoButton:pressed {
+        background-color: #1e7e34;
+    }
+    QPushButton#processButton:disabled, QPushButton#openVideoButton:disabled {
+        background-color: #bdc3c7;
+        color: #7f8c8d;
+    }
+"""
+
+@lru_cache(maxsize=None)
+def section_title_font() -> QFont:
+    """Section title font, built once and shared; QFont is implicitly shared in Qt."""
+    # Not a module constant: fonts need the QApplication, which is created after import
+    return QFont("Arial", 12, QFont.Weight.Bold)
+
 class VideoProcessingThread(QThread):
-    """Thread for processing video in background."""
+    """Thread that runs video processing and relays its progress to the GUI."""
     
     progress_updated = Signal(int, str)  # progress, message
     processing_finished = Signal(bool, str)  # success, message
     
-    def __init__(self, video_path, output_path, face_detector, face_swapper):
+    def __init__(self, video_path, output_path, face_detector, face_swapper, frame_stride=1,
+                 video_worker=None):
         super().__init__()
         self.video_path = video_path
         self.output_path = output_path
         self.face_detector = face_detector
         self.face_swapper = face_swapper
-        self.cancelled = False
+        # Process every frame_stride-th input frame
+        self.frame_stride = max(1, int(frame_stride))
+        # Worker process doing the swapping; None processes in this thread
+        self.video_worker = video_worker
+        # Set from the GUI thread, polled by the processing loop
+        self._cancel_event = threading.Event()
+    
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() has been called."""
+        return self._cancel_event.is_set()
     
     def cancel(self):
         """Cancel the processing."""
-        self.cancelled = True
+        self._cancel_event.set()
+        if self.video_worker is not None:
+            self.video_worker.cancel()
     
     def run(self):
         """Run the video processing."""
         try:
-            import cv2
-            
-            # Open video
-            cap = cv2.VideoCapture(self.video_path)
-            if not cap.isOpened():
-                self.processing_finished.emit(False, f"Could not open video: {self.video_path}")
-                return
-            
-            # Get video properties
-            fps = int(cap.get(cv2.CAP_PROP_FPS))
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            
-            # Create video writer
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(self.output_path, fourcc, fps, (width, height))
-            
-            frame_count = 0
-            
-            self.progress_updated.emit(0, "Starting video processing...")
-            
-            while True:
-                if self.cancelled:
-                    break
-                
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Process frame
-                processed_frame = self.face_swapper.process_video_frame(
-                    frame, self.face_detector, {}
+            if self.video_worker is not None:
+                success, message = self.video_worker.process_video(
+                    self.video_path, self.output_path, self.face_detector.get_unique_faces(),
+                    self.frame_stride, self.progress_updated.emit, self._cancel_event
                 )
-                
-                # Write frame
-                out.write(processed_frame)
-                
-                frame_count += 1
-                progress = int((frame_count / total_frames) * 100)
-                
-                # Update progress every 10 frames
-                if frame_count % 10 == 0:
-                    self.progress_updated.emit(
-                        progress, 
-                        f"Processing frame {frame_count}/{total_frames}"
-                    )
-            
-            # Clean up
-            cap.release()
-            out.release()
-            
-            if self.cancelled:
-                # Remove partial output file
-                if os.path.exists(self.output_path):
-                    os.remove(self.output_path)
-                self.processing_finished.emit(False, "Processing cancelled by user")
             else:
-                self.progress_updated.emit(100, "Processing complete!")
-                self.processing_finished.emit(True, f"Video saved to: {self.output_path}")
-                
+                success, message = process_video(
+                    self.video_path, self.output_path, self.face_detector, self.face_swapper,
+                    self.frame_stride, self.progress_updated.emit, self._cancel_event
+                )
+            self.processing_finished.emit(success, message)
         except Exception as e:
             logger.error(f"Video processing error: {e}")
             self.processing_finished.emit(False, f"Processing failed: {str(e)}")
@@ -106,29 +182,41 @@ class FaceScanThread(QThread):
     progress_updated = Signal(int, str)  # progress, message
     scanning_finished = Signal(bool, list, str)  # success, faces, message
     
-    def __init__(self, video_path, face_detector):
+    def __init__(self, video_path, face_detector, sample_fps=None):
         super().__init__()
         self.video_path = video_path
         self.face_detector = face_detector
-        self.cancelled = False
+        # Frames analyzed per second of video; None uses the configured rate
+        self.sample_fps = sample_fps
+        # Set from the GUI thread, polled by the scan loop
+        self._cancel_event = threading.Event()
         self.total_frames = 0
         self.faces_found = 0
     
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() has been called."""
+        return self._cancel_event.is_set()
+    
     def cancel(self):
         """Cancel the scanning."""
-        self.cancelled = True
+        self._cancel_event.set()
     
     def run(self):
         """Run the face scanning."""
         try:
-            # Get total frame count first
-            import cv2
-            cap = cv2.VideoCapture(self.video_path)
-            if cap.isOpened():
-                self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                cap.release()
+            # Get total frame count first; cached for the detector's own lookup
+            self.total_frames = VideoUtils.get_frame_count(self.video_path)
+            
+            last_emit = 0.0
             
             def progress_callback(progress):
+                nonlocal last_emit
+                # At most every PROGRESS_MIN_INTERVAL seconds, but always report the end
+                now = time.monotonic()
+                if now - last_emit < PROGRESS_MIN_INTERVAL and progress < 100:
+                    return
+                last_emit = now
                 if not self.cancelled:
                     # Update faces found count from detector
                     self.faces_found = len(getattr(self.face_detector, 'unique_faces', []))
@@ -139,7 +227,8 @@ class FaceScanThread(QThread):
             
             # Scan video for faces
             unique_faces = self.face_detector.scan_video_for_faces(
-                self.video_path, progress_callback
+                self.video_path, progress_callback, cancel_event=self._cancel_event,
+                sample_fps=self.sample_fps
             )
             
             if self.cancelled:
@@ -155,6 +244,32 @@ class FaceScanThread(QThread):
             logger.error(f"Face scanning error: {e}")
             self.scanning_finished.emit(False, [], f"Scanning failed: {str(e)}")
 
+class EngineInitThread(QThread):
+    """Thread that loads and warms up the face processing engines."""
+    
+    engines_ready = Signal(bool, str)  # success, error message
+    
+    def __init__(self):
+        super().__init__()
+        self.face_detector = None
+        self.face_swapper = None
+    
+    def run(self):
+        """Load the models, then run them once so the first scan starts warm."""
+        try:
+            self.face_detector = FaceDetector()
+            self.face_swapper = FaceSwapper()
+            self.face_detector.warm_up()
+            
+            # Create output directory
+            config.ensure_dirs()
+            logger.info(f"Output directory ready: {config.OUTPUT_VIDEO_DIR}")
+            
+            self.engines_ready.emit(True, "")
+        except Exception as e:
+            logger.error(f"Failed to initialize engines: {e}")
+            self.engines_ready.emit(False, str(e))
+
 class MainWindow(QMainWindow):
     """Main application window for FaceSwap."""
     
@@ -166,6 +281,13 @@ class MainWindow(QMainWindow):
         self.face_cards = []
         self.scan_thread = None
         self.process_thread = None
+        self.engine_thread = None
+        # Persistent process that swaps videos; started by the first processing run
+        self.video_worker = VideoWorker() if config.CONFIG.process_in_worker else None
+        # Set when a scan was requested before the engines finished loading
+        self._scan_pending = False
+        # Command that opens a file in its default application; Windows uses os.startfile
+        self._open_command = {'Windows': None, 'Darwin': 'open'}.get(platform.system(), 'xdg-open')
         
         self.setup_ui()
         self.initialize_engines()
@@ -175,6 +297,7 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("FaceSwap - Local Face Swapping Tool")
         self.setMinimumSize(800, 600)
         self.resize(1000, 700)
+        self.setStyleSheet(MAIN_WINDOW_QSS)
         
         # Create central widget
         central_widget = QWidget()
@@ -192,7 +315,7 @@ class MainWindow(QMainWindow):
         title_font.setBold(True)
         title_label.setFont(title_font)
         title_label.setAlignment(Qt.AlignCenter)
-        title_label.setStyleSheet("color: #2c3e50; margin-bottom: 10px;")
+        title_label.setObjectName("titleLabel")
         main_layout.addWidget(title_label)
         
         # Instructions
@@ -200,7 +323,7 @@ class MainWindow(QMainWindow):
             "1. Select a video file  →  2. Scan for faces  →  3. Assign swap images  →  4. Process video"
         )
         instructions.setAlignment(Qt.AlignCenter)
-        instructions.setStyleSheet("color: #7f8c8d; font-size: 12px; margin-bottom: 15px;")
+        instructions.setObjectName("instructionsLabel")
         main_layout.addWidget(instructions)
         
         # Video selection section
@@ -227,43 +350,20 @@ class MainWindow(QMainWindow):
         
         # Section title
         title = QLabel("Step 1: Select Video")
-        title.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-        title.setStyleSheet("color: #34495e;")
+        title.setFont(section_title_font())
+        title.setObjectName("sectionTitle")
         layout.addWidget(title)
         
         # Video path display and button
         video_layout = QHBoxLayout()
         
         self.video_label = QLabel("No video selected")
-        self.video_label.setStyleSheet("""
-            QLabel {
-                border: 1px solid #bdc3c7;
-                padding: 8px;
-                background-color: #ecf0f1;
-                border-radius: 4px;
-            }
-        """)
+        self.video_label.setObjectName("videoPathLabel")
         video_layout.addWidget(self.video_label, 1)
         
         self.select_video_button = QPushButton("Select Video")
         self.select_video_button.clicked.connect(self.select_video)
-        self.select_video_button.setStyleSheet("""
-            QPushButton {
-                background-color: #3498db;
-                color: white;
-                border: none;
-                padding: 10px 20px;
-                border-radius: 4px;
-                font-weight: bold;
-                min-width: 120px;
-            }
-            QPushButton:hover {
-                background-color: #2980b9;
-            }
-            QPushButton:pressed {
-                background-color: #21618c;
-            }
-        """)
+        self.select_video_button.setObjectName("selectVideoButton")
         video_layout.addWidget(self.select_video_button)
         
         layout.addLayout(video_layout)
@@ -274,17 +374,7 @@ class MainWindow(QMainWindow):
         # Progress display (initially hidden)
         self.scan_progress_label = QLabel()
         self.scan_progress_label.setVisible(False)
-        self.scan_progress_label.setStyleSheet("""
-            QLabel {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-                padding: 8px;
-                border-radius: 4px;
-                font-family: monospace;
-                color: #495057;
-                margin: 10px 0px;
-            }
-        """)
+        self.scan_progress_label.setObjectName("scanProgressLabel")
         return self.scan_progress_label
     
     def create_faces_section(self):
@@ -295,8 +385,8 @@ class MainWindow(QMainWindow):
         
         # Section title
         title = QLabel("Step 2: Assign Swap Images (Click + to add face images)")
-        title.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-        title.setStyleSheet("color: #34495e;")
+        title.setFont(section_title_font())
+        title.setObjectName("sectionTitle")
         layout.addWidget(title)
         
         # Add progress display for face detection
@@ -309,13 +399,7 @@ class MainWindow(QMainWindow):
         self.scroll_area.setMinimumHeight(200)
         self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: 1px solid #bdc3c7;
-                background-color: #f8f9fa;
-                border-radius: 4px;
-            }
-        """)
+        self.scroll_area.setObjectName("facesScrollArea")
         
         # Widget to contain the flowing layout of face cards
         self.faces_widget = QWidget()
@@ -332,7 +416,7 @@ class MainWindow(QMainWindow):
         # Placeholder label
         self.no_faces_label = QLabel("No faces detected yet - Scan a video first")
         self.no_faces_label.setAlignment(Qt.AlignCenter)
-        self.no_faces_label.setStyleSheet("color: #95a5a6; font-style: italic; padding: 50px;")
+        self.no_faces_label.setObjectName("noFacesLabel")
         self.faces_layout.addWidget(self.no_faces_label)
         
         return frame
@@ -345,70 +429,28 @@ class MainWindow(QMainWindow):
         
         # Section title
         title = QLabel("Step 3: Process Video")
-        title.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-        title.setStyleSheet("color: #34495e;")
+        title.setFont(section_title_font())
+        title.setObjectName("sectionTitle")
         layout.addWidget(title)
         
         # Process button and status
         process_layout = QHBoxLayout()
         
         self.process_status_label = QLabel("Assign swap images to all faces to enable processing")
-        self.process_status_label.setStyleSheet("color: #7f8c8d;")
+        self.process_status_label.setObjectName("processStatusLabel")
         process_layout.addWidget(self.process_status_label, 1)
         
         self.process_button = QPushButton("🎬 Start Face Swap")
         self.process_button.clicked.connect(self.process_video)
         self.process_button.setEnabled(False)
-        self.process_button.setStyleSheet("""
-            QPushButton {
-                background-color: #9b59b6;
-                color: white;
-                border: none;
-                padding: 12px 25px;
-                border-radius: 6px;
-                font-weight: bold;
-                font-size: 14px;
-                min-width: 180px;
-            }
-            QPushButton:hover {
-                background-color: #8e44ad;
-            }
-            QPushButton:pressed {
-                background-color: #7d3c98;
-            }
-            QPushButton:disabled {
-                background-color: #bdc3c7;
-                color: #7f8c8d;
-            }
-        """)
+        self.process_button.setObjectName("processButton")
         process_layout.addWidget(self.process_button)
         
         # Open video button (initially hidden, replaces process button after completion)
         self.open_video_button = QPushButton("🎬 Open Video")
         self.open_video_button.clicked.connect(self.open_video_file)
         self.open_video_button.setVisible(False)
-        self.open_video_button.setStyleSheet("""
-            QPushButton {
-                background-color: #28a745;
-                color: white;
-                border: none;
-                padding: 12px 25px;
-                border-radius: 6px;
-                font-weight: bold;
-                font-size: 14px;
-                min-width: 180px;
-            }
-            QPushButton:hover {
-                background-color: #218838;
-            }
-            QPushButton:pressed {
-                background-color: #1e7e34;
-            }
-            QPushButton:disabled {
-                background-color: #bdc3c7;
-                color: #7f8c8d;
-            }
-        """)
+        self.open_video_button.setObjectName("openVideoButton")
         process_layout.addWidget(self.open_video_button)
 
         layout.addLayout(process_layout)
@@ -416,42 +458,44 @@ class MainWindow(QMainWindow):
         # Progress display (initially hidden)
         self.process_progress_label = QLabel()
         self.process_progress_label.setVisible(False)
-        self.process_progress_label.setStyleSheet("""
-            QLabel {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-                padding: 10px;
-                border-radius: 4px;
-                font-family: monospace;
-                color: #495057;
-                margin-top: 10px;
-            }
-        """)
+        self.process_progress_label.setObjectName("processProgressLabel")
         layout.addWidget(self.process_progress_label)
         
         return frame
     
     def initialize_engines(self):
-        """Initialize face detection and swapping engines."""
-        try:
-            self.face_detector = FaceDetector()
-            self.face_swapper = FaceSwapper()
-            
-            # Create output directory
-            output_dir = os.path.expanduser("~/Videos/FaceSwap")
-            os.makedirs(output_dir, exist_ok=True)
-            logger.info(f"Output directory ready: {output_dir}")
-            
-            logger.info("Engines initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize engines: {e}")
+        """Start loading the face detection and swapping engines in the background."""
+        # Model loading and warm-up can take seconds; the window stays
+        # responsive and a scan requested meanwhile starts once they are ready
+        self.statusBar().showMessage("Loading face models...")
+        self.engine_thread = EngineInitThread()
+        self.engine_thread.engines_ready.connect(self.on_engines_ready)
+        self.engine_thread.start()
+    
+    def on_engines_ready(self, success, message):
+        """Take over the loaded engines, or report why loading failed."""
+        thread = self.engine_thread
+        thread.wait()
+        self.engine_thread = None
+        
+        if not success:
             QMessageBox.critical(
                 self, 
                 "Initialization Error", 
-                f"Failed to initialize face processing engines:\n\n{str(e)}\n\n"
+                f"Failed to initialize face processing engines:\n\n{message}\n\n"
                 "Ensure model files are downloaded:\npython download_models.py"
             )
-            sys.exit(1)
+            QApplication.instance().exit(1)
+            return
+        
+        self.face_detector = thread.face_detector
+        self.face_swapper = thread.face_swapper
+        logger.info("Engines initialized successfully")
+        self.statusBar().showMessage("Ready - Select a video file to begin")
+        
+        if self._scan_pending:
+            self._scan_pending = False
+            self.scan_faces()
     
     def select_video(self):
         """Open file dialog to select video."""
@@ -499,6 +543,13 @@ class MainWindow(QMainWindow):
         
         # Show inline progress
         self.scan_progress_label.setVisible(True)
+        
+        if self.face_detector is None:
+            # Started from on_engines_ready once the models are loaded
+            self._scan_pending = True
+            self.scan_progress_label.setText("Loading face models...")
+            return
+        
         self.scan_progress_label.setText("Starting face detection...")
         
         # Create and start scanning thread
@@ -543,42 +594,48 @@ class MainWindow(QMainWindow):
     
     def display_faces(self, faces):
         """Display detected faces in horizontal layout."""
-        # Clear existing faces
-        self.clear_faces()
-        
-        # Hide the no-faces placeholder
-        self.no_faces_label.setVisible(False)
-        
-        # Create face cards with responsive grid layout
-        cols = 4  # Number of columns before wrapping (reduced for better spacing)
-        for i, face_data in enumerate(faces):
-            face_card = FaceCard(i, face_data, self)
-            face_card.swap_image_selected.connect(self.on_swap_image_selected)
+        # One layout pass and repaint for the whole grid instead of one per card
+        self.faces_widget.setUpdatesEnabled(False)
+        try:
+            # Clear existing faces; the no-faces placeholder stays out of the grid
+            self._take_face_cards()
+            self.no_faces_label.setVisible(False)
             
-            row = i // cols
-            col = i % cols
-            self.faces_layout.addWidget(face_card, row, col)
-            self.face_cards.append(face_card)
+            # Create face cards with responsive grid layout
+            cols = 4  # Number of columns before wrapping (reduced for better spacing)
+            for i, face_data in enumerate(faces):
+                face_card = FaceCard(i, face_data, self)
+                face_card.swap_image_selected.connect(self.on_swap_image_selected)
+                face_card.swap_image_for_all.connect(self.apply_swap_to_all)
+                
+                row = i // cols
+                col = i % cols
+                self.faces_layout.addWidget(face_card, row, col)
+                self.face_cards.append(face_card)
+            
+            # Show placeholder if no faces
+            if not self.face_cards:
+                self.no_faces_label.setVisible(True)
+                self.faces_layout.addWidget(self.no_faces_label, 0, 0)
+        finally:
+            self.faces_widget.setUpdatesEnabled(True)
         
         # Update process button state
         self.update_process_button_state()
     
     def clear_faces(self):
         """Clear all face cards from the display."""
-        # Remove face cards
-        for face_card in self.face_cards:
-            self.faces_layout.removeWidget(face_card)
-            face_card.deleteLater()
-        
+        self.display_faces([])
+    
+    def _take_face_cards(self):
+        """Empty the face grid, scheduling the cards for deletion."""
+        while self.faces_layout.count():
+            widget = self.faces_layout.takeAt(0).widget()
+            if widget is not None and widget is not self.no_faces_label:
+                # Hidden now, so nothing paints it before deleteLater runs
+                widget.hide()
+                widget.deleteLater()
         self.face_cards.clear()
-        
-        # Show placeholder if no faces
-        if not self.face_cards:
-            self.no_faces_label.setVisible(True)
-            self.faces_layout.addWidget(self.no_faces_label, 0, 0)
-        
-        # Update process button state
-        self.update_process_button_state()
     
     def on_swap_image_selected(self, face_index, image_path):
         """Handle swap image selection."""
@@ -589,10 +646,7 @@ class MainWindow(QMainWindow):
                 logger.info(f"Swap image set for face {face_index}: {os.path.basename(image_path)}")
             else:
                 # Clear swap image
-                if face_index < len(self.face_detector.unique_faces):
-                    self.face_detector.unique_faces[face_index]['swap_image_path'] = None
-                    self.face_detector.unique_faces[face_index]['swap_image'] = None
-                    self.face_detector.unique_faces[face_index]['swap_landmarks'] = None
+                self.face_detector.clear_swap_image(face_index)
                 logger.info(f"Swap image cleared for face {face_index}")
             
             # Update process button state
@@ -602,6 +656,23 @@ class MainWindow(QMainWindow):
             logger.error(f"Error setting swap image: {e}")
             QMessageBox.warning(self, "Error", f"Failed to set swap image:\n{str(e)}")
     
+    def apply_swap_to_all(self, image_path):
+        """Assign one swap image to every face card.
+        
+        The cards are updated with their signals blocked and repainted once;
+        their swap_image_selected signals are then emitted together from a
+        single queued call instead of one round-trip per card.
+        """
+        self.scroll_area.setUpdatesEnabled(False)
+        try:
+            cards = [card for card in self.face_cards if card.set_swap_image_silent(image_path)]
+        finally:
+            self.scroll_area.setUpdatesEnabled(True)
+        
+        if cards:
+            QTimer.singleShot(0, lambda: [card.swap_image_selected.emit(card.face_index, image_path)
+                                          for card in cards])
+    
     def update_process_button_state(self):
         """Update the process button enabled state."""
         if self.face_detector and self.face_detector.is_ready_for_processing():
@@ -628,10 +699,9 @@ class MainWindow(QMainWindow):
         output_filename = f"{name_part}_swapped{ext}"
         
         # Create Videos/FaceSwap directory in user's home folder
-        videos_dir = os.path.expanduser("~/Videos/FaceSwap")
-        os.makedirs(videos_dir, exist_ok=True)
+        config.ensure_dirs()
         
-        output_path = os.path.join(videos_dir, output_filename)
+        output_path = os.path.join(config.OUTPUT_VIDEO_DIR, output_filename)
         
         # Show inline progress
         self.process_button.setEnabled(False)
@@ -641,7 +711,9 @@ class MainWindow(QMainWindow):
         
         # Create and start processing thread
         self.process_thread = VideoProcessingThread(
-            self.video_path, output_path, self.face_detector, self.face_swapper
+            self.video_path, output_path, self.face_detector, self.face_swapper,
+            frame_stride=config.CONFIG.process_frame_stride,
+            video_worker=self.video_worker
         )
         self.process_thread.progress_updated.connect(self.update_process_progress)
         self.process_thread.processing_finished.connect(self.on_processing_finished)
@@ -670,7 +742,7 @@ class MainWindow(QMainWindow):
         
         if success:
             # Get output path from user's Videos/FaceSwap folder
-            videos_dir = os.path.expanduser("~/Videos/FaceSwap")
+            videos_dir = config.OUTPUT_VIDEO_DIR
             
             # Try to find the output file
             input_filename = os.path.basename(self.video_path)
@@ -714,21 +786,16 @@ class MainWindow(QMainWindow):
     def open_video_file(self):
         """Open video file with default system player."""
         try:
-            import subprocess
-            import platform
-            
             video_path = getattr(self, 'output_video_path', None)
             if not video_path:
                 QMessageBox.warning(self, "Error", "No video file to open.")
                 return
             
-            system = platform.system()
-            if system == "Windows":
+            if self._open_command is None:
                 os.startfile(video_path)
-            elif system == "Darwin":  # macOS
-                subprocess.run(["open", video_path])
-            else:  # Linux
-                subprocess.run(["xdg-open", video_path])
+            else:
+                # Not waited on, so the GUI stays responsive while the player starts
+                subprocess.Popen([self._open_command, video_path])
                 
             logger.info(f"Opened video file: {video_path}")
         except Exception as e:
@@ -742,14 +809,25 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """Handle application close event."""
         # Cancel any running operations
+        # Bounded waits so a thread stuck in a long native call cannot hang the close
+        if self.engine_thread and self.engine_thread.isRunning():
+            # Model loading cannot be interrupted; just don't wait forever
+            if not self.engine_thread.wait(THREAD_STOP_TIMEOUT_MS):
+                logger.warning("Engine loading thread did not stop in time")
+        
         if self.scan_thread and self.scan_thread.isRunning():
             self.scan_thread.cancel()
             self.scan_thread.quit()
-            self.scan_thread.wait()
+            if not self.scan_thread.wait(THREAD_STOP_TIMEOUT_MS):
+                logger.warning("Face scanning thread did not stop in time")
         
         if self.process_thread and self.process_thread.isRunning():
             self.process_thread.cancel()
             self.process_thread.quit()
-            self.process_thread.wait()
+            if not self.process_thread.wait(THREAD_STOP_TIMEOUT_MS):
+                logger.warning("Video processing thread did not stop in time")
+        
+        if self.video_worker is not None:
+            self.video_worker.shutdown(THREAD_STOP_TIMEOUT_MS / 1000)
         
         event.accept()
\ No newline at end of file
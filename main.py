@@ -6,6 +6,7 @@ Main application entry point.
 
 import sys
 import os
+import multiprocessing
 import logging
 from pathlib import Path
 from PySide6.QtWidgets import QApplication, QMessageBox
@@ -17,6 +18,7 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from gui.main_window import MainWindow
+import config
 
 # Configure logging
 def setup_logging():
@@ -24,15 +26,14 @@ def setup_logging():
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     
     # Create logs directory
-    logs_dir = project_root / "logs"
-    logs_dir.mkdir(exist_ok=True)
+    config.ensure_dirs()
     
     logging.basicConfig(
         level=logging.INFO,
         format=log_format,
         handlers=[
             logging.StreamHandler(),
-            logging.FileHandler(logs_dir / 'faceswap.log')
+            logging.FileHandler(config.LOG_FILE_PATH)
         ]
     )
 
@@ -161,6 +162,8 @@ def main():
         return 1
 
 if __name__ == "__main__":
+    # Lets frozen builds start the video worker process from this executable
+    multiprocessing.freeze_support()
     # Ensure we're running from the correct directory
     os.chdir(project_root)
     exit_code = main()
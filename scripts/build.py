@@ -8,16 +8,41 @@ import sys
 import subprocess
 import argparse
 import os
+import platform
+import shutil
+import tarfile
 from pathlib import Path
 
-def run_command(cmd, description=""):
+# Compiler flags for a dlib build tuned to this machine
+NATIVE_DLIB_FLAGS = "-O3 -march=native -flto"
+# Where the dlib sources are unpacked and built
+DLIB_BUILD_DIR = Path("build") / "dlib"
+
+# Exercises dlib's detector, shape predictor and recognition network on the
+# first frames of a video; run against an instrumented build to collect a profile
+DLIB_PROFILE_WORKLOAD = """
+import sys
+import cv2
+from face_detector import FaceDetector
+detector = FaceDetector()
+cap = cv2.VideoCapture(sys.argv[1])
+for _ in range(int(sys.argv[2])):
+    ok, frame = cap.read()
+    if not ok:
+        break
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    for rect in detector.detect_faces(rgb):
+        detector.get_face_encoding(rgb, detector.predictor(rgb, rect))
+"""
+
+def run_command(cmd, description="", cwd=None):
     """Run a command and return success status."""
     if description:
         print(f"[INFO] {description}")
     
-    print(f"[CMD] {' '.join(cmd)}")
+    print(f"[CMD] {' '.join(str(part) for part in cmd)}")
     try:
-        result = subprocess.run(cmd, check=True)
+        result = subprocess.run(cmd, check=True, cwd=cwd)
         return True
     except subprocess.CalledProcessError as e:
         print(f"[ERROR] Command failed: {e}")
@@ -42,11 +67,74 @@ def run_tests():
         sys.executable, "run_tests.py", "--quick"
     ], "Running tests")
 
+def fetch_dlib_source():
+    """Download and unpack the dlib source release matching requirements.txt."""
+    if DLIB_BUILD_DIR.exists():
+        shutil.rmtree(DLIB_BUILD_DIR)
+    DLIB_BUILD_DIR.mkdir(parents=True)
+    if not run_command([
+        sys.executable, "-m", "pip", "download", "dlib>=19.24.0",
+        "--no-binary", ":all:", "--no-deps", "-d", str(DLIB_BUILD_DIR)
+    ], "Downloading dlib source"):
+        return None
+    
+    archive = next(DLIB_BUILD_DIR.glob("dlib-*.tar.gz"))
+    with tarfile.open(archive) as tar:
+        tar.extractall(DLIB_BUILD_DIR)
+    return archive.with_name(archive.name[:-len(".tar.gz")])
+
+def install_dlib(source_dir, compiler_flags, description):
+    """Build dlib from source_dir with compiler_flags and install it."""
+    # dlib's SIMD paths are CMake options rather than compiler flags
+    machine = platform.machine().lower()
+    if machine in ("x86_64", "amd64", "i386", "i686"):
+        simd = ["--set", "USE_AVX_INSTRUCTIONS=1"]
+    elif machine.startswith(("arm", "aarch64")):
+        simd = ["--set", "USE_NEON_INSTRUCTIONS=1"]
+        if machine.startswith("armv7"):
+            # 32-bit ARM only enables NEON on request; it is mandatory on aarch64
+            compiler_flags += " -mfpu=neon"
+    else:
+        simd = []
+    # Clear the previous build so every object is compiled with the new flags
+    shutil.rmtree(source_dir / "build", ignore_errors=True)
+    return run_command([
+        sys.executable, "setup.py", "install", *simd, "--compiler-flags", compiler_flags
+    ], description, cwd=source_dir)
+
+def build_native_dlib(profile_video=None, profile_frames=300):
+    """Rebuild dlib for this CPU, optionally with profile-guided optimization.
+    
+    With a profile video, an instrumented build first runs the face
+    detection workload on the video's first profile_frames frames, and dlib
+    is then rebuilt using the collected profile.
+    """
+    source_dir = fetch_dlib_source()
+    if source_dir is None:
+        return False
+    
+    if profile_video is None:
+        return install_dlib(source_dir, NATIVE_DLIB_FLAGS, "Building dlib for this CPU")
+    
+    profile_dir = (DLIB_BUILD_DIR / "profile").resolve()
+    return (
+        install_dlib(source_dir, f"{NATIVE_DLIB_FLAGS} -fprofile-generate={profile_dir}",
+                     "Building instrumented dlib") and
+        run_command([sys.executable, "-c", DLIB_PROFILE_WORKLOAD, profile_video, str(profile_frames)],
+                    "Collecting dlib profile") and
+        install_dlib(source_dir,
+                     f"{NATIVE_DLIB_FLAGS} -fprofile-use={profile_dir} -fprofile-correction -Wno-missing-profile",
+                     "Building profile-optimized dlib")
+    )
+
 def main():
     parser = argparse.ArgumentParser(description="FaceSwap Build Tool")
     parser.add_argument("command", choices=[
-        "setup", "install", "models", "test", "run"
+        "setup", "install", "models", "test", "run", "native-dlib"
     ], help="Command to execute")
+    parser.add_argument("--profile-video", help="native-dlib: video to collect a PGO profile on")
+    parser.add_argument("--profile-frames", type=int, default=300,
+                        help="native-dlib: frames of the profile video to run (default: 300)")
     
     args = parser.parse_args()
     
@@ -75,6 +163,9 @@ def main():
     
     elif args.command == "run":
         return 0 if run_command([sys.executable, "main.py"]) else 1
+    
+    elif args.command == "native-dlib":
+        return 0 if build_native_dlib(args.profile_video, args.profile_frames) else 1
 
 if __name__ == "__main__":
     sys.exit(main())
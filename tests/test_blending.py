@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+import pytest
+
+from utils import blending
+
+requires_scipy = pytest.mark.skipif(not blending.SCIPY_FFT_AVAILABLE,
+                                    reason="scipy.fft not installed")
+
+HEIGHT, WIDTH = 120, 160
+
+
+@pytest.fixture
+def scene():
+    """A smooth colour ramp as dst and a brighter blob as src, like a face over a background."""
+    yy, xx = np.mgrid[0:HEIGHT, 0:WIDTH].astype(np.float32)
+    dst = np.dstack([60 + xx * 0.5, 80 + yy * 0.6, 140 - xx * 0.3]).astype(np.uint8)
+    blob = 50 * np.exp(-((xx - 80) ** 2 + (yy - 60) ** 2) / (2 * 15 ** 2))
+    src = np.dstack([100 + blob, 120 + 0.5 * blob, 90 + 0.8 * blob]).astype(np.uint8)
+    mask = np.zeros((HEIGHT, WIDTH), dtype=np.uint8)
+    mask[30:90, 40:120] = 255
+    return src, dst, mask
+
+
+@requires_scipy
+class TestFFTPoissonBlend:
+    """The sine-transform Poisson solver used for aligned NORMAL_CLONE blends."""
+
+    def test_matches_seamless_clone(self, scene):
+        src, dst, mask = scene
+        blended = blending.fft_poisson_blend(src, dst, mask)
+        reference = cv2.seamlessClone(src, dst, mask.copy(), (80, 60), cv2.NORMAL_CLONE)
+
+        diff = np.abs(blended.astype(np.int16) - reference.astype(np.int16))[mask > 0]
+        assert diff.max() <= 4
+        assert diff.mean() < 1.5
+
+    def test_constant_offset_recovers_dst(self, scene):
+        _, dst, mask = scene
+        # Same gradients as dst everywhere, so the solution is dst itself
+        blended = blending.fft_poisson_blend(dst + 20, dst, mask)
+        assert np.abs(blended.astype(np.int16) - dst).max() <= 1
+
+    def test_pixels_outside_the_mask_are_untouched(self, scene):
+        src, dst, mask = scene
+        blended = blending.fft_poisson_blend(src, dst, mask)
+        assert np.array_equal(blended[mask == 0], dst[mask == 0])
+
+    def test_empty_mask_returns_dst(self, scene):
+        src, dst, mask = scene
+        mask[:] = 0
+        blended = blending.fft_poisson_blend(src, dst, mask)
+        assert blended is not dst
+        assert np.array_equal(blended, dst)
+
+    def test_mask_too_small_to_solve_returns_dst(self, scene):
+        src, dst, mask = scene
+        mask[:] = 0
+        # A corner pixel's bounding box plus boundary ring is only 2x2
+        mask[0, 0] = 255
+        out = dst.copy()
+        assert blending.fft_poisson_blend(src, dst, mask, out=out) is out
+        assert np.array_equal(out, dst)
+
+    def test_blends_into_out(self, scene):
+        src, dst, mask = scene
+        expected = blending.fft_poisson_blend(src, dst, mask)
+        out = dst.copy()
+        assert blending.fft_poisson_blend(src, out, mask, out=out) is out
+        assert np.array_equal(out, expected)
+
+    def test_shape_mismatch_is_rejected(self, scene):
+        src, dst, mask = scene
+        with pytest.raises(ValueError):
+            blending.fft_poisson_blend(src[:-1], dst, mask)
+
+
+class TestPoissonClone:
+    """Choice between the FFT solver and cv2.seamlessClone."""
+
+    @requires_scipy
+    def test_normal_clone_uses_the_fft_solver(self, scene):
+        src, dst, mask = scene
+        expected = blending.fft_poisson_blend(src, dst, mask)
+        assert np.array_equal(blending.poisson_clone(src, dst, mask, (80, 60)), expected)
+
+    def test_seamless_clone_leaves_the_mask_intact(self, scene):
+        src, dst, mask = scene
+        original = mask.copy()
+        blending.poisson_clone(src, dst, mask, (80, 60), flags=cv2.MIXED_CLONE)
+        assert np.array_equal(mask, original)
@@ -0,0 +1,72 @@
+import dataclasses
+
+import pytest
+
+import config
+
+
+class TestConfigClamping:
+    """Range checks applied when a Config is constructed."""
+
+    def test_values_are_clamped_into_range(self):
+        settings = config.Config(
+            face_detection_scale=5.0,
+            face_recognition_threshold=-1.0,
+            color_correction_strength=2.0,
+            detector_max_long_edge=10,
+            scan_frame_skip=0,
+            scan_sample_fps=-3.0,
+            mask_feather_amount=-4,
+            track_reseed_iou=1.5,
+        )
+        assert settings.face_detection_scale == 1.0
+        assert settings.face_recognition_threshold == 0.0
+        assert settings.color_correction_strength == 1.0
+        assert settings.detector_max_long_edge == 64
+        assert settings.scan_frame_skip == 1
+        assert settings.scan_sample_fps == 0.0
+        assert settings.mask_feather_amount == 0
+        assert settings.track_reseed_iou == 1.0
+
+    def test_values_are_coerced_to_their_field_type(self):
+        settings = config.Config(scan_frame_skip='12', face_detection_scale='0.5',
+                                 process_batch_frames=3.9)
+        assert settings.scan_frame_skip == 12 and isinstance(settings.scan_frame_skip, int)
+        assert settings.face_detection_scale == 0.5
+        assert settings.process_batch_frames == 3
+
+    def test_in_range_values_are_kept(self):
+        defaults = config.Config()
+        assert dataclasses.replace(defaults, detector_step=9).detector_step == 9
+        assert defaults.mask_feather_amount == config.MASK_FEATHER_AMOUNT
+
+    def test_replace_clamps_again(self):
+        settings = dataclasses.replace(config.Config(), process_frame_stride=0)
+        assert settings.process_frame_stride == 1
+
+
+class TestQualityPresets:
+    """Selecting the active settings by preset name."""
+
+    @pytest.fixture(autouse=True)
+    def restore_config(self, monkeypatch):
+        monkeypatch.setattr(config, 'CONFIG', config.CONFIG)
+
+    @pytest.mark.parametrize("name", sorted(config.QUALITY_PRESETS))
+    def test_apply_quality_preset_binds_config(self, name):
+        settings = config.apply_quality_preset(name)
+        assert settings is config.QUALITY_PRESETS[name]
+        assert config.CONFIG is settings
+        assert settings.quality_preset == name
+
+    def test_unknown_preset_is_rejected(self):
+        before = config.CONFIG
+        with pytest.raises(ValueError):
+            config.apply_quality_preset('ultra')
+        assert config.CONFIG is before
+
+    def test_presets_differ_in_the_knobs_they_tune(self):
+        fast = config.QUALITY_PRESETS['fast']
+        high = config.QUALITY_PRESETS['high_quality']
+        assert fast.mask_feather_amount < high.mask_feather_amount
+        assert fast.detector_step > high.detector_step
@@ -0,0 +1,70 @@
+import bz2
+import hashlib
+import os
+
+import pytest
+
+import download_models
+
+PAYLOAD = os.urandom(64 * 1024) + b"model weights" * 1000
+
+
+@pytest.fixture
+def serve(tmp_path):
+    """Write data to a file and return its file:// URL."""
+    def serve(data, name="model.dat.bz2"):
+        path = tmp_path / name
+        path.write_bytes(data)
+        return path.as_uri()
+    return serve
+
+
+class TestStreamBz2Download:
+    """Downloading a model through the bz2 decompressor."""
+
+    def test_decompresses_into_the_output_file(self, serve, tmp_path):
+        output_file = tmp_path / "model.dat"
+
+        digest = download_models.stream_bz2_download(serve(bz2.compress(PAYLOAD)), output_file)
+
+        assert output_file.read_bytes() == PAYLOAD
+        assert digest == hashlib.sha256(PAYLOAD).hexdigest()
+        assert not (tmp_path / "model.dat.part").exists()
+
+    def test_truncated_stream_keeps_the_existing_file(self, serve, tmp_path):
+        output_file = tmp_path / "model.dat"
+        output_file.write_bytes(b"previous model")
+        compressed = bz2.compress(PAYLOAD)
+
+        # The data ends before the bz2 end-of-stream marker
+        url = serve(compressed[:len(compressed) // 2])
+        with pytest.raises(EOFError):
+            download_models.stream_bz2_download(url, output_file)
+
+        assert output_file.read_bytes() == b"previous model"
+        assert not (tmp_path / "model.dat.part").exists()
+
+    def test_truncated_stream_is_a_failed_download(self, serve, tmp_path):
+        output_file = tmp_path / "model.dat"
+        url = serve(bz2.compress(PAYLOAD)[:-10])
+
+        assert download_models.download_model(url, output_file) is None
+        assert not output_file.exists()
+
+    def test_sha256_mismatch_fails_verification(self, serve, tmp_path):
+        output_file = tmp_path / "model.dat"
+        digest = download_models.stream_bz2_download(serve(bz2.compress(PAYLOAD)), output_file)
+
+        wrong = hashlib.sha256(b"another model").hexdigest()
+        assert not download_models.verify_file(output_file, wrong, digest)
+        assert download_models.verify_file(output_file, digest.upper(), digest)
+
+    def test_falls_back_to_the_second_url(self, serve, tmp_path):
+        output_file = tmp_path / "model.dat"
+        missing = (tmp_path / "missing.bz2").as_uri()
+
+        digest = download_models.download_model(missing, output_file,
+                                                fallback_url=serve(bz2.compress(PAYLOAD)))
+
+        assert digest == hashlib.sha256(PAYLOAD).hexdigest()
+        assert output_file.read_bytes() == PAYLOAD
@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+import config
+
+dlib = pytest.importorskip("dlib")
+import face_detector  # noqa: E402
+from face_detector import FaceDetector  # noqa: E402
+
+
+@pytest.fixture
+def scan_cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(config, 'SCAN_CACHE_DIR', cache_dir)
+    return cache_dir
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    """Stands in for a video; the cache key only stats the file."""
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"\0" * 1024)
+    return str(path)
+
+
+def add_face(detector, seed):
+    rng = np.random.default_rng(seed)
+    detector.add_unique_face(rng.integers(0, 256, (40, 32, 3), dtype=np.uint8),
+                             rng.standard_normal(128), dlib.rectangle(10, 20, 42, 60),
+                             rng.integers(0, 100, (68, 2)))
+
+
+class TestScanCache:
+    """Reusing scan results for an unchanged video."""
+
+    def test_round_trip(self, scan_cache_dir, video_file):
+        detector = FaceDetector(test_mode=True)
+        add_face(detector, 0)
+        add_face(detector, 1)
+        cache_path = detector._scan_cache_path(video_file, 10)
+        detector._save_scan_cache(cache_path)
+        assert cache_path.parent == scan_cache_dir
+        assert not cache_path.with_suffix('.part').exists()
+
+        loaded = FaceDetector(test_mode=True)
+        assert loaded._load_scan_cache(loaded._scan_cache_path(video_file, 10))
+
+        assert len(loaded.unique_faces) == 2
+        for saved, face in zip(detector.unique_faces, loaded.unique_faces):
+            assert np.array_equal(face.image, saved.image)
+            assert np.allclose(face.encoding, saved.encoding)
+            assert np.array_equal(face.landmarks, saved.landmarks)
+            assert (face.rect.left(), face.rect.top(), face.rect.right(), face.rect.bottom()) == \
+                (10, 20, 42, 60)
+        # The loaded faces are matched like scanned ones
+        assert loaded.find_similar_face(detector.unique_faces[1].encoding) == 1
+
+    def test_modified_video_misses(self, scan_cache_dir, video_file):
+        detector = FaceDetector(test_mode=True)
+        add_face(detector, 0)
+        detector._save_scan_cache(detector._scan_cache_path(video_file, 10))
+
+        stat = os.stat(video_file)
+        os.utime(video_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        loaded = FaceDetector(test_mode=True)
+        assert not loaded._load_scan_cache(loaded._scan_cache_path(video_file, 10))
+        assert loaded.unique_faces == []
+
+    def test_key_covers_scan_settings_and_model(self, scan_cache_dir, video_file):
+        detector = FaceDetector(test_mode=True)
+        dlib_path = detector._scan_cache_path(video_file, 10)
+        assert detector._scan_cache_path(video_file, 10) == dlib_path
+        assert detector._scan_cache_path(video_file, 5) != dlib_path
+
+        # Each ONNX export precision gets its own cache
+        detector.onnx_encoder = object()
+        detector._onnx_model_name = config.FACE_RECOGNITION_ONNX_MODEL.name
+        fp32_path = detector._scan_cache_path(video_file, 10)
+        detector._onnx_model_name = config.FACE_RECOGNITION_ONNX_MODEL_INT8.name
+        int8_path = detector._scan_cache_path(video_file, 10)
+        assert len({dlib_path, fp32_path, int8_path}) == 3
+
+    def test_missing_video_has_no_cache(self, scan_cache_dir, tmp_path):
+        detector = FaceDetector(test_mode=True)
+        assert detector._scan_cache_path(str(tmp_path / "missing.mp4"), 10) is None
+
+
+class ExclusiveDetector:
+    """HOG detector stand-in that records calls made while another is running."""
+
+    def __init__(self, registry):
+        self.lock = threading.Lock()
+        self.threads = set()
+        self.overlaps = 0
+        registry.append(self)
+
+    def __call__(self, image, *args):
+        if not self.lock.acquire(blocking=False):
+            self.overlaps += 1
+            return []
+        try:
+            self.threads.add(threading.get_ident())
+            # Long enough for the other workers to reach the detector
+            time.sleep(0.005)
+            return [dlib.rectangle(8, 8, 40, 40)]
+        finally:
+            self.lock.release()
+
+
+class BrightnessEncoder:
+    """Encodes a face as one of two identities, by the brightness of its frame."""
+
+    def compute_face_descriptor(self, frames, shapes):
+        return [[np.eye(128)[int(frame.mean() > 128)] for _ in frame_shapes]
+                for frame, frame_shapes in zip(frames, shapes)]
+
+
+def fake_predictor(image, rect):
+    return dlib.full_object_detection(rect, [dlib.point(i, i) for i in range(68)])
+
+
+@pytest.fixture
+def two_person_video(tmp_path):
+    """20 frames: a dark person in the first half, a bright one in the second."""
+    path = str(tmp_path / "two_people.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for i in range(20):
+        writer.write(np.full((48, 64, 3), 60 if i < 10 else 200, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+class TestParallelScan:
+    """Sampled frames detected on several worker threads."""
+
+    def test_workers_do_not_share_a_detector(self, scan_cache_dir, two_person_video,
+                                             monkeypatch):
+        detectors = []
+        monkeypatch.setattr(face_detector.dlib, 'get_frontal_face_detector',
+                            lambda: ExclusiveDetector(detectors))
+        detector = FaceDetector(test_mode=True)
+        detector.test_mode = False
+        detector.detector = ExclusiveDetector(detectors)
+        detector.predictor = fake_predictor
+        detector.face_encoder = BrightnessEncoder()
+        detector.scan_detect_workers = 3
+        detector.scan_frame_skip = 1
+        detector.face_detection_scale = 1.0
+        progress = []
+
+        faces = detector.scan_video_for_faces(two_person_video, progress.append, sample_fps=0)
+
+        # Results come back in frame order, so the dark face is found first
+        assert [int(face.image.mean() > 128) for face in faces] == [0, 1]
+        assert progress == sorted(progress) and progress[-1] == 100
+        worker_detectors = [d for d in detectors if d.threads]
+        assert detector.detector not in worker_detectors
+        assert len(worker_detectors) > 1
+        for d in worker_detectors:
+            assert d.overlaps == 0
+            assert len(d.threads) == 1
@@ -82,4 +82,63 @@ class TestFaceSwapper:
     @pytest.mark.skip(reason="Face swapper not yet implemented")
     def test_swap_faces(self):
         """Test basic face swapping functionality."""
-        pass
\ No newline at end of file
+        pass
+
+class TestFaceTracking:
+    """Detection/tracking alternation in the video swap loop."""
+
+    def test_frames_between_detections_use_tracker(self):
+        """Only every detector_step-th frame runs the detector; the rest are tracked."""
+        dlib = pytest.importorskip("dlib")
+        from face_swapper import FaceSwapper
+
+        swapper = FaceSwapper()
+        # Stock OpenCV has no KCF; the MIL fallback must still give a tracker
+        assert swapper._create_tracker() is not None
+
+        class CountingDetector:
+            """Finds one face on every call and nothing else."""
+            calls = 0
+
+            def detect_faces(self, frame):
+                self.calls += 1
+                return [dlib.rectangle(80, 60, 159, 139)]
+
+        detector = CountingDetector()
+        tracked = []
+        track_targets = swapper._track_targets
+        swapper._track_targets = lambda frame: tracked.append(1) or track_targets(frame)
+
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)
+        for _ in range(swapper.detector_step):
+            swapper.process_video_frame(frame.copy(), detector, {})
+
+        assert detector.calls == 1
+        assert len(tracked) == swapper.detector_step - 1
+        assert len(swapper._tracks) == 1
+
+
+class TestColorCorrection:
+    """Mean-color matching of the source face to the target."""
+
+    def test_strength_scales_the_gain(self):
+        pytest.importorskip("dlib")
+        from face_swapper import FaceSwapper
+
+        swapper = FaceSwapper()
+        # A ring of points standing in for the jawline and eyebrow landmarks
+        angles = np.linspace(0, 2 * np.pi, 68, endpoint=False)
+        landmarks = np.stack([50 + 30 * np.cos(angles), 50 + 30 * np.sin(angles)], axis=1)
+        landmarks = landmarks.astype(np.int32)
+        src = np.full((100, 100, 3), (100, 80, 60), dtype=np.uint8)
+        dst = np.full((100, 100, 3), (150, 80, 30), dtype=np.uint8)
+
+        def corrected(strength=None):
+            return swapper.color_correct_face(src, dst, landmarks, strength)[50, 50].tolist()
+
+        # The default keeps full matching, the behavior before the setting existed
+        assert swapper.color_correction_strength == 1.0
+        assert corrected() == [150, 80, 30]
+        assert corrected(0.0) == [100, 80, 60]
+        assert corrected(0.5) == [125, 80, 45]
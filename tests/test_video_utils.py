@@ -0,0 +1,111 @@
+import os
+import subprocess
+
+import cv2
+import numpy as np
+import pytest
+
+from utils import video_utils
+from utils.video_utils import VideoUtils
+
+FRAME_COUNT = 12
+
+
+@pytest.fixture(autouse=True)
+def clear_frame_count_cache():
+    video_utils._ffprobe_frame_count.cache_clear()
+    yield
+    video_utils._ffprobe_frame_count.cache_clear()
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (32, 24))
+    for i in range(FRAME_COUNT):
+        writer.write(np.full((24, 32, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+class FakeFFprobe:
+    """Stands in for subprocess.run, answering every ffprobe call the same way."""
+
+    def __init__(self):
+        self.stdout = ""
+        self.returncode = 0
+        self.error = None
+        self.calls = []
+
+    def __call__(self, cmd, **kwargs):
+        self.calls.append(cmd)
+        if self.error is not None:
+            raise self.error
+        return subprocess.CompletedProcess(cmd, self.returncode, stdout=self.stdout, stderr="")
+
+
+@pytest.fixture
+def ffprobe(monkeypatch):
+    """Pretend ffprobe is installed and record its calls."""
+    fake = FakeFFprobe()
+    monkeypatch.setattr(video_utils.shutil, 'which',
+                        lambda name: '/usr/bin/ffprobe' if name == 'ffprobe' else None)
+    monkeypatch.setattr(video_utils.subprocess, 'run', fake)
+    return fake
+
+
+class TestGetFrameCount:
+    """Frame counts from ffprobe, falling back to CAP_PROP_FRAME_COUNT."""
+
+    def test_uses_the_ffprobe_packet_count(self, video, ffprobe):
+        ffprobe.stdout = "42\n"
+        assert VideoUtils.get_frame_count(video) == 42
+        assert ffprobe.calls[0][0] == '/usr/bin/ffprobe'
+        assert ffprobe.calls[0][-1] == os.path.abspath(video)
+
+    def test_count_is_cached_until_the_file_changes(self, video, ffprobe):
+        ffprobe.stdout = "42\n"
+        VideoUtils.get_frame_count(video)
+        VideoUtils.get_frame_count(video)
+        assert len(ffprobe.calls) == 1
+
+        stat = os.stat(video)
+        os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        VideoUtils.get_frame_count(video)
+        assert len(ffprobe.calls) == 2
+
+    @pytest.mark.parametrize("stdout", ["", "N/A\n", "abc,def\n"])
+    def test_unparsable_output_falls_back(self, video, ffprobe, stdout):
+        ffprobe.stdout = stdout
+        assert VideoUtils.get_frame_count(video) == FRAME_COUNT
+
+    def test_ffprobe_error_falls_back(self, video, ffprobe):
+        ffprobe.returncode = 1
+        ffprobe.stdout = "42\n"
+        assert VideoUtils.get_frame_count(video) == FRAME_COUNT
+
+    @pytest.mark.parametrize("error", [FileNotFoundError("ffprobe"),
+                                       subprocess.TimeoutExpired("ffprobe", 60)])
+    def test_failed_ffprobe_run_falls_back(self, video, ffprobe, error):
+        ffprobe.error = error
+        assert VideoUtils.get_frame_count(video) == FRAME_COUNT
+
+    def test_without_ffprobe_uses_the_capture(self, video, monkeypatch):
+        monkeypatch.setattr(video_utils.shutil, 'which', lambda name: None)
+
+        def run(*args, **kwargs):
+            raise AssertionError("ffprobe is not installed")
+
+        monkeypatch.setattr(video_utils.subprocess, 'run', run)
+        assert VideoUtils.get_frame_count(video) == FRAME_COUNT
+
+        cap = cv2.VideoCapture(video)
+        try:
+            assert VideoUtils.get_frame_count(video, cap) == FRAME_COUNT
+            assert cap.isOpened()
+        finally:
+            cap.release()
+
+    def test_missing_video_has_no_frames(self, tmp_path, ffprobe):
+        assert VideoUtils.get_frame_count(str(tmp_path / "missing.avi")) == 0
+        assert ffprobe.calls == []
@@ -0,0 +1,184 @@
+import dataclasses
+import queue
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+import config
+import video_worker
+
+
+class InvertingSwapper:
+    """Stands in for FaceSwapper: inverts every frame in place."""
+
+    def reset_tracking(self):
+        pass
+
+    def process_video_frames_batch(self, frames, face_detector, face_data, in_place=False):
+        for frame in frames:
+            np.subtract(255, frame, out=frame)
+        return frames
+
+
+@pytest.fixture
+def opencv_output(monkeypatch):
+    """Write MJPG through cv2.VideoWriter so the tests do not depend on ffmpeg."""
+    settings = dataclasses.replace(config.CONFIG, output_video_encoder='opencv',
+                                   output_video_codec='MJPG')
+    monkeypatch.setattr(config, 'CONFIG', settings)
+
+
+@pytest.fixture
+def gray_video(tmp_path):
+    """30 uniform frames whose gray level rises by 5 per frame."""
+    path = str(tmp_path / "input.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), 40 + i * 5, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+class TestProcessVideo:
+    """The decode/swap/encode pipeline run in the calling thread."""
+
+    def test_processes_every_strided_frame(self, gray_video, tmp_path, opencv_output):
+        output_path = str(tmp_path / "output.avi")
+        progress = []
+
+        success, message = video_worker.process_video(
+            gray_video, output_path, None, InvertingSwapper(), frame_stride=2,
+            progress_callback=lambda value, text: progress.append(value)
+        )
+
+        assert success, message
+        assert progress[0] == 0 and progress[-1] == 100
+        cap = cv2.VideoCapture(output_path)
+        levels = []
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            levels.append(int(frame.mean().round()))
+        cap.release()
+        # Frames 0, 2, 4, ... inverted, within JPEG rounding
+        expected = [255 - (40 + i * 5) for i in range(0, 30, 2)]
+        assert len(levels) == len(expected)
+        assert max(abs(a - b) for a, b in zip(levels, expected)) <= 2
+
+    def test_cancel_removes_partial_output(self, gray_video, tmp_path, opencv_output):
+        output_path = tmp_path / "output.avi"
+        cancel_event = threading.Event()
+        cancel_event.set()
+
+        success, message = video_worker.process_video(
+            gray_video, str(output_path), None, InvertingSwapper(), cancel_event=cancel_event
+        )
+
+        assert not success
+        assert "cancelled" in message
+        assert not output_path.exists()
+
+    def test_missing_video_fails(self, tmp_path):
+        success, message = video_worker.process_video(
+            str(tmp_path / "missing.avi"), str(tmp_path / "output.avi"), None, InvertingSwapper()
+        )
+        assert not success
+        assert "Could not open video" in message
+
+
+class FakeCapture:
+    """Decodes frames whose pixels hold their index, into the buffer it is given."""
+
+    def __init__(self, frame_count):
+        self.frame_count = frame_count
+        self.index = -1
+
+    def grab(self):
+        self.index += 1
+        return self.index < self.frame_count
+
+    def retrieve(self, buffer=None):
+        if buffer is None:
+            buffer = np.empty((4, 4, 3), dtype=np.uint8)
+        buffer.fill(self.index)
+        return True, buffer
+
+
+class RecordingWriter:
+    """Records the value and buffer identity of every written frame."""
+
+    def __init__(self):
+        self.values = []
+        self.buffers = set()
+
+    def write(self, frame):
+        self.values.append(int(frame[0, 0, 0]))
+        self.buffers.add(id(frame))
+
+
+class TestFrameRing:
+    """Buffer handoff between the reader and writer threads."""
+
+    def test_frames_cycle_through_the_ring(self):
+        queue_size, batch_size = 2, 1
+        ring = [np.empty((4, 4, 3), dtype=np.uint8) for _ in range(2 * queue_size + batch_size + 2)]
+        free_frames = queue.SimpleQueue()
+        for buffer in ring:
+            free_frames.put(buffer)
+        read_queue = queue.Queue(maxsize=queue_size)
+        write_queue = queue.Queue(maxsize=queue_size)
+        out = RecordingWriter()
+
+        reader = threading.Thread(target=video_worker._read_frames,
+                                  args=(FakeCapture(40), read_queue, threading.Event(), 3,
+                                        free_frames))
+        writer = threading.Thread(target=video_worker._write_frames,
+                                  args=(out, write_queue, free_frames))
+        reader.start()
+        writer.start()
+        while (frame := read_queue.get(timeout=5)) is not None:
+            write_queue.put(frame)
+        write_queue.put(None)
+        reader.join(5)
+        writer.join(5)
+
+        assert out.values == list(range(0, 40, 3))
+        # Every decode reused a ring buffer; none were allocated
+        assert out.buffers <= {id(buffer) for buffer in ring}
+        assert free_frames.qsize() == len(ring)
+
+    def test_writer_makes_strided_frames_contiguous(self):
+        frames = queue.Queue()
+        base = np.arange(4 * 8 * 3, dtype=np.uint8).reshape(4, 8, 3)
+        frames.put(base[:, ::2])
+        frames.put(None)
+        written = []
+
+        class Writer:
+            def write(self, frame):
+                written.append(frame)
+
+        video_worker._write_frames(Writer(), frames)
+
+        assert written[0].flags['C_CONTIGUOUS']
+        assert np.array_equal(written[0], base[:, ::2])
+
+
+class TestVideoWorker:
+    """Job submission to the worker process."""
+
+    def test_cancel_before_submit_does_not_start_a_job(self, tmp_path):
+        worker = video_worker.VideoWorker()
+        cancel_event = threading.Event()
+        cancel_event.set()
+
+        success, message = worker.process_video(
+            "input.mp4", str(tmp_path / "output.mp4"), [], cancel_event=cancel_event
+        )
+
+        assert not success
+        assert "cancelled" in message
+        assert worker._process is None
@@ -7,7 +7,7 @@ This package contains utility functions and helper classes for:
 - Smoothing algorithms
 """
 
-from .video_utils import VideoUtils
+from .video_utils import VideoUtils, CudaVideoReader, FFmpegVideoWriter
 from .smoothing import EMA, OneEuroFilter, LandmarkSmoother
 
-__all__ = ['VideoUtils', 'EMA', 'OneEuroFilter', 'LandmarkSmoother']
\ No newline at end of file
+__all__ = ['VideoUtils', 'CudaVideoReader', 'FFmpegVideoWriter', 'EMA', 'OneEuroFilter', 'LandmarkSmoother']
\ No newline at end of file
@@ -1,6 +1,15 @@
 import cv2
 import numpy as np
 
+try:
+    from scipy.fft import dstn, idstn
+    SCIPY_FFT_AVAILABLE = True
+except Exception:
+    SCIPY_FFT_AVAILABLE = False
+
+# 5-point discrete Laplacian
+_LAPLACIAN_KERNEL = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]], dtype=np.float32)
+
 def gaussian_pyramid(img, levels):
     g = img.copy().astype(np.float32)
     gp = [g]
@@ -29,17 +38,27 @@ def reconstruct_from_laplacian(lp):
     return img
 
 
-def laplacian_blend(img1, img2, mask, levels=4):
+def _output(dst, out):
+    """Array that receives a blend of dst: a copy of dst, or out holding dst's pixels."""
+    if out is None:
+        return dst.copy()
+    if out is not dst:
+        np.copyto(out, dst)
+    return out
+
+
+def laplacian_blend(img1, img2, mask, levels=4, out=None):
     """Blend two images using Laplacian pyramids and a mask.
 
     img1, img2: uint8 BGR images same size
     mask: single channel 0..255
+    out: optional uint8 array of the same shape that receives the result
     """
     if img1.shape != img2.shape:
         raise ValueError('Images must be same shape')
 
+    # Single-channel mask pyramid, broadcast over the color channels when blending
     mask_f = (mask.astype(np.float32) / 255.0)
-    mask_f = cv2.merge([mask_f, mask_f, mask_f])
 
     gp1 = gaussian_pyramid(img1, levels)
     gp2 = gaussian_pyramid(img2, levels)
@@ -50,11 +69,16 @@ def laplacian_blend(img1, img2, mask, levels=4):
 
     LS = []
     for l1, l2, lm in zip(lp1, lp2, gpm):
-        LS.append(l1 * lm + l2 * (1.0 - lm))
+        if l1.ndim == 3:
+            lm = lm[..., None]
+        LS.append(l2 + lm * (l1 - l2))
 
     blended = reconstruct_from_laplacian(LS)
-    blended = np.clip(blended, 0, 255).astype(np.uint8)
-    return blended
+    np.clip(blended, 0, 255, out=blended)
+    if out is None:
+        return blended.astype(np.uint8)
+    np.copyto(out, blended, casting='unsafe')
+    return out
 
 
 def create_adaptive_feather_mask(mask, feather_radius=15):
@@ -72,11 +96,113 @@ def create_adaptive_feather_mask(mask, feather_radius=15):
     return feather
 
 
-def poisson_clone(src, dst, mask, center, flags=cv2.NORMAL_CLONE):
+def fft_poisson_blend(src, dst, mask, out=None):
+    """Poisson (gradient domain) blend of src into dst with a DST-I solver.
+
+    src and dst are aligned uint8 images of the same shape; mask marks the
+    pixels to take gradients from src. Inside the mask's bounding box the
+    Poisson equation is solved directly in the sine-transform domain, with
+    dst as the Dirichlet boundary, instead of iteratively. The result goes
+    to out when given, which may be dst itself.
+    """
+    if src.shape != dst.shape:
+        raise ValueError('Images must be same shape')
+
+    inside = mask > 0
+    ys, xs = np.nonzero(inside)
+    if len(ys) == 0:
+        return _output(dst, out)
+
+    # Bounding box of the mask with a one pixel boundary ring, kept inside the image
+    h, w = dst.shape[:2]
+    y0, y1 = max(ys.min() - 1, 0), min(ys.max() + 2, h)
+    x0, x1 = max(xs.min() - 1, 0), min(xs.max() + 2, w)
+    if y1 - y0 < 3 or x1 - x0 < 3:
+        return _output(dst, out)
+
+    src_roi = src[y0:y1, x0:x1].astype(np.float32)
+    dst_roi = dst[y0:y1, x0:x1].astype(np.float32)
+    inside_roi = inside[y0:y1, x0:x1]
+    if src_roi.ndim == 2:
+        src_roi, dst_roi = src_roi[..., None], dst_roi[..., None]
+
+    # Guidance field: src gradients inside the mask, dst gradients elsewhere
+    lap_src = cv2.filter2D(src_roi, -1, _LAPLACIAN_KERNEL, borderType=cv2.BORDER_REPLICATE)
+    lap_dst = cv2.filter2D(dst_roi, -1, _LAPLACIAN_KERNEL, borderType=cv2.BORDER_REPLICATE)
+    lap_src = lap_src.reshape(src_roi.shape)
+    lap_dst = lap_dst.reshape(dst_roi.shape)
+    guidance = np.where(inside_roi[..., None], lap_src, lap_dst)[1:-1, 1:-1]
+
+    # Move the known boundary values to the right hand side
+    boundary = dst_roi.copy()
+    boundary[1:-1, 1:-1] = 0
+    lap_boundary = cv2.filter2D(boundary, -1, _LAPLACIAN_KERNEL, borderType=cv2.BORDER_REPLICATE)
+    rhs = guidance - lap_boundary.reshape(boundary.shape)[1:-1, 1:-1]
+
+    # Eigenvalues of the 5-point Laplacian with zero Dirichlet boundaries
+    n, m = rhs.shape[:2]
+    eig_y = 2.0 * np.cos(np.pi * np.arange(1, n + 1) / (n + 1)) - 2.0
+    eig_x = 2.0 * np.cos(np.pi * np.arange(1, m + 1) / (m + 1)) - 2.0
+    denom = (eig_y[:, None] + eig_x[None, :])[..., None]
+
+    solution = idstn(dstn(rhs, type=1, axes=(0, 1)) / denom, type=1, axes=(0, 1))
+
+    result = _output(dst, out)
+    blended = np.clip(solution, 0, 255).astype(dst.dtype).reshape(result[y0 + 1:y1 - 1, x0 + 1:x1 - 1].shape)
+    region = result[y0 + 1:y1 - 1, x0 + 1:x1 - 1]
+    region_inside = inside_roi[1:-1, 1:-1]
+    region[region_inside] = blended[region_inside]
+    return result
+
+
+def seamless_clone_roi(src, dst, mask, flags=cv2.NORMAL_CLONE, out=None):
+    """cv2.seamlessClone of aligned, same-size images over the mask's bounding box.
+
+    Only the mask's bounding box of src and mask, and that box plus a small
+    margin of dst, are handed to OpenCV, and the clone is placed so the
+    source stays aligned with dst. The blended patch is pasted into a copy
+    of dst, or into out when given, which may be dst itself.
+    """
+    x, y, w, h = cv2.boundingRect((mask > 0).astype(np.uint8))
+    if w == 0 or h == 0:
+        return _output(dst, out)
+
+    # seamlessClone needs the placed patch strictly inside dst
+    pad = 2
+    dh, dw = dst.shape[:2]
+    x0, y0 = max(x - pad, 0), max(y - pad, 0)
+    x1, y1 = min(x + w + pad, dw), min(y + h + pad, dh)
+
+    # Patch center in dst ROI coordinates that puts the box back at (x, y)
+    center = (x - x0 + w // 2, y - y0 + h // 2)
+    # seamlessClone erodes the mask it is given in place; hand it a copy, not a view
+    cloned = cv2.seamlessClone(src[y:y + h, x:x + w], dst[y0:y1, x0:x1],
+                               mask[y:y + h, x:x + w].copy(), center, flags)
+
+    result = _output(dst, out)
+    result[y0:y1, x0:x1] = cloned
+    return result
+
+
+def poisson_clone(src, dst, mask, center, flags=cv2.NORMAL_CLONE, out=None):
+    # out, when given, receives the result and may be dst itself
+    # Aligned, same-size inputs are blended in place with the FFT solver
+    if SCIPY_FFT_AVAILABLE and flags == cv2.NORMAL_CLONE and src.shape == dst.shape:
+        try:
+            return fft_poisson_blend(src, dst, mask, out=out)
+        except Exception:
+            pass
     try:
-        return cv2.seamlessClone(src, dst, mask, center, flags)
+        if src.shape == dst.shape:
+            return seamless_clone_roi(src, dst, mask, flags, out=out)
+        result = cv2.seamlessClone(src, dst, mask.copy(), center, flags)
     except Exception:
-        # fallback to simple alpha blend
-        mask_norm = (mask.astype(np.float32) / 255.0)
-        mask_norm = np.dstack([mask_norm]*3)
-        return (src * mask_norm + dst * (1-mask_norm)).astype(np.uint8)
+        # fallback to simple alpha blend, weighted straight from uint8 in one pass
+        mask_norm = mask.astype(np.float32) * (1.0 / 255.0)
+        if mask_norm.ndim == 3:
+            mask_norm = mask_norm[:, :, 0]
+        result = cv2.blendLinear(src, dst, mask_norm, 1.0 - mask_norm)
+    if out is None:
+        return result
+    np.copyto(out, result)
+    return out
@@ -1,17 +1,99 @@
 import cv2
 import numpy as np
 import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from functools import lru_cache
 from typing import Tuple, Optional, List
 import logging
 
 logger = logging.getLogger(__name__)
 
+# H.264 encoders tried by FFmpegVideoWriter in 'auto' mode, hardware first
+FFMPEG_H264_ENCODERS = (
+    ['h264_videotoolbox', 'libx264'] if sys.platform == 'darwin'
+    else ['h264_nvenc', 'h264_qsv', 'h264_vaapi', 'libx264']
+)
+VAAPI_DEVICE = '/dev/dri/renderD128'
+
 class VideoUtils:
     """
     Utility class for video processing operations.
     Provides helper functions for video file handling and analysis.
     """
     
+    @staticmethod
+    def open_capture(video_path: str) -> cv2.VideoCapture:
+        """Open a video for reading, asking the backend for hardware decoding where supported."""
+        if hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+            cap = cv2.VideoCapture(video_path, cv2.CAP_ANY,
+                                   [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+            if cap.isOpened():
+                return cap
+            cap.release()
+        return cv2.VideoCapture(video_path)
+    
+    @staticmethod
+    def open_writer(output_path: str, fps: float, frame_size: Tuple[int, int],
+                    encoder: str = 'auto', codec: str = 'mp4v', bitrate: str = '8M'):
+        """Open a video for writing BGR frames.
+        
+        Args:
+            output_path: Output file path
+            fps: Output frame rate
+            frame_size: (width, height) of the frames
+            encoder: ffmpeg encoder name, 'auto' for the fastest H.264 encoder
+                that works here, or 'opencv' for cv2.VideoWriter only
+            codec: FourCC for the cv2.VideoWriter fallback
+            bitrate: Target bitrate for the ffmpeg encoder
+            
+        Returns:
+            An FFmpegVideoWriter, or a cv2.VideoWriter if ffmpeg is unavailable
+        """
+        if encoder != 'opencv':
+            writer = FFmpegVideoWriter.open(output_path, fps, frame_size, encoder, bitrate)
+            if writer is not None:
+                return writer
+        return cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*codec), fps, frame_size)
+    
+    @staticmethod
+    def get_frame_count(video_path: str, cap: Optional[cv2.VideoCapture] = None) -> int:
+        """Count the frames of a video.
+        
+        CAP_PROP_FRAME_COUNT is estimated from the duration and frame rate in
+        many containers and is wrong for variable frame rate video, so the
+        video stream's packets are counted with ffprobe where it is installed.
+        The count is cached until the file changes.
+        
+        Args:
+            video_path: Video file path
+            cap: Already opened capture of the video, used for the fallback
+            
+        Returns:
+            Number of frames, or 0 if it is unknown
+        """
+        ffprobe = shutil.which('ffprobe')
+        if ffprobe is not None:
+            try:
+                stat = os.stat(video_path)
+            except OSError:
+                stat = None
+            if stat is not None:
+                count = _ffprobe_frame_count(ffprobe, os.path.abspath(video_path),
+                                             stat.st_mtime_ns, stat.st_size)
+                if count is not None:
+                    return count
+        
+        if cap is not None:
+            return max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        cap = cv2.VideoCapture(video_path)
+        try:
+            return max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT))) if cap.isOpened() else 0
+        finally:
+            cap.release()
+    
     @staticmethod
     def get_video_info(video_path: str) -> dict:
         """Get comprehensive information about a video file."""
@@ -26,7 +108,7 @@ class VideoUtils:
                 'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
                 'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
                 'fps': cap.get(cv2.CAP_PROP_FPS),
-                'frame_count': int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+                'frame_count': VideoUtils.get_frame_count(video_path, cap),
                 'duration': 0,
                 'size_mb': 0
             }
@@ -132,4 +214,166 @@ class VideoUtils:
             
         except Exception as e:
             logger.error(f"Error extracting frame at time {time_seconds}: {e}")
-            return None
\ No newline at end of file
+            return None
+
+class CudaVideoReader:
+    """
+    Hardware video decoder built on cv2.cudacodec.
+    
+    Mirrors the grab()/read()/release() subset of cv2.VideoCapture, except
+    that read() returns RGB frames: decoding and the color conversion run on
+    the GPU and only the finished frame is downloaded.
+    """
+    
+    def __init__(self, reader):
+        self._reader = reader
+        self._gpu_rgb = cv2.cuda_GpuMat()
+    
+    @classmethod
+    def open(cls, video_path: str) -> Optional['CudaVideoReader']:
+        """Open video_path on the GPU, or return None if OpenCV has no usable CUDA decoder."""
+        try:
+            if not hasattr(cv2, 'cudacodec') or cv2.cuda.getCudaEnabledDeviceCount() == 0:
+                return None
+            return cls(cv2.cudacodec.createVideoReader(video_path))
+        except Exception as e:
+            logger.info(f"GPU video decoding not available, using CPU: {e}")
+            return None
+    
+    def grab(self) -> bool:
+        """Advance one frame without downloading it."""
+        return self._reader.grab()
+    
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Return the last grabbed frame as an RGB array."""
+        ret, gpu_frame = self._reader.retrieve()
+        return self._download_rgb(ret, gpu_frame)
+    
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Decode the next frame and return it as an RGB array."""
+        ret, gpu_frame = self._reader.nextFrame()
+        return self._download_rgb(ret, gpu_frame)
+    
+    def _download_rgb(self, ret: bool, gpu_frame) -> Tuple[bool, Optional[np.ndarray]]:
+        """Convert a decoded GPU frame to RGB and download it."""
+        if not ret or gpu_frame is None or gpu_frame.empty():
+            return False, None
+        
+        code = cv2.COLOR_BGRA2RGB if gpu_frame.channels() == 4 else cv2.COLOR_BGR2RGB
+        cv2.cuda.cvtColor(gpu_frame, code, self._gpu_rgb)
+        return True, self._gpu_rgb.download()
+    
+    def release(self):
+        """Drop the decoder."""
+        self._reader = None
+
+class FFmpegVideoWriter:
+    """
+    Video encoder that pipes raw BGR frames into an ffmpeg subprocess.
+    
+    Mirrors the write()/release() subset of cv2.VideoWriter, but encodes
+    H.264, on the GPU's fixed-function encoder (NVENC, Quick Sync, VAAPI,
+    VideoToolbox) when one is available and with libx264 otherwise.
+    """
+    
+    def __init__(self, process: subprocess.Popen, encoder: str, log_file):
+        self._process = process
+        self._log_file = log_file
+        self.encoder = encoder
+    
+    @classmethod
+    def open(cls, output_path: str, fps: float, frame_size: Tuple[int, int],
+             encoder: str = 'auto', bitrate: str = '8M') -> Optional['FFmpegVideoWriter']:
+        """Start ffmpeg writing to output_path, or return None if no encoder works."""
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            logger.info("ffmpeg not found, using OpenCV video writer")
+            return None
+        
+        candidates = FFMPEG_H264_ENCODERS if encoder == 'auto' else [encoder]
+        for name in candidates:
+            if _ffmpeg_encoder_works(ffmpeg, name):
+                break
+        else:
+            logger.info(f"No usable ffmpeg encoder among {candidates}, using OpenCV video writer")
+            return None
+        
+        width, height = frame_size
+        global_args, codec_args = _ffmpeg_encoder_args(name)
+        cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y', *global_args,
+               '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}',
+               '-r', f'{fps:g}', '-i', '-',
+               *codec_args, '-b:v', bitrate, output_path]
+        log_file = tempfile.TemporaryFile()
+        try:
+            process = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                       stdout=subprocess.DEVNULL, stderr=log_file)
+        except OSError as e:
+            log_file.close()
+            logger.warning(f"Could not start ffmpeg, using OpenCV video writer: {e}")
+            return None
+        
+        logger.info(f"Encoding video with ffmpeg {name}")
+        return cls(process, name, log_file)
+    
+    def isOpened(self) -> bool:
+        """True while the ffmpeg process is running."""
+        return self._process.poll() is None
+    
+    def write(self, frame: np.ndarray):
+        """Encode one BGR frame of the configured size."""
+        # Written through the buffer protocol, without a tobytes() copy
+        self._process.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8))
+    
+    def release(self):
+        """Finish the stream and wait for ffmpeg to write the file."""
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        if self._process.wait() != 0:
+            self._log_file.seek(0)
+            message = self._log_file.read().decode(errors='replace').strip()
+            logger.error(f"ffmpeg {self.encoder} exited with code {self._process.returncode}: {message}")
+        self._log_file.close()
+        self._process = None
+
+def _ffmpeg_encoder_args(encoder: str) -> Tuple[List[str], List[str]]:
+    """Global and output arguments for an ffmpeg video encoder."""
+    if encoder == 'h264_vaapi':
+        # VAAPI encodes from NV12 surfaces uploaded to the device
+        return ['-vaapi_device', VAAPI_DEVICE], ['-vf', 'format=nv12,hwupload', '-c:v', encoder]
+    if encoder == 'h264_nvenc':
+        return [], ['-c:v', encoder, '-preset', 'p4', '-pix_fmt', 'yuv420p']
+    if encoder == 'libx264':
+        return [], ['-c:v', encoder, '-preset', 'veryfast', '-pix_fmt', 'yuv420p']
+    return [], ['-c:v', encoder, '-pix_fmt', 'yuv420p']
+
+@lru_cache(maxsize=None)
+def _ffmpeg_encoder_works(ffmpeg: str, encoder: str) -> bool:
+    """Encode one test frame; hardware encoders are listed even without the hardware."""
+    global_args, codec_args = _ffmpeg_encoder_args(encoder)
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error', *global_args,
+           '-f', 'lavfi', '-i', 'color=c=black:s=256x256:r=1', '-frames:v', '1',
+           *codec_args, '-f', 'null', '-']
+    try:
+        return subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL, timeout=15).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+@lru_cache(maxsize=64)
+def _ffprobe_frame_count(ffprobe: str, video_path: str, mtime_ns: int, size: int) -> Optional[int]:
+    """Packets in the first video stream, one per frame; None if ffprobe fails.
+    
+    mtime_ns and size are only part of the cache key.
+    """
+    cmd = [ffprobe, '-v', 'error', '-select_streams', 'v:0', '-count_packets',
+           '-show_entries', 'stream=nb_read_packets', '-of', 'csv=p=0', video_path]
+    try:
+        result = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=60)
+        return int(result.stdout.strip().split(',')[0]) if result.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
@@ -1,5 +1,7 @@
 import numpy as np
 import cv2
+from collections import OrderedDict
+from functools import lru_cache
 from typing import List, Tuple
 
 try:
@@ -12,25 +14,142 @@ except Exception:
     logger = logging.getLogger(__name__)
     logger.warning("scikit-image not available - TPS warping disabled")
 
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except Exception:
+    SCIPY_AVAILABLE = False
+
+try:
+    CUDA_AVAILABLE = cv2.cuda.getCudaEnabledDeviceCount() > 0
+except Exception:
+    CUDA_AVAILABLE = False
+
+# Averaging weights for the right eye, left eye and mouth centers of the
+# 68-point landmarks, so all three come out of a single matrix product
+KEY_POINT_WEIGHTS = np.zeros((3, 68))
+for _row, (_start, _stop) in enumerate([(36, 42), (42, 48), (48, 68)]):
+    KEY_POINT_WEIGHTS[_row, _start:_stop] = 1.0 / (_stop - _start)
+
+# Source images kept on the GPU between frames, keyed by id(image)
+GPU_SOURCE_CACHE_SIZE = 8
+_gpu_sources = OrderedDict()
+
 
 def apply_affine_warp(src_img: np.ndarray, src_landmarks: np.ndarray,
                       dst_landmarks: np.ndarray, output_shape: Tuple[int, int]) -> np.ndarray:
     """Simple global affine warp based on 3 key points (eyes + mouth)."""
-    src_points = np.array([
-        np.mean(src_landmarks[36:42], axis=0),
-        np.mean(src_landmarks[42:48], axis=0),
-        np.mean(src_landmarks[48:68], axis=0),
-    ], dtype=np.float32)
-
-    dst_points = np.array([
-        np.mean(dst_landmarks[36:42], axis=0),
-        np.mean(dst_landmarks[42:48], axis=0),
-        np.mean(dst_landmarks[48:68], axis=0),
-    ], dtype=np.float32)
+    src_points = (KEY_POINT_WEIGHTS @ src_landmarks).astype(np.float32)
+    dst_points = (KEY_POINT_WEIGHTS @ dst_landmarks).astype(np.float32)
 
     M = cv2.getAffineTransform(src_points, dst_points)
-    warped = cv2.warpAffine(src_img, M, (output_shape[1], output_shape[0]), flags=cv2.INTER_LINEAR)
-    return warped
+    return warp_affine_cropped(src_img, M, output_shape)
+
+
+def warp_affine_cropped(src_img: np.ndarray, M: np.ndarray, output_shape: Tuple[int, int]) -> np.ndarray:
+    """cv2.warpAffine restricted to where the source image lands in the output.
+
+    Only the bounding box of the transformed source rectangle is warped;
+    the rest of the output, which warpAffine would fill with zeros, is left
+    zero without being visited.
+    """
+    h, w = output_shape[:2]
+    out = np.zeros((h, w) + src_img.shape[2:], dtype=src_img.dtype)
+
+    src_h, src_w = src_img.shape[:2]
+    corners = np.array([[0, 0, 1], [src_w, 0, 1], [0, src_h, 1], [src_w, src_h, 1]], dtype=np.float64)
+    mapped = corners @ np.asarray(M, dtype=np.float64).T
+    x0, y0 = np.maximum(np.floor(mapped.min(axis=0)).astype(int) - 1, 0)
+    x1, y1 = np.minimum(np.ceil(mapped.max(axis=0)).astype(int) + 1, (w, h))
+    if x1 <= x0 or y1 <= y0:
+        return out
+
+    # Shift the transform so the crop's top-left corner is the origin
+    M_crop = np.array(M, dtype=np.float64)
+    M_crop[:, 2] -= (x0, y0)
+    out[y0:y1, x0:x1] = _warp_affine(src_img, M_crop, (int(x1 - x0), int(y1 - y0)))
+    return out
+
+
+def _upload_source(src_img: np.ndarray):
+    """GpuMat copy of src_img; swap images are reused every frame, so uploads are cached."""
+    entry = _gpu_sources.get(id(src_img))
+    if entry is not None and entry[0] is src_img:
+        _gpu_sources.move_to_end(id(src_img))
+        return entry[1]
+
+    gpu_img = cv2.cuda_GpuMat()
+    gpu_img.upload(src_img)
+    _gpu_sources[id(src_img)] = (src_img, gpu_img)
+    if len(_gpu_sources) > GPU_SOURCE_CACHE_SIZE:
+        _gpu_sources.popitem(last=False)
+    return gpu_img
+
+
+def _warp_affine(src_img: np.ndarray, M: np.ndarray, dsize: Tuple[int, int]) -> np.ndarray:
+    """cv2.warpAffine, run with cv2.cuda when OpenCV has a CUDA device."""
+    if CUDA_AVAILABLE:
+        try:
+            return cv2.cuda.warpAffine(_upload_source(src_img), M, dsize, flags=cv2.INTER_LINEAR).download()
+        except cv2.error:
+            pass
+    return cv2.warpAffine(src_img, M, dsize, flags=cv2.INTER_LINEAR)
+
+
+def _remap(src_img: np.ndarray, map_x: np.ndarray, map_y: np.ndarray) -> np.ndarray:
+    """cv2.remap, run with cv2.cuda when OpenCV has a CUDA device."""
+    if CUDA_AVAILABLE:
+        try:
+            gpu_x, gpu_y = cv2.cuda_GpuMat(), cv2.cuda_GpuMat()
+            gpu_x.upload(map_x)
+            gpu_y.upload(map_y)
+            return cv2.cuda.remap(_upload_source(src_img), gpu_x, gpu_y, cv2.INTER_LINEAR,
+                                  borderMode=cv2.BORDER_REFLECT_101).download()
+        except cv2.error:
+            pass
+    return cv2.remap(src_img, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT_101)
+
+
+def triangle_list_to_indices(triangle_list: np.ndarray, points: np.ndarray,
+                             max_distance: float = 2.0) -> np.ndarray:
+    """Map Subdiv2D triangle vertex coordinates back to indices into points.
+
+    Triangles with a vertex farther than max_distance from every point (the
+    ones touching Subdiv2D's virtual outer vertices) are dropped.
+
+    Returns:
+        (T, 3) int array of point indices
+    """
+    vertices = np.asarray(triangle_list, dtype=np.float64).reshape(-1, 2)
+    points = np.asarray(points, dtype=np.float64)
+    if len(vertices) == 0 or len(points) == 0:
+        return np.empty((0, 3), dtype=np.int64)
+
+    if SCIPY_AVAILABLE:
+        distances, indices = cKDTree(points).query(vertices, k=1)
+    else:
+        d2 = ((vertices[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+        indices = d2.argmin(axis=1)
+        distances = np.sqrt(d2[np.arange(len(vertices)), indices])
+
+    keep = (distances < max_distance).reshape(-1, 3).all(axis=1)
+    return indices.reshape(-1, 3)[keep].astype(np.int64)
+
+
+@lru_cache(maxsize=8)
+def frame_context(h: int, w: int) -> dict:
+    """Per-frame-size constants, computed once per video resolution.
+
+    Returns a dict with the Subdiv2D 'rect', the four frame 'corners' and
+    the pixel coordinate vectors 'grid_x' (w,) and 'grid_y' (h, 1). The
+    arrays are shared between callers and read-only.
+    """
+    corners = np.array([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]])
+    grid_x = np.arange(w, dtype=np.float32)
+    grid_y = np.arange(h, dtype=np.float32)[:, None]
+    for arr in (corners, grid_x, grid_y):
+        arr.flags.writeable = False
+    return {'rect': (0, 0, w, h), 'corners': corners, 'grid_x': grid_x, 'grid_y': grid_y}
 
 
 def get_delaunay_triangles(points: np.ndarray, rect: Tuple[int, int, int, int]) -> List[Tuple[int, int, int]]:
@@ -41,68 +160,88 @@ def get_delaunay_triangles(points: np.ndarray, rect: Tuple[int, int, int, int])
         subdiv.insert(p)
 
     triangle_list = subdiv.getTriangleList()
-    triangles = []
-    pts_arr = np.array(pts)
-    for t in triangle_list:
-        p1 = (int(t[0]), int(t[1]))
-        p2 = (int(t[2]), int(t[3]))
-        p3 = (int(t[4]), int(t[5]))
-        indices = []
-        for p in (p1, p2, p3):
-            # find index of p in pts (allow small tolerance)
-            d = np.linalg.norm(pts_arr - np.array(p), axis=1)
-            idx = int(np.argmin(d))
-            if d[idx] < 2.0:
-                indices.append(idx)
-        if len(indices) == 3:
-            triangles.append(tuple(indices))
-    return triangles
+    return [tuple(t) for t in triangle_list_to_indices(triangle_list, np.array(pts)).tolist()]
 
 
-def warp_delaunay(src_img: np.ndarray, src_points: np.ndarray,
-                  dst_points: np.ndarray, output_shape: Tuple[int, int]) -> np.ndarray:
-    """Piecewise affine warp using Delaunay triangulation.
+def warp_all_triangles(src_img: np.ndarray, src_points: np.ndarray, dst_points: np.ndarray,
+                       triangles: List[Tuple[int, int, int]], output_shape: Tuple[int, int]) -> np.ndarray:
+    """Piecewise affine warp of all triangles with a single cv2.remap.
 
-    src_points and dst_points should be arrays of matching 2D points.
+    Each output pixel inside the destination mesh is labelled with its
+    triangle, the inverse (destination -> source) affine of every triangle
+    is solved in one batched call, and the remap coordinates are computed
+    from the matrices gathered per pixel instead of warping triangle by
+    triangle.
     """
     h, w = output_shape[:2]
-    src_img_out = np.zeros((h, w, 3), dtype=src_img.dtype)
+    out = np.zeros((h, w) + src_img.shape[2:], dtype=src_img.dtype)
+    tris = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    if len(tris) == 0:
+        return out
+
+    src_tris = np.asarray(src_points, dtype=np.float64)[tris]  # (T, 3, 2)
+    dst_tris = np.asarray(dst_points, dtype=np.float64)[tris]
+
+    # Drop triangles that are degenerate in the destination
+    area = ((dst_tris[:, 1, 0] - dst_tris[:, 0, 0]) * (dst_tris[:, 2, 1] - dst_tris[:, 0, 1])
+            - (dst_tris[:, 2, 0] - dst_tris[:, 0, 0]) * (dst_tris[:, 1, 1] - dst_tris[:, 0, 1]))
+    keep = np.abs(area) > 1e-6
+    src_tris, dst_tris = src_tris[keep], dst_tris[keep]
+    if len(dst_tris) == 0:
+        return out
+
+    # Solve [x y 1] @ M = [u v] for every triangle: (T, 3, 2) -> (T, 2, 3)
+    dst_h = np.concatenate([dst_tris, np.ones(dst_tris.shape[:2] + (1,))], axis=2)
+    affines = np.linalg.solve(dst_h, src_tris).transpose(0, 2, 1)
 
-    # Build triangulation on destination points to avoid holes
-    rect = (0, 0, w, h)
-    tris = get_delaunay_triangles(dst_points, rect)
+    # Work only inside the bounding box of the destination mesh
+    x0, y0 = np.maximum(np.floor(dst_tris.reshape(-1, 2).min(axis=0)).astype(int), 0)
+    x1, y1 = np.minimum(np.ceil(dst_tris.reshape(-1, 2).max(axis=0)).astype(int) + 1, (w, h))
+    if x1 <= x0 or y1 <= y0:
+        return out
 
-    for tri in tris:
-        src_tri = np.float32([src_points[i] for i in tri])
-        dst_tri = np.float32([dst_points[i] for i in tri])
+    # Rasterize triangle labels (0 = outside the mesh, i + 1 = triangle i)
+    labels = np.zeros((y1 - y0, x1 - x0), dtype=np.uint16)
+    offset = np.array([x0, y0])
+    for i, tri in enumerate(dst_tris):
+        cv2.fillConvexPoly(labels, np.int32(np.round(tri - offset)), i + 1)
 
-        # Warp each triangle
-        src_rect = cv2.boundingRect(src_tri)
-        dst_rect = cv2.boundingRect(dst_tri)
+    # Per-pixel affine coefficients gathered by label; label 0 maps off-image
+    coeffs = np.zeros((len(affines) + 1, 6), dtype=np.float32)
+    coeffs[0, 2] = coeffs[0, 5] = -1
+    coeffs[1:] = affines.reshape(-1, 6)
+    c = coeffs[labels]
 
-        if src_rect[2] == 0 or src_rect[3] == 0 or dst_rect[2] == 0 or dst_rect[3] == 0:
-            continue
+    context = frame_context(h, w)
+    xs = context['grid_x'][x0:x1]
+    ys = context['grid_y'][y0:y1]
+    map_x = c[..., 0] * xs + c[..., 1] * ys + c[..., 2]
+    map_y = c[..., 3] * xs + c[..., 4] * ys + c[..., 5]
 
-        src_tri_offset = src_tri - [src_rect[0], src_rect[1]]
-        dst_tri_offset = dst_tri - [dst_rect[0], dst_rect[1]]
+    warped = _remap(src_img, map_x, map_y)
+    warped[labels == 0] = 0
+    out[y0:y1, x0:x1] = warped
+    return out
 
-        src_cropped = src_img[src_rect[1]:src_rect[1] + src_rect[3], src_rect[0]:src_rect[0] + src_rect[2]]
-        if src_cropped.size == 0:
-            continue
 
-        M = cv2.getAffineTransform(src_tri_offset, dst_tri_offset)
-        warped = cv2.warpAffine(src_cropped, M, (dst_rect[2], dst_rect[3]), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT_101)
+def warp_delaunay(src_img: np.ndarray, src_points: np.ndarray,
+                  dst_points: np.ndarray, output_shape: Tuple[int, int],
+                  triangles=None) -> np.ndarray:
+    """Piecewise affine warp using Delaunay triangulation.
 
-        mask = np.zeros((dst_rect[3], dst_rect[2]), dtype=np.uint8)
-        cv2.fillConvexPoly(mask, np.int32(dst_tri_offset), 255)
+    src_points and dst_points should be arrays of matching 2D points.
+    triangles, if given, is a precomputed triangulation (point index
+    triples) reused instead of triangulating dst_points again.
+    """
+    h, w = output_shape[:2]
 
-        dst_area = src_img_out[dst_rect[1]:dst_rect[1] + dst_rect[3], dst_rect[0]:dst_rect[0] + dst_rect[2]]
-        dst_area_bg = cv2.bitwise_and(dst_area, dst_area, mask=cv2.bitwise_not(mask))
-        warped_fg = cv2.bitwise_and(warped, warped, mask=mask)
-        dst_area_combined = cv2.add(dst_area_bg, warped_fg)
-        src_img_out[dst_rect[1]:dst_rect[1] + dst_rect[3], dst_rect[0]:dst_rect[0] + dst_rect[2]] = dst_area_combined
+    if triangles is not None:
+        tris = triangles
+    else:
+        # Build triangulation on destination points to avoid holes
+        tris = get_delaunay_triangles(dst_points, frame_context(h, w)['rect'])
 
-    return src_img_out
+    return warp_all_triangles(src_img, src_points, dst_points, tris, output_shape)
 
 
 def warp_tps(src_img: np.ndarray, src_points: np.ndarray, dst_points: np.ndarray, output_shape: Tuple[int, int]) -> np.ndarray:
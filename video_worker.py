@@ -0,0 +1,393 @@
+"""
+Video face swapping pipeline and the worker process that runs it.
+
+The swap loop is CPU-bound Python. Running it in a persistent child process
+keeps it from competing with the Qt event loop for the GIL, and the child
+keeps its models loaded between videos.
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+import logging
+
+import cv2
+import numpy as np
+
+import config
+from utils.video_utils import VideoUtils
+
+if TYPE_CHECKING:
+    from face_detector import FaceDetector, FaceData
+    from face_swapper import FaceSwapper
+
+logger = logging.getLogger(__name__)
+
+# Minimum time between progress reports, in seconds
+PROGRESS_MIN_INTERVAL = 0.1
+# How often a waiting job checks that the worker process is still alive, in seconds
+WORKER_POLL_INTERVAL = 0.5
+
+def process_video(video_path: str, output_path: str, face_detector: 'FaceDetector',
+                  face_swapper: 'FaceSwapper', frame_stride: int = 1,
+                  progress_callback: Optional[Callable[[int, str], None]] = None,
+                  cancel_event: Optional[threading.Event] = None) -> Tuple[bool, str]:
+    """
+    Swap the faces assigned in face_detector throughout a video.
+
+    Args:
+        video_path: Input video file
+        output_path: Output video file, removed again if processing is cancelled
+        face_detector: Detector holding the unique faces and their swap images
+        face_swapper: Swapper used for every frame
+        frame_stride: Process every frame_stride-th input frame
+        progress_callback: Called with (percent, message), at most every
+            PROGRESS_MIN_INTERVAL seconds while frames are processed
+        cancel_event: Stops processing once set
+
+    Returns:
+        (success, message) tuple
+    """
+    frame_stride = max(1, int(frame_stride))
+    report = progress_callback or (lambda progress, message: None)
+
+    # Open video
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return False, f"Could not open video: {video_path}"
+
+    # Get video properties
+    fps = int(cap.get(cv2.CAP_PROP_FPS))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    total_frames = VideoUtils.get_frame_count(video_path, cap)
+    # Only every frame_stride-th frame is decoded and written
+    total_frames = -(-total_frames // frame_stride)
+    # Small capture buffer; avoids stalls on camera and stream sources
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 2)
+
+    # Create video writer, an ffmpeg (hardware) H.264 encoder where available
+    out = VideoUtils.open_writer(
+        output_path, fps / frame_stride, (width, height),
+        encoder=config.CONFIG.output_video_encoder,
+        codec=config.CONFIG.output_video_codec,
+        bitrate=config.CONFIG.output_video_bitrate,
+    )
+
+    frame_count = 0
+    face_swapper.reset_tracking()
+
+    report(0, "Starting video processing...")
+
+    # Decoding and encoding run on their own threads (OpenCV releases
+    # the GIL) so they overlap with the sequential swap stage
+    queue_size = config.CONFIG.process_queue_frames
+    read_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+    batch_size = config.CONFIG.process_batch_frames
+
+    # Frames are swapped in place and, once written, handed back to the
+    # reader to decode into. The ring covers every frame that can be in
+    # flight (both queues, the batch, one decoding and one encoding), so
+    # no frame buffers are allocated while the video runs. Short clips need
+    # no more buffers than they have frames.
+    ring_size = 2 * queue_size + batch_size + 2
+    if total_frames > 0:
+        ring_size = min(ring_size, total_frames)
+    free_frames = queue.SimpleQueue()
+    for _ in range(ring_size):
+        free_frames.put(np.empty((height, width, 3), dtype=np.uint8))
+    stop_event = threading.Event()
+    reader = threading.Thread(target=_read_frames,
+                              args=(cap, read_queue, stop_event, frame_stride, free_frames),
+                              daemon=True)
+    writer = threading.Thread(target=_write_frames, args=(out, write_queue, free_frames),
+                              daemon=True)
+    reader.start()
+    writer.start()
+
+    batch = []
+    end_of_video = False
+    last_emit = 0.0
+    # Bound once; the loop runs per frame for the whole video
+    is_cancelled = cancel_event.is_set if cancel_event is not None else (lambda: False)
+    next_frame = read_queue.get
+    write_frame = write_queue.put
+    process_batch = face_swapper.process_video_frames_batch
+    try:
+        while not end_of_video:
+            # Short timeout so a cancel is seen while waiting on the decoder
+            try:
+                frame = next_frame(timeout=0.1)
+            except queue.Empty:
+                if is_cancelled():
+                    break
+                continue
+            if frame is None:
+                end_of_video = True
+            else:
+                batch.append(frame)
+
+            # Swap a full batch, or whatever is left at the end
+            if not batch or (len(batch) < batch_size and not end_of_video):
+                continue
+            # Checked once per batch rather than per decoded frame
+            if is_cancelled():
+                break
+
+            # Process and write frames
+            for processed_frame in process_batch(batch, face_detector, {}, in_place=True):
+                write_frame(processed_frame)
+
+            frame_count += len(batch)
+            batch = []
+
+            # Update progress at most every PROGRESS_MIN_INTERVAL seconds
+            now = time.monotonic()
+            if now - last_emit < PROGRESS_MIN_INTERVAL:
+                continue
+            last_emit = now
+            # Streams and some containers report no frame count
+            progress = int((frame_count / total_frames) * 100) if total_frames > 0 else 0
+            report(progress, f"Processing frame {frame_count}/{total_frames}")
+    finally:
+        stop_event.set()
+        # Unblock a reader waiting on a full queue
+        while reader.is_alive():
+            try:
+                read_queue.get_nowait()
+            except queue.Empty:
+                reader.join(0.1)
+        # Let the writer flush the frames already queued
+        write_queue.put(None)
+        writer.join()
+
+        # Clean up
+        cap.release()
+        out.release()
+
+    if is_cancelled():
+        # Remove partial output file
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return False, "Processing cancelled by user"
+
+    report(100, "Processing complete!")
+    return True, f"Video saved to: {output_path}"
+
+def _read_frames(cap, frame_queue: queue.Queue, stop_event: threading.Event, stride: int = 1,
+                 free_frames: queue.SimpleQueue = None):
+    """Decode every stride-th frame from cap onto frame_queue, followed by None at the end.
+
+    Frames are decoded into buffers taken from free_frames when it has any.
+    """
+    try:
+        index = 0
+        while not stop_event.is_set():
+            # grab() only demuxes; frames that are skipped are never decoded
+            if not cap.grab():
+                break
+            skip = index % stride != 0
+            index += 1
+            if skip:
+                continue
+            buffer = None
+            if free_frames is not None:
+                try:
+                    buffer = free_frames.get_nowait()
+                except queue.Empty:
+                    pass
+            ret, frame = cap.retrieve(buffer)
+            if not ret:
+                break
+
+            while not stop_event.is_set():
+                try:
+                    frame_queue.put(frame, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+    except Exception as e:
+        logger.error(f"Error reading video frames: {e}")
+    finally:
+        frame_queue.put(None)
+
+def _write_frames(out, frame_queue: queue.Queue, free_frames: queue.SimpleQueue = None):
+    """Encode frames from frame_queue with out until None is received.
+
+    Written frames are returned to free_frames for reuse.
+    """
+    while True:
+        frame = frame_queue.get()
+        if frame is None:
+            break
+        # Ring buffers are already contiguous uint8 and pass straight through;
+        # anything else is converted once here rather than inside the writer
+        pixels = frame
+        if not frame.flags['C_CONTIGUOUS'] or frame.dtype != np.uint8:
+            pixels = np.ascontiguousarray(frame, dtype=np.uint8)
+        try:
+            out.write(pixels)
+        except Exception as e:
+            logger.error(f"Error writing video frame: {e}")
+        if free_frames is not None:
+            free_frames.put(frame)
+
+def worker_main(models_dir: str, quality_preset: str, tasks, results, cancel_event):
+    """
+    Entry point of the video worker process.
+
+    Runs jobs from tasks until None is received. The models are loaded on
+    the first job and kept for the following ones.
+
+    Args:
+        models_dir: Directory containing the Dlib model files
+        quality_preset: Quality preset applied in this process
+        tasks: Queue of (video_path, output_path, faces, frame_stride) jobs
+        results: Queue receiving ('progress', percent, message) and,
+            once per job, ('done', success, message) tuples
+        cancel_event: Cancels the running job once set
+    """
+    # Imported here so the pipeline itself only needs OpenCV
+    from face_detector import FaceDetector
+    from face_swapper import FaceSwapper
+
+    # A spawned process starts from the module defaults
+    config.apply_quality_preset(quality_preset)
+    face_detector = None
+    face_swapper = None
+
+    def report(progress, message):
+        results.put(('progress', progress, message))
+
+    while True:
+        job = tasks.get()
+        if job is None:
+            break
+        video_path, output_path, faces, frame_stride = job
+        try:
+            if face_detector is None:
+                report(0, "Loading face models...")
+                face_detector = FaceDetector(models_dir)
+                face_swapper = FaceSwapper()
+            face_detector.set_unique_faces(faces)
+            success, message = process_video(video_path, output_path, face_detector, face_swapper,
+                                             frame_stride, report, cancel_event)
+        except Exception as e:
+            logger.error(f"Video processing error: {e}")
+            success, message = False, f"Processing failed: {str(e)}"
+        results.put(('done', success, message))
+
+class VideoWorker:
+    """
+    Persistent child process that swaps faces in videos.
+
+    The process is started with the first job and runs one job at a time
+    until shutdown(). It is restarted if the quality preset has changed
+    since it was started.
+    """
+
+    def __init__(self, models_dir: str = "models"):
+        """
+        Args:
+            models_dir: Directory containing the Dlib model files
+        """
+        self.models_dir = models_dir
+        # Spawned rather than forked: forking a process running Qt and worker threads is unsafe
+        self._context = mp.get_context('spawn')
+        self._cancel_event = self._context.Event()
+        self._process = None
+        self._tasks = None
+        self._results = None
+        self._quality_preset = None
+
+    def start(self):
+        """Start the worker process unless it is already running with the current settings."""
+        quality_preset = config.CONFIG.quality_preset
+        if self._process is not None:
+            if self._process.is_alive() and self._quality_preset == quality_preset:
+                return
+            self.shutdown()
+
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        self._quality_preset = quality_preset
+        self._process = self._context.Process(
+            target=worker_main,
+            args=(self.models_dir, quality_preset, self._tasks, self._results, self._cancel_event),
+            name="FaceSwapVideoWorker",
+            daemon=True,
+        )
+        self._process.start()
+
+    def process_video(self, video_path: str, output_path: str, faces: List['FaceData'],
+                      frame_stride: int = 1,
+                      progress_callback: Optional[Callable[[int, str], None]] = None,
+                      cancel_event: Optional[threading.Event] = None) -> Tuple[bool, str]:
+        """
+        Process a video in the worker process, blocking until it is done.
+
+        Args:
+            video_path: Input video file
+            output_path: Output video file
+            faces: Unique faces with their swap images assigned
+            frame_stride: Process every frame_stride-th input frame
+            progress_callback: Called with (percent, message) as the worker reports progress
+            cancel_event: The caller's cancel flag; a cancel requested before the
+                job is submitted is seen here, later ones through cancel()
+
+        Returns:
+            (success, message) tuple
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            return False, "Processing cancelled by user"
+        self.start()
+        # Cleared before the caller's flag is checked again: a cancel() racing
+        # with this either sets the flag first or sets the event after the clear
+        self._cancel_event.clear()
+        if cancel_event is not None and cancel_event.is_set():
+            return False, "Processing cancelled by user"
+        # Held locally; shutdown() from another thread replaces the attributes
+        process, results = self._process, self._results
+        self._tasks.put((video_path, output_path, list(faces), frame_stride))
+
+        while True:
+            try:
+                message = results.get(timeout=WORKER_POLL_INTERVAL)
+            except queue.Empty:
+                if not process.is_alive():
+                    return False, ("Video worker stopped unexpectedly "
+                                   f"(exit code {process.exitcode})")
+                continue
+            kind, *payload = message
+            if kind == 'done':
+                return tuple(payload)
+            if progress_callback is not None:
+                progress_callback(*payload)
+
+    def cancel(self):
+        """Cancel the running job."""
+        self._cancel_event.set()
+
+    def shutdown(self, timeout: float = 2.0):
+        """
+        Stop the worker process.
+
+        Args:
+            timeout: Seconds to wait for it to exit before terminating it
+        """
+        process = self._process
+        if process is None:
+            return
+        self._process = None
+        self._cancel_event.set()
+        if process.is_alive():
+            self._tasks.put(None)
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning("Video worker did not stop in time, terminating it")
+                process.terminate()
+                process.join()